@@ -0,0 +1,49 @@
+"""
+Microbenchmark: Pipeline.predict_proba vs the compiled inference path.
+
+    uv run python benchmarks/bench_compiled.py [path/to/Model.joblib]
+"""
+import sys
+import time
+from pathlib import Path
+
+import joblib
+
+from quietsignal_backend.ml.compiledModel import compile_model, parity_error
+from quietsignal_backend.ml.modelLoader import MODEL_PATH
+
+BATCH_SIZES = (1, 8, 32, 256)
+SAMPLE = "Today was long. I felt tired at work but dinner with friends cheered me up a bit. "
+
+
+def time_per_call(fn, texts, min_seconds=0.5):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn(texts)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else MODEL_PATH
+    model = joblib.load(path)
+    compiled = compile_model(model)
+    if compiled is None:
+        print(f"{type(model).__name__} is not supported by the compiled path (or failed parity)")
+        return
+
+    print(f"model: {path}")
+    print(f"parity (max abs diff): {parity_error(model, compiled):.2e}")
+    print(f"{'batch':>6} {'pipeline ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for size in BATCH_SIZES:
+        texts = [SAMPLE * (1 + i % 3) for i in range(size)]
+        base = time_per_call(model.predict_proba, texts)
+        fast = time_per_call(compiled.predict_proba, texts)
+        print(f"{size:>6} {base * 1000:>12.3f} {fast * 1000:>12.3f} {base / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+In-process load generator: drives the real app (routers, middleware,
+lifespan) through httpx's ASGI transport against a temporary SQLite
+database and the synthetic model, and reports p50/p95/p99 latency and
+requests/sec per scenario.
+
+    uv run python benchmarks/bench_load.py --requests 2000 --concurrency 32 --out bench-results/load.json
+    uv run python benchmarks/bench_load.py --scenario analyze --baseline bench-results/load.json
+
+Client and server share one event loop, so absolute numbers include the
+client's overhead; compare runs made on the same machine with the same flags.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from harness import add_common_args, configure_env, finish, latency_summary, make_text, use_model
+
+SCENARIOS = ("analyze", "login", "me")
+PASSWORD = "benchmark-password"
+
+
+async def _drive(send, total: int, concurrency: int):
+    """Closed loop: `concurrency` workers issue requests back to back until `total` are done."""
+    latencies = []
+    errors = {}
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await send()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "rps": total / wall if wall else 0.0,
+        "errors": errors,
+        **latency_summary(latencies),
+    }
+
+
+async def run(args):
+    import httpx
+
+    from quietsignal_backend.main import app
+
+    rng = random.Random(args.seed)
+    texts = [make_text(rng, rng.choice((10, 60, 200))) for _ in range(512)]
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            username = f"bench{rng.randrange(10 ** 9)}"
+            response = await client.post("/auth/register", json={
+                "name": "Benchmark", "username": username, "email": f"{username}@example.com", "password": PASSWORD,
+            })
+            response.raise_for_status()
+            response = await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+            token = response.json()["data"]["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            senders = {
+                "analyze": lambda: client.post("/analyze/", json={"text": rng.choice(texts)}, headers=headers),
+                "login": lambda: client.post("/auth/login", json={"username": username, "password": PASSWORD}),
+                "me": lambda: client.get("/users/me", headers=headers),
+            }
+            for name in (SCENARIOS if args.scenario == "all" else (args.scenario,)):
+                await _drive(senders[name], args.warmup, args.concurrency)
+                results[name] = await _drive(senders[name], args.requests, args.concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests before each scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache on (off by default)")
+    args = parser.parse_args()
+
+    configure_env(PREDICTION_CACHE_ENABLED="true" if args.cache else "false")
+    model_path = use_model(args.real_model)
+
+    results = asyncio.run(run(args))
+
+    print(f"{'scenario':<10} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {sum(result['errors'].values()):>8}")
+    finish("load", results, args, meta={
+        "model": model_path,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "prediction_cache": args.cache,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Microbenchmarks for the request hot paths: model scoring at several batch
+sizes and text lengths, password verification, JWT decoding, the token denylist and response
+serialization.
+
+    uv run python benchmarks/bench_micro.py --out bench-results/micro.json
+    uv run python benchmarks/bench_micro.py --baseline bench-results/micro.json   # exits 1 on regression
+"""
+import argparse
+import random
+import time
+
+from harness import add_common_args, configure_env, finish, make_text, time_per_call, use_model
+
+BATCH_SIZES = (1, 8, 32, 128)
+TEXT_WORDS = (10, 60, 400)
+
+
+def bench_model(results, min_seconds):
+    from quietsignal_backend.ml.modelLoader import predict_emotion, predict_emotions
+
+    rng = random.Random(1)
+    results["predict_emotion[words=60]"] = time_per_call(predict_emotion, make_text(rng, 60), min_seconds=min_seconds)
+    for words in TEXT_WORDS:
+        for size in BATCH_SIZES:
+            texts = [make_text(rng, words) for _ in range(size)]
+            result = time_per_call(predict_emotions, texts, min_seconds=min_seconds)
+            result["ms_per_text"] = result["ms_per_call"] / size
+            results[f"predict_emotions[batch={size},words={words}]"] = result
+
+
+def bench_auth(results, min_seconds):
+    from quietsignal_backend.utils.jwtHandler import create_access_token, decode_token, new_jti
+    from quietsignal_backend.utils.tokenDenylist import LocalDenylistBackend, TokenDenylist
+    from quietsignal_backend.utils.security import hash_password, verify_password
+
+    hashed = hash_password("correct horse battery staple")
+    results["verify_password"] = time_per_call(verify_password, "correct horse battery staple", hashed,
+                                               min_seconds=min_seconds)
+
+    token = create_access_token({"sub": "bench", "role": "user", "uid": 1, "name": "Bench", "email": "b@x.io"})
+    results["decode_token"] = time_per_call(decode_token, token, min_seconds=min_seconds)
+
+    # a filled denylist: the check deps does after decode_token, for a live (not revoked) token
+    denylist = TokenDenylist(LocalDenylistBackend(), capacity=100000, error_rate=0.001, sync_interval=0)
+    for _ in range(10000):
+        denylist.revoke(new_jti(), time.time() + 900)
+    results["token_denylist.is_revoked"] = time_per_call(denylist.is_revoked, decode_token(token)["jti"],
+                                                         min_seconds=min_seconds)
+
+
+def bench_serialization(results, min_seconds):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from quietsignal_backend.common.apiResponse import success_response
+    from quietsignal_backend.models.dto.analyzeDTO import AnalyzeResponseDTO
+    from quietsignal_backend.models.dto.userDTO import UserOutDTO
+
+    probs = {"0": 0.12, "1": 0.23, "2": 0.65}
+
+    def build():
+        return AnalyzeResponseDTO(label="positive", probabilities=probs, model_version="0123456789abcdef")
+
+    dto = build()
+
+    user = UserOutDTO(id=1, name="Bench", username="bench", email="bench@example.com")
+
+    def dict_envelope(data, message):
+        # the old path of a dict-returning route: jsonable_encoder, then JSONResponse rendering
+        content = {"success": True, "status_code": 200, "message": message, "data": data}
+        return JSONResponse(jsonable_encoder(content)).body
+
+    def typed_envelope(data, message):
+        # what routes return now: APIResponse rendered by pydantic-core in one pass
+        return success_response(data, message).body
+
+    results["dto.analyze_response.build"] = time_per_call(build, min_seconds=min_seconds)
+    results["dto.analyze_response.model_dump_json"] = time_per_call(dto.model_dump_json, min_seconds=min_seconds)
+    for name, data in (("analyze", dto), ("me", user)):
+        results[f"envelope.dict.{name}"] = time_per_call(dict_envelope, data, "Fetched", min_seconds=min_seconds)
+        results[f"envelope.typed.{name}"] = time_per_call(typed_envelope, data, "Fetched", min_seconds=min_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="time spent per benchmark (default 0.5)")
+    args = parser.parse_args()
+
+    configure_env()
+    model_path = use_model(args.real_model)
+
+    results = {}
+    bench_model(results, args.min_seconds)
+    bench_auth(results, args.min_seconds)
+    bench_serialization(results, args.min_seconds)
+
+    print(f"{'benchmark':<48} {'ms/call':>10} {'best ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<48} {result['ms_per_call']:>10.4f} {result['min_ms']:>10.4f}")
+    finish("micro", results, args, meta={"model": model_path, "min_seconds": args.min_seconds})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Shared setup for the benchmark scripts: an isolated environment (temporary
+SQLite database, synthetic model), timing helpers and JSON result files that
+can be compared against a baseline.
+
+configure_env() has to run before anything from quietsignal_backend is
+imported, Settings are read at import time.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+WORK_DIR = Path(tempfile.mkdtemp(prefix="quietsignal-bench-"))
+
+# lower is better for these, higher for everything in HIGHER_IS_BETTER
+LOWER_IS_BETTER = ("ms_per_call", "p50_ms", "p95_ms", "p99_ms")
+HIGHER_IS_BETTER = ("rps",)
+
+VOCABULARY = {
+    0: "awful tired sad angry exhausted lonely worried stressed cried hopeless terrible anxious".split(),
+    1: "ordinary normal usual routine okay fine average commute meeting lunch errands weather".split(),
+    2: "great happy excited grateful calm proud loved wonderful relaxed cheerful fun amazing".split(),
+}
+FILLER = "today work home friends family dinner morning evening walk felt was really quite a bit and the".split()
+
+
+def configure_env(**overrides: str) -> None:
+    """
+    Points the app at a throwaway SQLite file and fills in the settings the
+    benchmarks don't care about. Never benchmark against a real database.
+    """
+    os.environ["DB_URL"] = f"sqlite:///{WORK_DIR / 'bench.db'}"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+    os.environ.setdefault("MYSQL_USER", "bench")
+    os.environ.setdefault("MYSQL_PASSWORD", "bench")
+    os.environ.setdefault("MYSQL_DB", "bench")
+    os.environ.setdefault("MODEL_WATCH_INTERVAL_S", "0")
+    os.environ.setdefault("PROFILER_ENABLED", "false")
+    # one client hammering from one IP is exactly what admission control sheds
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.update(overrides)
+    src = str(REPO_ROOT / "src")
+    if src not in sys.path:
+        sys.path.insert(0, src)
+
+
+def make_text(rng: random.Random, words: int, label: Optional[int] = None) -> str:
+    label = rng.randrange(3) if label is None else label
+    tokens = [rng.choice(VOCABULARY[label]) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(words)]
+    return " ".join(tokens).capitalize() + "."
+
+
+def build_synthetic_model(path: Path, seed: int = 0) -> Path:
+    """
+    Small Tfidf + LogisticRegression pipeline with the same predict_proba
+    contract (3 classes) as the real artifact, so runs don't depend on
+    mlmodel/Model.joblib being present.
+    """
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    rng = random.Random(seed)
+    labels = [i % 3 for i in range(1500)]
+    texts = [make_text(rng, rng.randint(5, 60), label) for label in labels]
+    model = Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)),
+        ("clf", LogisticRegression(max_iter=500)),
+    ])
+    model.fit(texts, labels)
+    joblib.dump(model, path, compress=0)
+    return path
+
+
+def use_model(real_model: bool) -> str:
+    """Serves the synthetic model unless `real_model`; returns the artifact path used."""
+    from quietsignal_backend.ml.modelLoader import MODEL_PATH, registry
+
+    if real_model:
+        if not MODEL_PATH.exists():
+            raise SystemExit(f"--real-model given but {MODEL_PATH} does not exist")
+        path = MODEL_PATH
+    else:
+        path = build_synthetic_model(WORK_DIR / "Model.joblib")
+    registry.path = path
+    registry.current()
+    return str(path)
+
+
+def time_per_call(fn: Callable, *args: Any, min_seconds: float = 0.5, rounds: int = 5) -> Dict[str, float]:
+    """Median and best per-call time over `rounds` rounds of roughly min_seconds / rounds each."""
+    fn(*args)  # warm caches and lazy imports
+    per_round = min_seconds / rounds
+    timings = []
+    calls = 0
+    for _ in range(rounds):
+        n = 0
+        start = time.perf_counter()
+        while True:
+            fn(*args)
+            n += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= per_round:
+                break
+        timings.append(elapsed / n * 1000)
+        calls += n
+    return {"ms_per_call": statistics.median(timings), "min_ms": min(timings), "calls": calls}
+
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "max_ms": 0.0}
+    cuts = statistics.quantiles(samples_ms, n=100, method="inclusive") if len(samples_ms) > 1 else samples_ms * 99
+    return {
+        "p50_ms": cuts[49],
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "mean_ms": statistics.fmean(samples_ms),
+        "max_ms": max(samples_ms),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for name in ("numpy", "sklearn", "fastapi", "pydantic", "sqlalchemy"):
+        module = sys.modules.get(name)
+        versions[name] = getattr(module, "__version__", None)
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--out", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="fail when a metric is worse than the baseline by more than this fraction (default 0.10)")
+    parser.add_argument("--real-model", action="store_true", help="use mlmodel/Model.joblib instead of the synthetic model")
+
+
+def error_count(result: Dict) -> int:
+    # {status code: count} of non-2xx responses, load scenarios only
+    return sum((result.get("errors") or {}).values())
+
+
+def failed_requests(results: Dict[str, Dict]) -> List[str]:
+    """
+    Scenarios that saw failed requests. Their numbers can't be trusted: a
+    request that fails fast (401/429/500) looks like a latency win.
+    """
+    return [
+        f"{name}: {error_count(result)} failed request(s) {result['errors']}"
+        for name, result in results.items() if error_count(result)
+    ]
+
+
+def compare(baseline: Dict, current: Dict, max_regression: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline`, empty when within budget."""
+    regressions = []
+    old_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        old = old_results.get(name)
+        if old is None:
+            continue
+        if error_count(result) > error_count(old):
+            regressions.append(f"{name} errors: {error_count(old)} -> {error_count(result)}")
+        for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if key not in result or not old.get(key):
+                continue
+            change = (result[key] - old[key]) / old[key]
+            if key in HIGHER_IS_BETTER:
+                change = -change
+            if change > max_regression:
+                regressions.append(f"{name} {key}: {old[key]:.3f} -> {result[key]:.3f} ({change:+.0%} worse)")
+    return regressions
+
+
+def finish(suite: str, results: Dict[str, Dict], args: argparse.Namespace, meta: Optional[Dict] = None) -> None:
+    """
+    Writes the JSON file and exits non-zero when requests failed or the
+    baseline comparison finds regressions.
+    """
+    payload = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "meta": meta or {},
+        "results": results,
+    }
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"results written to {args.out}")
+
+    failures = failed_requests(results)
+    if failures:
+        print(f"\n{len(failures)} scenario(s) had failed requests, the run is not a valid measurement:")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+
+    if args.baseline:
+        regressions = compare(json.loads(args.baseline.read_text(encoding="utf-8")), payload, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.max_regression:.0%} vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"no regressions beyond {args.max_regression:.0%} vs {args.baseline}")
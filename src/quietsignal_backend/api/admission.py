@@ -0,0 +1,71 @@
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..common.apiResponse import error_response
+from ..utils.rateLimiter import EndpointLimits
+
+
+def endpoint_class(method: str, path: str) -> Optional[str]:
+    """The rate_limits entry guarding `path`, None for cheap endpoints."""
+    if method != "POST":
+        return None
+    if path.startswith("/analyze") or (path.startswith("/journals/") and "/entries" in path):
+        return "analyze"
+    if path in ("/auth/login", "/auth/register", "/auth/refresh", "/users", "/users/"):
+        return "auth"
+    return None
+
+
+def client_ip(scope: Scope, trust_forwarded: bool = False) -> str:
+    if trust_forwarded:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                # the last hop was added by our proxy, everything left of it is client-supplied
+                return value.decode("latin-1").rsplit(",", 1)[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionMiddleware:
+    """
+    Sheds load on the expensive endpoints before any body is read: a global
+    in-flight cap per endpoint class (503) and a token bucket per client IP
+    (429), both with Retry-After. Per-user buckets need the principal and
+    are checked by the deps.rate_limit dependency.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, EndpointLimits], trust_forwarded: bool = False):
+        self.app = app
+        self.limits = limits
+        self.trust_forwarded = trust_forwarded
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = endpoint_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limits = self.limits[name]
+        try:
+            limits.acquire()
+        except HTTPException as exc:
+            await self._reject(exc, scope, receive, send)
+            return
+        try:
+            limits.check_ip(client_ip(scope, self.trust_forwarded))
+        except HTTPException as exc:
+            limits.release()
+            await self._reject(exc, scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limits.release()
+
+    @staticmethod
+    async def _reject(exc: HTTPException, scope: Scope, receive: Receive, send: Send) -> None:
+        response = error_response(exc.detail, exc.status_code, http_status=exc.status_code, headers=exc.headers)
+        await response(scope, receive, send)
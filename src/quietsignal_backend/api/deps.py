@@ -1,15 +1,19 @@
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Callable
-from ..utils.jwtHandler import decode_token
-from ..models.entities.userEntity import User
+from ..config import settings
+from ..utils.jwtHandler import ACCESS, decode_token
+from ..utils.principalCache import Principal, principal_cache
+from ..utils.rateLimiter import rate_limits
+from ..utils.tokenDenylist import token_denylist
 from ..models.dao.userDAO import UserDAO
-from ..database import get_db
+from ..database import LazySession, SessionLocal, engine, get_read_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  # used by docs and header flows
 
-def _get_token_from_request(request: Request) -> Optional[str]:
+def get_token_from_request(request: Request) -> Optional[str]:
     # 1) Check Authorization header first (Bearer ...)
     auth: str = request.headers.get("Authorization")
     if auth and auth.lower().startswith("bearer "):
@@ -18,8 +22,38 @@ def _get_token_from_request(request: Request) -> Optional[str]:
     token = request.cookies.get("access_token")
     return token
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
-    token = _get_token_from_request(request)
+def _get_from_primary(username: str) -> Optional[Principal]:
+    with SessionLocal() as primary:
+        user = UserDAO.get_by_username(primary, username)
+        return Principal.from_user(user) if user is not None else None
+
+async def _load_principal(payload: dict, db: Session) -> Optional[Principal]:
+    # stateless mode: the signed claims are the source of truth, no DB at all
+    if settings.AUTH_STATELESS:
+        principal = Principal.from_claims(payload)
+        if principal is not None:
+            return principal
+
+    username = payload["sub"]
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await UserDAO.get_by_username_async(db, username)
+        if user is None and isinstance(db, LazySession) and db.get_bind() is not engine:
+            # replica miss can be lag behind a fresh registration, ask the primary
+            # (the async session already reads from it)
+            principal = await run_in_threadpool(_get_from_primary, username)
+        elif user is not None:
+            principal = Principal.from_user(user)
+        if principal is None:
+            return None
+        principal_cache.set(principal)
+    return principal
+
+# async so a cache hit or stateless token is answered on the event loop; a
+# DB lookup runs natively on the AsyncSession with DB_ASYNC_ENABLED, else
+# on the threadpool
+async def get_current_user(request: Request, db: Session = Depends(get_read_db)) -> Principal:
+    token = get_token_from_request(request)
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
@@ -29,30 +63,67 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
             raise HTTPException(status_code=401, detail="Invalid token payload")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    if payload.get("typ", ACCESS) != ACCESS:
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    # in-process filter lookup, no I/O
+    if token_denylist.is_revoked(payload.get("jti")):
+        raise HTTPException(status_code=401, detail="Token revoked")
 
-    user = UserDAO.get_by_username(db, username)
+    user = await _load_principal(payload, db)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
-# variant that returns None instead of raising - useful for /me where you may want to handle not logged in
-def get_current_user_or_none(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
-    token = _get_token_from_request(request)
+def _access_claims(request: Request) -> Optional[dict]:
+    # verified, unrevoked access-token claims, None otherwise; signature and
+    # filter checks only, no DB
+    token = get_token_from_request(request)
     if not token:
         return None
     try:
         payload = decode_token(token)
-        username: str = payload.get("sub")
-        if not username:
-            return None
     except Exception:
         return None
-    return UserDAO.get_by_username(db, username)
+    if not payload.get("sub"):
+        return None
+    if payload.get("typ", ACCESS) != ACCESS or token_denylist.is_revoked(payload.get("jti")):
+        return None
+    return payload
+
+# variant that returns None instead of raising - useful for /me where you may want to handle not logged in
+async def get_current_user_or_none(request: Request, db: Session = Depends(get_read_db)) -> Optional[Principal]:
+    payload = _access_claims(request)
+    if payload is None:
+        return None
+    return await _load_principal(payload, db)
 
 # role enforcement dependency factory
 def require_role(role: str) -> Callable:
-    def _require_role(user: User = Depends(get_current_user)):
+    async def _require_role(user: Principal = Depends(get_current_user)):
         if user.role != role:
             raise HTTPException(status_code=403, detail="Insufficient privileges")
         return user
     return _require_role
+
+# per-user token bucket dependency factory; anonymous requests only have the
+# per-IP bucket of the AdmissionMiddleware
+def rate_limit(endpoint_class: str, anonymous: bool = False) -> Callable:
+    limits = rate_limits[endpoint_class]
+
+    if anonymous:
+        # the route doesn't need the principal, so the bucket is keyed off the
+        # verified token's subject: no session, no principal load on a cache miss
+        async def _rate_limit_anonymous(request: Request) -> None:
+            if not settings.RATE_LIMIT_ENABLED:
+                return
+            payload = _access_claims(request)
+            if payload is not None:
+                limits.check_user(payload["sub"])
+        return _rate_limit_anonymous
+
+    # same dependency as the route's own, so FastAPI resolves the principal once
+    async def _rate_limit(user: Principal = Depends(get_current_user)):
+        if settings.RATE_LIMIT_ENABLED:
+            limits.check_user(user.username)
+        return user
+    return _rate_limit
@@ -0,0 +1,197 @@
+import time
+from typing import Callable
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..common import serverTiming
+from ..common.metrics import Gauge, HistogramFamily, MetricsRegistry
+from ..database.poolMetrics import PoolMetrics, pool_metrics
+from ..ml.batchScheduler import scheduler
+from ..ml.inferenceExecutor import executor
+from ..ml.predictionCache import prediction_cache
+from ..utils.principalCache import principal_cache
+from ..utils.profiler import Profiler
+from ..utils.rateLimiter import rate_limits
+from ..utils.security import bulk_password_hasher, password_hasher
+from ..utils.tokenDenylist import token_denylist
+
+LATENCY_MS_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+http_requests_in_flight = Gauge()
+http_request_duration_ms = HistogramFamily(("method", "route", "status"), LATENCY_MS_BUCKETS)
+
+
+def _route_label(scope: Scope) -> str:
+    # the route template, never the raw path, so ids don't blow up the label set
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task hop): per-route latency
+    histogram up to the last body chunk, in-flight gauge, and a Server-Timing
+    header with whatever the request recorded through common.serverTiming
+    before its response started.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = serverTiming.begin()
+        timings = serverTiming.current()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        serverTiming.header_value(timings, (time.perf_counter() - start) * 1000),
+                    )
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration_ms.labels(scope["method"], _route_label(scope), str(status)).observe(
+                (time.perf_counter() - start) * 1000
+            )
+            serverTiming.end(token)
+
+
+class ProfilerMiddleware:
+    """Feeds matching requests to the active capture; one attribute check otherwise."""
+
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        capture = self.profiler.active
+        if capture is None or scope["type"] != "http" or not capture.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        self.profiler.request_started(capture)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished(capture)
+
+
+def _per_pool(read: Callable[[PoolMetrics], object]) -> Callable:
+    def collect():
+        return [({"pool": name}, read(metrics)) for name, metrics in list(pool_metrics.items())]
+    return collect
+
+
+def _pool_gauge(key: str) -> Callable:
+    def collect():
+        samples = []
+        for name, metrics in list(pool_metrics.items()):
+            pool = metrics.engine.pool if metrics.engine is not None else None
+            reader = getattr(pool, key, None)
+            if reader is not None:
+                samples.append(({"pool": name}, reader()))
+        return samples
+    return collect
+
+
+def _admission_rejections():
+    samples = []
+    for name, limits in rate_limits.items():
+        samples.append(({"endpoint": name, "limit": "ip"}, limits.rejected_ip.value))
+        samples.append(({"endpoint": name, "limit": "user"}, limits.rejected_user.value))
+        samples.append(({"endpoint": name, "limit": "concurrency"}, limits.rejected_concurrency.value))
+    return samples
+
+
+def build_registry() -> MetricsRegistry:
+    registry = MetricsRegistry(namespace="quietsignal")
+
+    # HTTP
+    registry.gauge("http_requests_in_flight", "Requests currently being served", http_requests_in_flight)
+    registry.histogram(
+        "http_request_duration_ms", "Request latency by route template, method and status", http_request_duration_ms
+    )
+
+    # admission control
+    registry.counter("admission_rejected_total", "Requests shed by admission control, by endpoint class and limit",
+                     _admission_rejections)
+    registry.gauge("admission_in_flight", "Requests holding a concurrency slot, by endpoint class",
+                   lambda: [({"endpoint": name}, limits.concurrency.in_flight)
+                            for name, limits in rate_limits.items() if limits.concurrency is not None])
+
+    # inference
+    registry.histogram("inference_batch_size", "Texts per micro-batch", scheduler.batch_sizes)
+    registry.histogram("inference_batch_wait_ms", "Time a text waited for its micro-batch", scheduler.queue_wait_ms)
+    registry.histogram("inference_queue_ms", "Time a predict call waited for an executor worker", executor.queue_ms)
+    registry.histogram("inference_vectorize_ms", "Vectorizer time per predict call", executor.vectorize_ms)
+    registry.histogram("inference_predict_ms", "Classifier time per predict call", executor.predict_ms)
+    registry.histogram("inference_first_stage_ms", "Cascade first-stage time per predict call",
+                       executor.first_stage_ms)
+    registry.counter("inference_cascade_texts_total", "Texts scored through the cascade, by the stage that answered",
+                     lambda: [({"stage": "first"}, executor.first_stage_answers.value),
+                              ({"stage": "full"}, executor.escalations.value)])
+    registry.gauge("inference_in_flight", "Jobs admitted to the inference executor", lambda: executor.in_flight)
+    registry.counter("inference_submitted_total", "Jobs submitted to the inference executor", executor.submitted)
+    registry.counter("inference_rejected_total", "Jobs rejected with 503 by the inference executor", executor.rejected)
+    registry.counter("prediction_cache_hits_total", "Prediction cache hits", prediction_cache.hits)
+    registry.counter("prediction_cache_misses_total", "Prediction cache misses", prediction_cache.misses)
+    registry.gauge("prediction_cache_size", "Entries in the prediction cache", lambda: len(prediction_cache.backend))
+
+    # database pools, one label value per engine
+    registry.histogram("db_pool_checkout_wait_ms", "Time waited for a pooled connection",
+                       _per_pool(lambda m: m.checkout_wait_ms.snapshot()))
+    registry.histogram("db_pool_checkout_hold_ms", "Time a connection stayed checked out",
+                       _per_pool(lambda m: m.checkout_hold_ms.snapshot()))
+    registry.histogram("db_query_ms", "Statement execution time", _per_pool(lambda m: m.query_ms.snapshot()))
+    registry.histogram("db_connection_lifetime_s", "Age of connections when closed",
+                       _per_pool(lambda m: m.connection_lifetime_s.snapshot()))
+    registry.counter("db_pool_connects_total", "New DBAPI connections", _per_pool(lambda m: m.connects.value))
+    registry.counter("db_pool_invalidations_total", "Invalidated connections", _per_pool(lambda m: m.invalidations.value))
+    registry.counter("db_pool_checkout_timeouts_total", "Checkouts that hit DB_POOL_TIMEOUT_S",
+                     _per_pool(lambda m: m.checkout_timeouts.value))
+    registry.gauge("db_pool_size", "Configured pool size", _pool_gauge("size"))
+    registry.gauge("db_pool_checked_out", "Connections checked out", _pool_gauge("checkedout"))
+    registry.gauge("db_pool_checked_in", "Idle connections in the pool", _pool_gauge("checkedin"))
+    registry.gauge("db_pool_overflow", "Connections above pool size", _pool_gauge("overflow"))
+
+    # auth
+    registry.histogram("password_hash_queue_wait_ms", "Time a hash/verify waited for the hashing pool",
+                       password_hasher.queue_wait_ms)
+    registry.histogram("password_hash_ms", "pbkdf2 hash/verify time", password_hasher.hash_ms)
+    registry.gauge("password_hash_in_flight", "Hash/verify operations admitted", lambda: password_hasher.in_flight)
+    registry.counter("password_hash_rejected_total", "Hash/verify operations rejected with 503",
+                     password_hasher.rejected)
+    registry.counter("password_rehashed_total", "Hashes upgraded on login", password_hasher.rehashed)
+    registry.counter("password_bulk_hashed_total", "Passwords hashed by the bulk import process pool",
+                     bulk_password_hasher.hashed)
+    registry.counter("auth_principal_cache_hits_total", "Principal cache hits", principal_cache.hits)
+    registry.counter("auth_principal_cache_misses_total", "Principal cache misses", principal_cache.misses)
+    registry.counter("auth_token_revocations_total", "Tokens revoked by this worker", token_denylist.revocations)
+    registry.gauge("auth_token_denylist_size", "Revoked tokens held in memory", lambda: len(token_denylist))
+    registry.counter("auth_token_denylist_filter_hits_total", "Denylist filter hits (revoked or false positive)",
+                     token_denylist.filter_hits)
+    registry.counter("auth_token_denylist_false_positives_total", "Filter hits not in the exact set",
+                     token_denylist.false_positives)
+
+    return registry
+
+
+metrics_registry = build_registry()
+
@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+
+from ...common.apiResponse import APIResponse, error_response, success_response
+from ...config import settings
+from ...common.ndjson import NDJSON_MEDIA_TYPE, iter_ndjson, iter_spool, spool_body
+from ...database import get_app_db, pool_stats
+from ...services.jobService import JobService
+from ...services.modelService import ModelService
+from ...services.userImportService import CSV_MEDIA_TYPES, UserImportService, iter_csv, read_csv_header
+from ...utils.principalCache import principal_cache
+from ...utils.profiler import profiler
+from ...utils.rateLimiter import rate_limit_stats
+from ...utils.security import bulk_password_hasher, password_hasher
+from ...utils.tokenDenylist import token_denylist
+from ...models.dto.adminDTO import ModelReloadRequestDTO, ProfileCaptureRequestDTO, RecalculateEntriesRequestDTO
+from ..deps import require_role
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_role("admin"))])
+
+
+@router.get("/model", response_model=APIResponse)
+def model_status():
+    return success_response(ModelService.status(), "Model registry status")
+
+
+@router.post("/model/reload", response_model=APIResponse)
+async def reload_model(body: ModelReloadRequestDTO = ModelReloadRequestDTO()):
+    try:
+        version = await ModelService.reload(body.filename, body.force)
+    except HTTPException as e:
+        return error_response("Model reload failed", e.status_code, e.detail)
+
+    message = "New model version is live" if version else "Model artifact unchanged"
+    return success_response(ModelService.status(), message)
+
+
+@router.get("/auth/stats", response_model=APIResponse)
+def auth_stats():
+    return success_response({
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "bulk_password_hasher": bulk_password_hasher.stats(),
+        "token_denylist": token_denylist.stats(),
+    }, "Auth statistics")
+
+
+@router.post(
+    "/users/import",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "text/csv": {"schema": {"type": "string", "description": "header: name,username,email,password"}},
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "description": '{"name", "username", "email", "password"} per line'}},
+            }
+        }
+    },
+)
+async def import_users(request: Request):
+    """
+    Bulk user creation from a CSV or NDJSON upload. Streams back one NDJSON
+    line per row ({"row", "username", "status": created|duplicate|invalid,
+    "id" or "error"}) in input order, then {"summary": {...}}.
+    """
+    content_type = request.headers.get("content-type", "")
+    spool = await spool_body(request.stream(), settings.UPLOAD_MAX_BYTES)
+    if content_type.startswith(CSV_MEDIA_TYPES):
+        try:
+            items = iter_csv(*read_csv_header(spool))
+        except (ValueError, UnicodeDecodeError) as e:
+            return error_response("Invalid CSV upload", 422, str(e))
+    elif content_type.startswith(NDJSON_MEDIA_TYPE):
+        items = iter_ndjson(iter_spool(spool), settings.NDJSON_MAX_LINE_BYTES)
+    else:
+        spool.close()
+        return error_response("Unsupported upload", 415, f"Send text/csv or {NDJSON_MEDIA_TYPE}")
+
+    return StreamingResponse(UserImportService.import_stream(items), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/rate-limits", response_model=APIResponse)
+def rate_limit_status():
+    return success_response(rate_limit_stats(), "Admission control statistics")
+
+
+@router.get("/db/stats", response_model=APIResponse)
+def db_stats():
+    return success_response(pool_stats(), "Connection pool statistics")
+
+
+@router.post("/recalculate_entries", response_model=APIResponse)
+async def recalculate_entries(body: RecalculateEntriesRequestDTO = RecalculateEntriesRequestDTO(),
+                              db=Depends(get_app_db)):
+    # queued for `python -m quietsignal_backend.services.jobWorker`, never scored in-request
+    job, created = await JobService.submit_rescore(db, body.only_stale, body.user_id)
+    message = "Re-scoring job queued" if created else "An identical job is already pending"
+    return success_response(job, message, 202)
+
+
+@router.get("/jobs", response_model=APIResponse)
+async def list_jobs(limit: int = Query(20, ge=1, le=100), db=Depends(get_app_db)):
+    return success_response(await JobService.recent(db, limit), "Recent jobs")
+
+
+@router.get("/jobs/{job_id}", response_model=APIResponse)
+async def job_status(job_id: int, db=Depends(get_app_db)):
+    return success_response(await JobService.get(db, job_id), "Job status")
+
+
+@router.post("/profiler/captures", response_model=APIResponse)
+async def start_capture(body: ProfileCaptureRequestDTO = ProfileCaptureRequestDTO()):
+    # async: the capture's deadline timer and cProfile both live on the event loop thread
+    capture = profiler.start(body.mode, body.requests, body.seconds, body.path_prefix)
+    message = "Profile capture started" if capture.status == "running" else "Waiting for matching requests"
+    return success_response(capture.to_dict(), message, 202)
+
+
+@router.post("/profiler/stop", response_model=APIResponse)
+async def stop_capture():
+    capture = profiler.stop()
+    if capture is None:
+        return success_response(None, "No capture running")
+    return success_response(capture.to_dict(), "Profile capture stopped")
+
+
+@router.get("/profiler/captures", response_model=APIResponse)
+async def list_captures():
+    return success_response(profiler.captures(), "Profile captures")
+
+
+@router.get("/profiler/captures/{capture_id}", response_model=APIResponse)
+async def capture_status(capture_id: str):
+    return success_response(profiler.get(capture_id).to_dict(), "Profile capture")
+
+
+@router.get("/profiler/captures/{capture_id}/download")
+async def download_capture(capture_id: str):
+    capture = profiler.get(capture_id)
+    if capture.file is None or not capture.file.exists():
+        raise HTTPException(status_code=404, detail="Capture has no file (yet)")
+    media_type = "text/plain; charset=utf-8" if capture.mode == "sample" else "application/octet-stream"
+    return FileResponse(capture.file, media_type=media_type, filename=capture.file.name)
@@ -1,31 +1,104 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Literal, Optional, Union
 
-from ...database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ...common.apiResponse import APIResponse, error_response, success_response
+from ...config import settings
+from ...common.ndjson import NDJSON_MEDIA_TYPE, iter_ndjson, iter_spool, spool_body
+from ...database import get_app_db
 from ...services.analyzeService import AnalyzeService
-from ...models.dto.analyzeDTO import AnalyzeRequestDTO, AnalyzeResponseDTO
+from ...services.rollupService import RollupService
+from ...models.dto.analyzeDTO import (
+    AnalyzeBatchRequestDTO,
+    AnalyzeRequestDTO,
+    AnalyzeResponseDTO,
+    SegmentedAnalyzeResponseDTO,
+    TrendsResponseDTO,
+)
+from ..deps import get_current_user, rate_limit, require_role
 
 router = APIRouter(prefix="/analyze", tags=["Analyze"])
 service = AnalyzeService()
 
 
-@router.post("/", response_model=dict)
-async def analyze(request: AnalyzeRequestDTO, db: Session = Depends(get_db)):
+@router.post("/", response_model=APIResponse[Union[SegmentedAnalyzeResponseDTO, AnalyzeResponseDTO]],
+             dependencies=[Depends(rate_limit("analyze", anonymous=True))])
+async def analyze(request: AnalyzeRequestDTO):
     try:
-        result = service.analyze(request)
-
-        # result is expected: { "label": str, "probabilities": dict }
-        return {
-            "success": True,
-            "status_code": 200,
-            "message": "Analysis completed successfully",
-            "data": result,
-        }
+        result = await service.analyze_request(request)
+        return success_response(result, "Analysis completed successfully")
 
+    except HTTPException:
+        # pool saturation (503) must reach the client as a real status code
+        raise
     except Exception as e:
-        return {
-            "success": False,
-            "status_code": 500,
-            "message": "Analysis failed",
-            "errors": str(e),
+        return error_response("Analysis failed", 500, str(e))
+
+
+async def _list_items(texts):
+    for text in texts:
+        yield text, None
+
+
+async def _ndjson_items(spool):
+    # each line is either a JSON string or {"text": "..."}
+    async for line_no, value, error in iter_ndjson(iter_spool(spool), settings.NDJSON_MAX_LINE_BYTES):
+        if error is None and isinstance(value, dict) and set(value) == {"text"}:
+            value = value["text"]
+        if error is None and not isinstance(value, str):
+            error = 'Expected a string or {"text": "..."}'
+        if error is not None:
+            yield None, f"line {line_no}: {error}"
+        else:
+            yield value, None
+
+
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    dependencies=[Depends(rate_limit("analyze", anonymous=True))],
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": AnalyzeBatchRequestDTO.model_json_schema()},
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+            }
         }
+    },
+)
+async def analyze_batch(request: Request):
+    """
+    Accepts {"texts": [...]} or an NDJSON upload and streams back one
+    AnalyzeResponseDTO per line (input order) as each chunk is scored.
+    """
+    spool = await spool_body(request.stream(), settings.UPLOAD_MAX_BYTES)
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        items = _ndjson_items(spool)
+    else:
+        with spool:
+            raw = spool.read()
+        try:
+            body = AnalyzeBatchRequestDTO.model_validate_json(raw)
+        except ValidationError as e:
+            return error_response("Invalid batch request", 422, e.errors(include_url=False, include_context=False))
+        items = _list_items(body.texts)
+
+    return StreamingResponse(service.analyze_stream(items), media_type=NDJSON_MEDIA_TYPE)
+
+
+# queue and batching internals, same audience as the other operator stats
+@router.get("/stats", response_model=APIResponse, dependencies=[Depends(require_role("admin"))])
+async def batching_stats():
+    return success_response(service.batching_stats(), "Batching statistics")
+
+
+@router.get("/trends", response_model=APIResponse[TrendsResponseDTO])
+async def trends(period: Literal["day", "week", "month"] = "day",
+                 start: Optional[date] = None, end: Optional[date] = None,
+                 user=Depends(get_current_user), db=Depends(get_app_db)):
+    # precomputed rollups only, no entry scans and no inference
+    result = await RollupService.trends(db, user, period, start, end)
+    return success_response(result, "Mood trends")
@@ -1,104 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from ...database import get_db
-from ...services.authService import AuthService
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from ...common.apiResponse import APIResponse, error_response, success_response
+from ...config import settings
+from ...database import get_app_db
+from ...services.authService import AuthService, TokenPair
+from ...utils.jwtHandler import REFRESH
+from ...utils.rateLimiter import rate_limits
 from ...models.dto.userDTO import (
-    TokenResponseDTO,
+    LoginResponseDTO,
+    RefreshRequestDTO,
     UserCreateDTO,
     UserOutDTO,
     LoginRequestDTO,
 )
-from ..deps import get_current_user_or_none
+from ..deps import get_current_user_or_none, get_token_from_request
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-
-@router.post("/register")
-def register(user_data: UserCreateDTO, db: Session = Depends(get_db)):
+# the refresh cookie is only ever sent to /auth/refresh and /auth/logout
+REFRESH_COOKIE_PATH = "/auth"
+
+
+def _token_response(tokens: TokenPair, user, message: str):
+    # the cookies go on the response we return, an injected Response would be ignored
+    response = success_response(
+        LoginResponseDTO(
+            access_token=tokens.access_token,
+            refresh_token=tokens.refresh_token,
+            expires_in=tokens.expires_in,
+            user=UserOutDTO.model_validate(user),
+        ),
+        message,
+    )
+    response.set_cookie(
+        key="access_token",
+        value=tokens.access_token,
+        httponly=True,
+        secure=False,
+        samesite="lax",
+        max_age=tokens.expires_in,
+    )
+    response.set_cookie(
+        key="refresh_token",
+        value=tokens.refresh_token,
+        httponly=True,
+        secure=False,
+        samesite="lax",
+        max_age=int(settings.refresh_token_expires.total_seconds()),
+        path=REFRESH_COOKIE_PATH,
+    )
+    return response
+
+
+@router.post("/register", response_model=APIResponse[UserOutDTO])
+async def register(user_data: UserCreateDTO, db=Depends(get_app_db)):
     try:
-        user = AuthService.register(db, user_data)
-        return {
-            "success": True,
-            "status_code": 201,
-            "message": "User registered successfully",
-            "data": UserOutDTO.model_validate(user),
-        }
+        user = await AuthService.register_async(db, user_data)
+        return success_response(UserOutDTO.model_validate(user), "User registered successfully", 201)
     except HTTPException as e:
-        return {
-            "success": False,
-            "status_code": e.status_code,
-            "message": "Registration failed",
-            "errors": e.detail,
-        }
+        if e.status_code == 503:
+            # hashing pool saturated, let the client see a real 503 + Retry-After
+            raise
+        return error_response("Registration failed", e.status_code, e.detail)
 
 
-@router.post("/login")
-def login(response: Response, login_data: LoginRequestDTO, db: Session = Depends(get_db)):
+@router.post("/login", response_model=APIResponse[LoginResponseDTO])
+async def login(login_data: LoginRequestDTO, db=Depends(get_app_db)):
     try:
-        result = AuthService.authenticate(db, login_data.username, login_data.password)
+        if settings.RATE_LIMIT_ENABLED:
+            # per attempted username, so one account can't be brute-forced from many IPs
+            rate_limits["auth"].check_user(login_data.username)
+        result = await AuthService.authenticate_async(db, login_data.username, login_data.password)
 
         if not result:
-            return {
-                "success": False,
-                "status_code": 401,
-                "message": "Incorrect username or password",
-                "errors": "Invalid credentials",
-            }
-
-        token, user = result
-
-        response.set_cookie(
-            key="access_token",
-            value=token,
-            httponly=True,
-            secure=False,
-            samesite="lax",
-            max_age=60 * 60 * 24,
-        )
-
-        return {
-            "success": True,
-            "status_code": 200,
-            "message": "Login successful",
-            "data": {
-                "access_token": token,
-                "user": UserOutDTO.model_validate(user),
-            },
-        }
+            return error_response("Incorrect username or password", 401, "Invalid credentials")
 
+        tokens, user = result
+        return _token_response(tokens, user, "Login successful")
+
+    except HTTPException:
+        raise
     except Exception as e:
-        return {
-            "success": False,
-            "status_code": 500,
-            "message": "Login error",
-            "errors": str(e),
-        }
+        return error_response("Login error", 500, str(e))
+
 
+@router.post("/refresh", response_model=APIResponse[LoginResponseDTO])
+async def refresh(request: Request, body: Optional[RefreshRequestDTO] = None, db=Depends(get_app_db)):
+    token = (body.refresh_token if body else None) or request.cookies.get("refresh_token")
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing refresh token")
 
-@router.post("/logout")
-def logout(response: Response):
+    tokens, user = await AuthService.refresh_async(db, token)
+    return _token_response(tokens, user, "Token refreshed")
+
+
+@router.post("/logout", response_model=APIResponse)
+async def logout(request: Request, body: Optional[RefreshRequestDTO] = None):
+    # revoke both tokens so neither outlives the session, even if copied elsewhere
+    AuthService.revoke(get_token_from_request(request))
+    AuthService.revoke((body.refresh_token if body else None) or request.cookies.get("refresh_token"), REFRESH)
+
+    response = success_response(message="Logged out")
     response.delete_cookie("access_token")
-    return {
-        "success": True,
-        "status_code": 200,
-        "message": "Logged out",
-    }
+    response.delete_cookie("refresh_token", path=REFRESH_COOKIE_PATH)
+    return response
 
 
-@router.get("/me")
-def me(user=Depends(get_current_user_or_none)):
+@router.get("/me", response_model=APIResponse[UserOutDTO])
+async def me(user=Depends(get_current_user_or_none)):
     if not user:
-        return {
-            "success": False,
-            "status_code": 401,
-            "message": "Not authenticated",
-            "data": None,
-        }
-
-    return {
-        "success": True,
-        "status_code": 200,
-        "message": "Fetched user",
-        "data": UserOutDTO.model_validate(user),
-    }
+        return error_response("Not authenticated", 401)
+
+    return success_response(UserOutDTO.model_validate(user), "Fetched user")
@@ -0,0 +1,91 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ...common.apiResponse import APIResponse, error_response, success_response
+from ...config import settings
+from ...database import get_app_db
+from ...services.journalService import JournalService
+from ...models.dto.journalDTO import (
+    EntryAppendBatchDTO,
+    EntryAppendDTO,
+    EntryBatchCreateDTO,
+    EntryCreateDTO,
+    EntryOutDTO,
+    EntryPageDTO,
+    JournalOutDTO,
+    JournalPageDTO,
+)
+from ..deps import get_current_user, rate_limit
+
+router = APIRouter(prefix="/journals", tags=["Journals"])
+
+# entry writes score their text with the model
+ScoringLimit = [Depends(rate_limit("analyze"))]
+PageLimit = Query(settings.JOURNAL_PAGE_SIZE, ge=1, le=settings.JOURNAL_MAX_PAGE_SIZE)
+
+
+@router.get("/", response_model=APIResponse[JournalPageDTO])
+async def list_journals(limit: int = PageLimit, cursor: Optional[str] = None,
+                        user=Depends(get_current_user), db=Depends(get_app_db)):
+    page = await JournalService.list_journals(db, user, limit, cursor)
+    return success_response(page, "Fetched journals")
+
+
+@router.post("/", response_model=APIResponse[JournalOutDTO])
+async def create_journal(title: str = Query(..., min_length=1, max_length=200),
+                         user=Depends(get_current_user), db=Depends(get_app_db)):
+    journal = await JournalService.create_journal(db, user, title)
+    return success_response(journal, "Journal created", 201)
+
+
+@router.post("/{journal_id}/entries", response_model=APIResponse[EntryOutDTO], dependencies=ScoringLimit)
+async def create_entry(journal_id: int, body: EntryCreateDTO,
+                       user=Depends(get_current_user), db=Depends(get_app_db)):
+    try:
+        entry = await JournalService.create_entry(db, user, journal_id, body.content)
+        return success_response(entry, "Entry created", 201)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response("Entry creation failed", 500, str(e))
+
+
+@router.post("/{journal_id}/entries/batch", response_model=APIResponse, dependencies=ScoringLimit)
+async def import_entries(journal_id: int, body: EntryBatchCreateDTO,
+                         user=Depends(get_current_user), db=Depends(get_app_db)):
+    try:
+        created = await JournalService.import_entries(db, user, journal_id, body.contents)
+        return success_response({"created": created}, "Entries imported", 201)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response("Entry import failed", 500, str(e))
+
+
+@router.get("/{journal_id}/entries", response_model=APIResponse[EntryPageDTO])
+async def list_entries(journal_id: int, limit: int = PageLimit, cursor: Optional[str] = None,
+                       user=Depends(get_current_user), db=Depends(get_app_db)):
+    page = await JournalService.list_entries(db, user, journal_id, limit, cursor)
+    return success_response(page, "Fetched entries")
+
+
+@router.get("/{journal_id}/entries/{entry_id}", response_model=APIResponse[EntryOutDTO])
+async def get_entry(journal_id: int, entry_id: int,
+                    user=Depends(get_current_user), db=Depends(get_app_db)):
+    entry = await JournalService.get_entry(db, user, journal_id, entry_id)
+    return success_response(entry, "Fetched entry")
+
+
+@router.post("/{journal_id}/entries/{entry_id}/append", response_model=APIResponse[EntryOutDTO], dependencies=ScoringLimit)
+async def append_paragraph(journal_id: int, entry_id: int, body: EntryAppendDTO,
+                           user=Depends(get_current_user), db=Depends(get_app_db)):
+    entry = await JournalService.append(db, user, journal_id, entry_id, [body.paragraph])
+    return success_response(entry, "Paragraph appended")
+
+
+@router.post("/{journal_id}/entries/{entry_id}/append-batch", response_model=APIResponse[EntryOutDTO], dependencies=ScoringLimit)
+async def append_paragraphs(journal_id: int, entry_id: int, body: EntryAppendBatchDTO,
+                            user=Depends(get_current_user), db=Depends(get_app_db)):
+    entry = await JournalService.append(db, user, journal_id, entry_id, body.paragraphs)
+    return success_response(entry, "Paragraphs appended")
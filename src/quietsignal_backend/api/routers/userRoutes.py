@@ -1,38 +1,25 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
 
+from ...common.apiResponse import APIResponse, error_response, success_response
 from ...models.dto.userDTO import UserCreateDTO, UserOutDTO
 from ...services.userService import UserService
-from ...database import get_db
+from ...database import get_app_db
 from ...api.deps import get_current_user
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.post("/")
-def create_user(user_in: UserCreateDTO, db: Session = Depends(get_db)):
+@router.post("/", response_model=APIResponse[UserOutDTO])
+async def create_user(user_in: UserCreateDTO, db=Depends(get_app_db)):
     try:
-        user = UserService.create_user(db, user_in)
-        return {
-            "success": True,
-            "status_code": 201,
-            "message": "User created",
-            "data": UserOutDTO.model_validate(user),
-        }
+        user = await UserService.create_user_async(db, user_in)
+        return success_response(UserOutDTO.model_validate(user), "User created", 201)
+    except HTTPException:
+        raise
     except Exception as e:
-        return {
-            "success": False,
-            "status_code": 500,
-            "message": "User creation failed",
-            "errors": str(e),
-        }
+        return error_response("User creation failed", 500, str(e))
 
 
-@router.get("/me")
-def me(user=Depends(get_current_user)):
-    return {
-        "success": True,
-        "status_code": 200,
-        "message": "Fetched user",
-        "data": UserOutDTO.model_validate(user),
-    }
+@router.get("/me", response_model=APIResponse[UserOutDTO])
+async def me(user=Depends(get_current_user)):
+    return success_response(UserOutDTO.model_validate(user), "Fetched user")
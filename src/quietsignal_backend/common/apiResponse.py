@@ -1,17 +1,62 @@
-from typing import Any, Optional
+from typing import Any, Generic, Mapping, Optional, TypeVar
+
 from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
+
+class APIResponse(BaseModel, Generic[T]):
+    """
+    The envelope every JSON route answers with. `status_code` is the
+    outcome of the operation; the HTTP status stays 200 unless the request
+    itself failed (see main.http_exception_handler). `errors` is only
+    rendered when set.
 
-class APIResponse(BaseModel):
-    code: int
-    message: str
-    data: Optional[Any] = None
+    Parametrize it for the OpenAPI schema (response_model=APIResponse[UserOutDTO]);
+    at runtime routes return EnvelopeResponse, so FastAPI skips its
+    validate-then-jsonable_encoder pass entirely.
+    """
+    success: bool = True
+    status_code: int = status.HTTP_200_OK
+    message: str = "Success"
+    data: Optional[T] = None
+    errors: Optional[Any] = None
 
     @staticmethod
-    def success(data: Any = None, message: str = "Success", code: int = status.HTTP_200_OK):
-        return APIResponse(code=code, message=message, data=data)
+    def ok(data: Any = None, message: str = "Success", code: int = status.HTTP_200_OK) -> "APIResponse":
+        # model_construct: the payload is already typed (DTOs), nothing to validate
+        return APIResponse.model_construct(success=True, status_code=code, message=message, data=data)
 
     @staticmethod
-    def error(message: str, code: int):
-        return APIResponse(code=code, message=message, data=None)
+    def fail(message: str, code: int, errors: Any = None) -> "APIResponse":
+        return APIResponse.model_construct(success=False, status_code=code, message=message, data=None, errors=errors)
+
+
+_serializer = APIResponse.__pydantic_serializer__
+
+
+class EnvelopeResponse(JSONResponse):
+    """
+    Renders an APIResponse straight to bytes with pydantic-core's JSON
+    serializer. Nested DTOs, datetimes and dicts are encoded in one pass;
+    anything pydantic doesn't know falls back to jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, APIResponse):
+            exclude = {"errors"} if content.errors is None else None
+            return _serializer.to_json(content, exclude=exclude, fallback=jsonable_encoder)
+        return super().render(content)
+
+
+def success_response(data: Any = None, message: str = "Success", code: int = status.HTTP_200_OK,
+                     headers: Optional[Mapping[str, str]] = None) -> EnvelopeResponse:
+    return EnvelopeResponse(APIResponse.ok(data, message, code), headers=headers)
+
+
+def error_response(message: str, code: int, errors: Any = None, http_status: int = status.HTTP_200_OK,
+                   headers: Optional[Mapping[str, str]] = None) -> EnvelopeResponse:
+    return EnvelopeResponse(APIResponse.fail(message, code, errors), status_code=http_status, headers=headers)
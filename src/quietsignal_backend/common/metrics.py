@@ -0,0 +1,190 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+class Counter:
+    """Monotonic counter, safe to bump from worker threads."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Buckets are upper bounds (inclusive), an implicit
+    +Inf bucket catches everything above the last one.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative = 0
+        buckets = {}
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            cumulative += c
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+
+        return {
+            "count": count,
+            "sum": total,
+            "avg": (total / count) if count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class Gauge:
+    """Value that goes up and down (in-flight requests, pool occupancy)."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class HistogramFamily:
+    """One Histogram per label combination, created on first use."""
+
+    def __init__(self, label_names: Sequence[str], buckets: Sequence[float]):
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def collect(self) -> List[Tuple[Dict[str, str], Dict]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.label_names, values)), child.snapshot()) for values, child in children]
+
+
+# (labels, value) pairs; value is a number, or a Histogram.snapshot() for histograms
+Samples = Iterable[Tuple[Dict[str, str], Any]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value is None:
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Named metrics rendered in the Prometheus text exposition format (0.0.4).
+
+    Sources are read at scrape time: a Counter / Gauge / Histogram /
+    HistogramFamily, or a callable returning a number or (labels, value)
+    samples, so existing stats objects can be exported without moving them.
+    """
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: List[Tuple[str, str, str, Any]] = []
+
+    def register(self, name: str, kind: str, help_text: str, source: Any) -> None:
+        if kind not in ("counter", "gauge", "histogram"):
+            raise ValueError(f"Unknown metric type: {kind}")
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        self._metrics.append((full_name, kind, help_text, source))
+
+    def counter(self, name: str, help_text: str, source: Any) -> None:
+        self.register(name, "counter", help_text, source)
+
+    def gauge(self, name: str, help_text: str, source: Any) -> None:
+        self.register(name, "gauge", help_text, source)
+
+    def histogram(self, name: str, help_text: str, source: Any) -> None:
+        self.register(name, "histogram", help_text, source)
+
+    @staticmethod
+    def _samples(source: Any) -> Samples:
+        if isinstance(source, HistogramFamily):
+            return source.collect()
+        if isinstance(source, Histogram):
+            return [({}, source.snapshot())]
+        if isinstance(source, (Counter, Gauge)):
+            return [({}, source.value)]
+        value = source()
+        if value is None or isinstance(value, (int, float)):
+            return [({}, value)]
+        return value
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, kind, help_text, source in self._metrics:
+            try:
+                samples = list(self._samples(source))
+            except Exception as exc:
+                # one broken source must not take the whole scrape down
+                print(f"[METRICS] Collecting {name} failed: {exc}")
+                continue
+
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                for bound, count in value["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(value['sum']))}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,98 @@
+import json
+import tempfile
+from typing import IO, Any, AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+SPOOL_MAX_MEMORY = 1 << 20   # request bodies above 1 MiB go to a temp file
+SPOOL_READ_SIZE = 64 * 1024
+DEFAULT_MAX_LINE = 1 << 20
+
+
+async def spool_body(stream: AsyncIterator[bytes], max_bytes: Optional[int] = None) -> IO[bytes]:
+    """
+    Drains a request body into a spooled temp file.
+    Starlette's StreamingResponse listens on receive() for disconnects, so an
+    upload can't be consumed lazily while the response streams - spooling keeps
+    memory bounded without holding the whole body in RAM.
+    Raises 413 as soon as more than max_bytes arrive.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    size = 0
+    async for chunk in stream:
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            spool.close()
+            raise HTTPException(status_code=413, detail=f"Request body larger than {max_bytes} bytes")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def iter_spool(spool: IO[bytes]) -> AsyncIterator[bytes]:
+    try:
+        while chunk := spool.read(SPOOL_READ_SIZE):
+            yield chunk
+    finally:
+        spool.close()
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes],
+                      max_line: int = DEFAULT_MAX_LINE) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Parses an NDJSON byte stream incrementally.
+    Yields (line_number, value, error) - value is None when the line is invalid.
+    Blank lines are skipped, only one partial line is ever buffered. A line
+    longer than max_line bytes is reported as an error and skipped without
+    being buffered.
+    """
+    buffer = bytearray()
+    line_no = 0
+    # inside a line that already went over max_line, dropped up to its newline
+    skipping = False
+    too_long = f"Line longer than {max_line} bytes"
+
+    async for chunk in stream:
+        # every byte is scanned once, the partial line is only ever appended to
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            line_no += 1
+            if skipping:
+                skipping = False
+            elif len(buffer) + end - start > max_line:
+                yield line_no, None, too_long
+            else:
+                buffer += chunk[start:end]
+                parsed = _parse_line(line_no, buffer)
+                if parsed is not None:
+                    yield parsed
+            buffer.clear()
+            start = end + 1
+
+        if not skipping:
+            buffer += chunk[start:]
+            if len(buffer) > max_line:
+                buffer.clear()
+                skipping = True
+                yield line_no + 1, None, too_long
+
+    if buffer:
+        parsed = _parse_line(line_no + 1, buffer)
+        if parsed is not None:
+            yield parsed
+
+
+def _parse_line(line_no: int, raw: bytes) -> Optional[Tuple[int, Any, Optional[str]]]:
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        return line_no, json.loads(raw), None
+    except ValueError as exc:
+        return line_no, None, f"Invalid JSON: {exc}"
+
+
+def dumps_line(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":")) + "\n"
@@ -0,0 +1,40 @@
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+
+# metric name -> accumulated ms for the current request; None outside a request
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timings", default=None)
+
+
+def begin() -> Token:
+    """Starts collecting for a request, called by the metrics middleware."""
+    return _timings.set({})
+
+
+def end(token: Token) -> None:
+    _timings.reset(token)
+
+
+def current() -> Optional[Dict[str, float]]:
+    return _timings.get()
+
+
+def record(name: str, ms: float) -> None:
+    """
+    Adds `ms` under `name` for the request being served, a no-op otherwise
+    (job worker, CLI). The dict is shared by reference, so threadpool and
+    executor callbacks running in a copied context still land in it.
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + ms
+
+
+def record_many(values: Dict[str, float]) -> None:
+    for name, ms in values.items():
+        record(name, ms)
+
+
+def header_value(timings: Dict[str, float], total_ms: float) -> str:
+    parts = [f"{name};dur={ms:.2f}" for name, ms in timings.items()]
+    parts.append(f"app;dur={total_ms:.2f}")
+    return ", ".join(parts)
@@ -2,6 +2,7 @@ from datetime import timedelta
 from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -9,7 +10,53 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str 
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # access tokens are short-lived, POST /auth/refresh trades a refresh token for a new pair
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # Revoked token ids (logout, refresh rotation): "local" or "package.module:BackendClass"
+    # to share revocations between workers; entries live until the token's exp
+    TOKEN_DENYLIST_BACKEND: str = "local"
+    TOKEN_DENYLIST_CAPACITY: int = 100000
+    TOKEN_DENYLIST_ERROR_RATE: float = 0.001
+    TOKEN_DENYLIST_SYNC_S: float = 1.0
+    TOKEN_DENYLIST_PRUNE_S: float = 300.0
+
+    # Auth principal cache (0 disables), stateless mode trusts signed token claims
+    AUTH_PRINCIPAL_CACHE_TTL_S: float = 30.0
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_STATELESS: bool = False
+
+    # Admission control: "analyze" = /analyze and journal entry writes (model), "auth" =
+    # login/register/refresh/user creation (pbkdf2). Token buckets refill at *_PER_S up to
+    # *_BURST, per client IP and per user; 0 disables. Empty bucket -> 429, more than
+    # CONCURRENCY_LIMIT_* requests in flight -> 503, both with Retry-After
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_ANALYZE_IP_PER_S: float = 20.0
+    RATE_LIMIT_ANALYZE_IP_BURST: int = 40
+    RATE_LIMIT_ANALYZE_USER_PER_S: float = 10.0
+    RATE_LIMIT_ANALYZE_USER_BURST: int = 30
+    RATE_LIMIT_AUTH_IP_PER_S: float = 2.0
+    RATE_LIMIT_AUTH_IP_BURST: int = 20
+    # per username attempted at /auth/login
+    RATE_LIMIT_AUTH_USER_PER_S: float = 0.2
+    RATE_LIMIT_AUTH_USER_BURST: int = 5
+    CONCURRENCY_LIMIT_ANALYZE: int = 64
+    CONCURRENCY_LIMIT_AUTH: int = 32
+    # buckets kept per table; idle (full) buckets are dropped before this is reached
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # client IP from the last X-Forwarded-For hop; only behind a proxy you control
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+
+    # Password hashing pool; changing the rounds rehashes users on their next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_ROUNDS: Optional[int] = None
+
+    # POST /admin/users/import: rows per duplicate check / hash fan-out / INSERT transaction,
+    # hashing processes (0 = one per CPU)
+    USER_IMPORT_CHUNK_SIZE: int = 1000
+    USER_IMPORT_HASH_WORKERS: int = 0
 
     # MySQL pieces (from .env)
     mysql_user: str
@@ -17,6 +64,99 @@ class Settings(BaseSettings):
     mysql_host: str = "localhost"
     mysql_port: int = 3306
     mysql_db: str
+    # read replica for read-heavy lookups (per-request auth), same credentials and db name
+    mysql_replica_host: Optional[str] = None
+    mysql_replica_port: Optional[int] = None
+    # full SQLAlchemy URL, overrides the mysql_* pieces (e.g. sqlite for local runs)
+    DB_URL: Optional[str] = None
+
+    # Connection pool, applied to every engine built by database/engine.py
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_S: float = 30.0
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # compiled statement cache entries per engine, 0 disables
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # async DAO path for auth/user routes (needs the "async" extra); the URL
+    # defaults to DATABASE_URL with the aiomysql / aiosqlite driver
+    DB_ASYNC_ENABLED: bool = False
+    DB_ASYNC_URL: Optional[str] = None
+
+    # Startup: create/migrate the schema (guarded by a MySQL advisory lock);
+    # turn off when `python -m quietsignal_backend.startup init-db` runs as a deploy step
+    DB_INIT_ON_STARTUP: bool = True
+    DB_INIT_LOCK_TIMEOUT_S: int = 60
+    # connections opened while the model loads, so first requests skip the connect
+    DB_WARMUP_CONNECTIONS: int = 2
+
+    # Inference micro-batching (POST /analyze)
+    INFERENCE_BATCH_WINDOW_MS: float = 5.0
+    INFERENCE_BATCH_MAX_SIZE: int = 32
+
+    # Inference worker pool: "thread" or "process"
+    INFERENCE_EXECUTOR: str = "thread"
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_MAX_QUEUE: int = 64
+
+    # POST /analyze/batch: texts per predict_proba call
+    ANALYZE_BATCH_CHUNK_SIZE: int = 256
+    # uploads (/analyze/batch): larger bodies get a 413, longer NDJSON lines a
+    # per-line error
+    UPLOAD_MAX_BYTES: int = 64 * 1024 * 1024
+    NDJSON_MAX_LINE_BYTES: int = 1024 * 1024
+
+    # Prediction cache: "local" or "package.module:BackendClass"
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_BACKEND: str = "local"
+    PREDICTION_CACHE_SIZE: int = 10000
+    PREDICTION_CACHE_TTL_S: Optional[float] = None
+
+    # Journals: default/max page size for keyset listings, rows per
+    # predict_proba + executemany INSERT in bulk entry imports
+    JOURNAL_PAGE_SIZE: int = 20
+    JOURNAL_MAX_PAGE_SIZE: int = 100
+    ENTRY_IMPORT_CHUNK_SIZE: int = 500
+    # entries read per query when rebuilding the mood rollups
+    ROLLUP_REBUILD_CHUNK_SIZE: int = 5000
+
+    # Background jobs (services/jobWorker.py): entries per scoring batch,
+    # lease renewed after every batch, failed jobs retried up to MAX_ATTEMPTS
+    JOB_BATCH_SIZE: int = 1000
+    JOB_LEASE_S: float = 120.0
+    JOB_POLL_INTERVAL_S: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Instrumentation: GET /metrics in Prometheus text format, per-request
+    # Server-Timing header (queue/vectorize/predict/db/hash breakdown)
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    # Admin-triggered profiling (/admin/profiler); off = middleware not installed.
+    # Captures are written to PROFILER_DIR, the last PROFILER_KEEP are kept
+    PROFILER_ENABLED: bool = False
+    PROFILER_DIR: str = "profiles"
+    PROFILER_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILER_MAX_SECONDS: float = 60.0
+    PROFILER_KEEP: int = 20
+
+    # Multi-paragraph analysis: segments scored per request (rest is dropped)
+    ANALYZE_MAX_SEGMENTS: int = 64
+
+    # Model loading: "r" memory-maps the arrays of an uncompressed artifact,
+    # MODEL_PRELOAD loads at import (only for gunicorn --preload sharing,
+    # otherwise the model is loaded during startup)
+    MODEL_MMAP_MODE: Optional[str] = None
+    MODEL_PRELOAD: bool = False
+    # seconds between checks of mlmodel/Model.joblib for a new version, 0 disables
+    MODEL_WATCH_INTERVAL_S: float = 0.0
+    # serve linear text pipelines through ml/compiledModel (falls back automatically)
+    MODEL_COMPILED: bool = False
+    # Cascade: a cheap first-stage model (mlmodel/MODEL_CASCADE_FILENAME, built by
+    # `python -m quietsignal_backend.ml.cascade train`) scores every text; only texts
+    # whose top probability is below MODEL_CASCADE_THRESHOLD go on to Model.joblib
+    MODEL_CASCADE_ENABLED: bool = False
+    MODEL_CASCADE_FILENAME: str = "Cascade.joblib"
+    MODEL_CASCADE_THRESHOLD: float = 0.9
 
     class Config:
         extra = "ignore"
@@ -25,16 +165,32 @@ class Settings(BaseSettings):
 
     @property
     def DATABASE_URL(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
         return (
             f"mysql+mysqlconnector://{self.mysql_user}:"
             f"{self.mysql_password}@{self.mysql_host}:"
             f"{self.mysql_port}/{self.mysql_db}"
         )
 
+    @property
+    def REPLICA_DATABASE_URL(self) -> Optional[str]:
+        if not self.mysql_replica_host:
+            return None
+        return (
+            f"mysql+mysqlconnector://{self.mysql_user}:"
+            f"{self.mysql_password}@{self.mysql_replica_host}:"
+            f"{self.mysql_replica_port or self.mysql_port}/{self.mysql_db}"
+        )
+
     @property
     def access_token_expires(self) -> timedelta:
         return timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
 
+    @property
+    def refresh_token_expires(self) -> timedelta:
+        return timedelta(days=self.REFRESH_TOKEN_EXPIRE_DAYS)
+
 
 @lru_cache
 def get_settings() -> Settings:
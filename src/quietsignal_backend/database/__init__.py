@@ -1,3 +1,6 @@
 from .base import Base
-from .engine import engine
-from .session import get_db
+from .engine import engine, read_engine, create_db_engine, create_async_db_engine
+from .asyncSession import async_engine, AsyncSessionLocal
+from .lazySession import LazySession
+from .session import SessionLocal, ReadSessionLocal, get_read_db, get_app_db, run_db
+from .poolMetrics import pool_stats
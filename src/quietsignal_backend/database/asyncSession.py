@@ -0,0 +1,13 @@
+from ..config import settings
+from .engine import DATABASE_URL, create_async_db_engine, to_async_url
+
+# only built when DB_ASYNC_ENABLED, the async drivers are an optional extra
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_db_engine(settings.DB_ASYNC_URL or to_async_url(DATABASE_URL))
+    # expire_on_commit=False: attributes can't lazy-load outside the session's greenlet
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
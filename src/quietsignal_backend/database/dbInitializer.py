@@ -1,7 +1,14 @@
 import os
-from sqlalchemy import inspect, text
+from contextlib import contextmanager
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.pool import NullPool
 from quietsignal_backend.database import engine, Base
+from quietsignal_backend.database.engine import ensure_database
+# register every table on Base.metadata, also when run outside the app
+import quietsignal_backend.models.entities  # noqa: F401
+
+SCHEMA_LOCK_NAME = "quietsignal_schema_init"
 
 # Define schema required for each table
 # Add your tables + required columns here
@@ -17,7 +24,8 @@ REQUIRED_SCHEMAS = {
 }
 
 def create_database_if_not_exists(engine):
-    """For SQLite or file-based DBs — ensure the file exists."""
+    """MySQL: CREATE DATABASE IF NOT EXISTS. SQLite or file-based DBs: ensure the file exists."""
+    ensure_database()
     url = str(engine.url)
 
     if url.startswith("sqlite:///"):
@@ -26,6 +34,47 @@ def create_database_if_not_exists(engine):
             print(f"[DB INIT] Creating new SQLite database: {db_file}")
             open(db_file, "w").close()
 
+@contextmanager
+def schema_lock(timeout: int):
+    """
+    MySQL advisory lock so only one worker runs DDL at a time; yields whether it
+    was acquired. Taken on a server-level connection because the database may
+    not exist yet. Other backends have nothing to coordinate with, always True.
+    """
+    if engine.url.get_backend_name() != "mysql":
+        yield True
+        return
+
+    server_engine = create_engine(engine.url.set(database=""), poolclass=NullPool)
+    try:
+        with server_engine.connect() as conn:
+            acquired = conn.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"), {"name": SCHEMA_LOCK_NAME, "timeout": timeout}
+            ).scalar() == 1
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": SCHEMA_LOCK_NAME})
+    finally:
+        server_engine.dispose()
+
+def schema_is_current(engine) -> bool:
+    """True when every mapped table and every REQUIRED_SCHEMAS column exists (one inspector pass)."""
+    try:
+        inspector = inspect(engine)
+        tables = set(inspector.get_table_names())
+    except Exception:
+        # e.g. the MySQL database itself doesn't exist yet
+        return False
+    if not set(Base.metadata.tables) <= tables:
+        return False
+    for table_name, required_cols in REQUIRED_SCHEMAS.items():
+        existing_cols = {col["name"] for col in inspector.get_columns(table_name)}
+        if not set(required_cols) <= existing_cols:
+            return False
+    return True
+
 def create_missing_tables(engine):
     """Creates tables that do not exist."""
     print("[DB INIT] Creating missing tables if necessary...")
@@ -54,6 +103,10 @@ def add_missing_columns(engine):
 
 def initialize_database():
     print("[DB INIT] Starting database initialization...")
+    if schema_is_current(engine):
+        # the common case once one worker (or the deploy step) has done it
+        print("[DB INIT] Schema is up to date, nothing to do.")
+        return
     create_database_if_not_exists(engine)
     create_missing_tables(engine)
     add_missing_columns(engine)
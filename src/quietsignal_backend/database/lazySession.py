@@ -0,0 +1,40 @@
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+
+class LazySession:
+    """
+    Stands in for a Session and only builds it on first attribute access, so a
+    request that never queries (principal cache hit, stateless token) costs no
+    session and no pooled connection. Everything else is forwarded as is.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: Callable[[], Session]):
+        self._factory = factory
+        self._session: Optional[Session] = None
+
+    @property
+    def materialized(self) -> bool:
+        return self._session is not None
+
+    def _get(self) -> Session:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,148 @@
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from ..common import serverTiming
+from ..common.metrics import Counter, Histogram
+
+WAIT_MS_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, 30000)
+HOLD_MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+QUERY_MS_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+LIFETIME_S_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 14400)
+
+
+class PoolMetrics:
+    """Checkout wait and hold time, query time and connection lifetime for one engine."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait_ms = Histogram(WAIT_MS_BUCKETS)
+        self.checkout_hold_ms = Histogram(HOLD_MS_BUCKETS)
+        self.query_ms = Histogram(QUERY_MS_BUCKETS)
+        self.connection_lifetime_s = Histogram(LIFETIME_S_BUCKETS)
+        self.connects = Counter()
+        self.invalidations = Counter()
+        self.checkout_timeouts = Counter()
+        self.engine: Optional[Engine] = None
+
+    def stats(self) -> Dict:
+        pool = self.engine.pool if self.engine is not None else None
+        data = {
+            "pool": type(pool).__name__ if pool is not None else None,
+            "connects": self.connects.value,
+            "invalidations": self.invalidations.value,
+            "checkout_timeouts": self.checkout_timeouts.value,
+            "checkout_wait_ms": self.checkout_wait_ms.snapshot(),
+            "checkout_hold_ms": self.checkout_hold_ms.snapshot(),
+            "query_ms": self.query_ms.snapshot(),
+            "connection_lifetime_s": self.connection_lifetime_s.snapshot(),
+        }
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return data
+
+
+class _CheckoutTimingMixin:
+    """
+    Times how long callers wait for a connection. The wait is only visible
+    inside _do_get, pool events fire after a connection was found.
+    """
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        metrics = self.metrics
+        if metrics is None:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.checkout_timeouts.inc()
+            raise
+        finally:
+            wait_ms = (time.perf_counter() - start) * 1000
+            metrics.checkout_wait_ms.observe(wait_ms)
+            serverTiming.record("db-wait", wait_ms)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool, keep reporting to the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolMetrics:
+    """
+    Attaches pool listeners to `engine` and registers its metrics under `name`.
+    For an AsyncEngine pass its sync_engine, that's where the pool lives.
+    """
+    metrics = PoolMetrics(name)
+    metrics.engine = engine
+    if isinstance(engine.pool, _CheckoutTimingMixin):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["connected_at"] = time.monotonic()
+        metrics.connects.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.checkout_hold_ms.observe((time.perf_counter() - checked_out_at) * 1000)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is not None:
+            query_ms = (time.perf_counter() - started_at) * 1000
+            metrics.query_ms.observe(query_ms)
+            serverTiming.record("db", query_ms)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations.inc()
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        connected_at = connection_record.info.pop("connected_at", None)
+        if connected_at is not None:
+            metrics.connection_lifetime_s.observe(time.monotonic() - connected_at)
+
+    pool_metrics[name] = metrics
+    return metrics
+
+
+def pool_stats() -> Dict:
+    return {name: metrics.stats() for name, metrics in pool_metrics.items()}
@@ -1,11 +1,54 @@
+from contextlib import asynccontextmanager
 from sqlalchemy.orm import sessionmaker
-from .engine import engine
+from starlette.concurrency import run_in_threadpool
+from ..config import settings
+from .engine import engine, read_engine
+from .asyncSession import AsyncSessionLocal
+from .lazySession import LazySession
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
 
-def get_db():
-    db = SessionLocal()
+# async generators run on the event loop: no threadpool hop to set up a
+# session that may never be used, only a used one is closed off-loop
+
+@asynccontextmanager
+async def _lazy_session(factory):
+    db = LazySession(factory)
     try:
         yield db
     finally:
-        db.close()
+        if db.materialized:
+            await run_in_threadpool(db.close)
+
+async def get_read_db():
+    """
+    Session for per-request lookups: an AsyncSession when DB_ASYNC_ENABLED
+    (on the primary, there is no async replica engine), otherwise the lazy
+    session on the read replica (the primary when none is configured).
+    Never write through it.
+    """
+    if settings.DB_ASYNC_ENABLED:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        async with _lazy_session(ReadSessionLocal) as db:
+            yield db
+
+async def get_app_db():
+    """AsyncSession when DB_ASYNC_ENABLED, otherwise the lazy sync session. Pair with run_db."""
+    if settings.DB_ASYNC_ENABLED:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        async with _lazy_session(SessionLocal) as db:
+            yield db
+
+async def run_db(db, fn, *args):
+    """
+    Runs sync DAO code `fn(session, *args)` against either session type from
+    get_app_db: AsyncSession.run_sync on the event loop, else the threadpool.
+    """
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
@@ -2,48 +2,71 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from .database import Base, engine
-
-from .common.apiResponse import APIResponse
-from fastapi.responses import JSONResponse
+from .config import settings
+from .common.apiResponse import error_response
 
 from .api.routers.authRoutes import router as authRouter
 from .api.routers.analyzeRoutes import router as analyzrouter
 from .api.routers.userRoutes import router as userRouter
-from .database.dbInitializer import initialize_database
+from .api.routers.adminRoutes import router as adminRouter
+from .api.routers.journalRoutes import router as journalRouter
+from .api.routers.metricsRoutes import router as metricsRouter
+from .api.admission import AdmissionMiddleware
+from .api.instrumentation import MetricsMiddleware, ProfilerMiddleware
+from .utils.profiler import profiler
+from .utils.rateLimiter import rate_limits
+from .startup import run_shutdown, run_startup
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    initialize_database()
-    yield 
-app = FastAPI(title="QuietSignal - Mood Diary (Modular DAO MVP)")
+    # nothing above touches the DB or loads the model, it all happens here
+    app.state.startup_timings = await run_startup()
+    yield
+    await run_shutdown()
+
+app = FastAPI(title="QuietSignal - Mood Diary (Modular DAO MVP)", lifespan=lifespan)
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=APIResponse.error(
-            message=exc.detail,
-            code=exc.status_code
-        ).model_dump()
-    )
+    # same envelope as the routes, with the real HTTP status
+    if isinstance(exc.detail, str):
+        message, errors = exc.detail, None
+    else:
+        message, errors = "Request failed", exc.detail
+    return error_response(message, exc.status_code, errors, http_status=exc.status_code, headers=exc.headers)
+
+if settings.RATE_LIMIT_ENABLED:
+    # inside the metrics middleware, so shed requests still show up in the latency/status metrics
+    app.add_middleware(AdmissionMiddleware, limits=rate_limits, trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED)
 
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+if settings.METRICS_ENABLED:
+    # times error handling and admission too, everything but CORS
+    app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+# added last so it's outermost: 429/503s from admission and every other
+# response the browser sees carry the Access-Control-* headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # lets browser devtools show the breakdown for cross-origin calls
+    expose_headers=["Server-Timing", "Retry-After"],
 )
 
 # include routers
 app.include_router(authRouter)
 app.include_router(analyzrouter)
 app.include_router(userRouter)
-
-# create tables for dev
-Base.metadata.create_all(bind=engine)
+app.include_router(journalRouter)
+app.include_router(adminRouter)
+if settings.METRICS_ENABLED:
+    app.include_router(metricsRouter)
 
 
 @app.get("/")
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..config import settings
+from ..common import serverTiming
+from ..common.metrics import Counter, Histogram
+from .modelLoader import Prediction
+from .inferenceExecutor import executor
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class BatchScheduler:
+    """
+    Micro-batching front door for the model.
+
+    Texts submitted within `window_ms` of the first pending one (or until
+    `max_batch_size` are queued) are scored with a single predict_proba call,
+    and every caller gets its own row back. The call itself runs on the
+    inference executor, never on the event loop.
+
+    Each caller's Server-Timing gets its own window wait plus the batch's
+    executor queue/vectorize/predict times.
+    """
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.batches = Counter()
+        self.items = Counter()
+
+    async def submit(self, text: str) -> Prediction:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size or self.window == 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        row, timings = await future
+        serverTiming.record_many(timings)
+        return row
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        waits = []
+        for _, _, queued_at in batch:
+            waits.append((now - queued_at) * 1000)
+            self.queue_wait_ms.observe(waits[-1])
+        self.batch_sizes.observe(len(batch))
+        self.batches.inc()
+        self.items.inc(len(batch))
+
+        # keep a strong reference until the batch is done
+        task = asyncio.ensure_future(self._run(batch, waits))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, float]], waits: List[float]) -> None:
+        # this task runs in whichever request's context flushed the batch,
+        # so timings go back through the futures instead of serverTiming
+        try:
+            rows, timings = await executor.predict([text for text, _, _ in batch])
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future, _), row, wait_ms in zip(batch, rows, waits):
+            if not future.done():
+                future.set_result((row, {**timings, "queue": wait_ms + timings["queue"]}))
+
+    def stats(self) -> Dict:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches.value,
+            "items": self.items.value,
+            "pending": len(self._pending),
+            "running_batches": len(self._running),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+
+scheduler = BatchScheduler(
+    window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+)
@@ -0,0 +1,243 @@
+"""
+Offline tooling for the model cascade (MODEL_CASCADE_* settings).
+
+    python -m quietsignal_backend.ml.cascade train texts.csv
+    python -m quietsignal_backend.ml.cascade evaluate labelled.csv --thresholds 0.7,0.8,0.9,0.95
+
+`train` distills a first stage from Model.joblib: a HashingVectorizer (no
+vocabulary to load or look up) + SGD logistic regression fitted on the full
+model's own predictions, so it needs texts, not labels. It is served through
+ml/compiledModel. `evaluate` reports
+accuracy, latency and escalation rate of the full model, the first stage
+alone and the cascade at each threshold.
+
+Sample files: .csv with a `text` column (and `label`), .ndjson/.jsonl with
+{"text", "label"} objects, anything else one text per line. Labels are
+class indices ("0") or names ("negative", see sentiment.CLASS_LABELS).
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..sentiment import CLASS_LABELS
+from .modelLoader import CASCADE_PATH, MODEL_PATH, cascade_predict, load_model, prepare_first_stage, prepare_model
+
+DEFAULT_THRESHOLDS = (0.6, 0.7, 0.8, 0.9, 0.95)
+_INDEX_BY_NAME = {name: index for index, name in CLASS_LABELS.items()}
+
+
+def _label_index(value: Any) -> str:
+    label = str(value).strip().lower()
+    if label in CLASS_LABELS:
+        return label
+    if label in _INDEX_BY_NAME:
+        return _INDEX_BY_NAME[label]
+    raise ValueError(f"Unknown label {value!r}, expected one of {sorted(CLASS_LABELS)} or {sorted(_INDEX_BY_NAME)}")
+
+
+def read_sample(path: Path) -> Tuple[List[str], Optional[List[str]]]:
+    """(texts, label indices or None when the file has no labels)."""
+    texts: List[str] = []
+    labels: List[str] = []
+    suffix = path.suffix.lower()
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        if suffix == ".csv":
+            for row in csv.DictReader(fh):
+                texts.append(row["text"])
+                if row.get("label") not in (None, ""):
+                    labels.append(_label_index(row["label"]))
+        elif suffix in (".ndjson", ".jsonl"):
+            for line in fh:
+                if line.strip():
+                    row = json.loads(line)
+                    texts.append(row["text"])
+                    if row.get("label") is not None:
+                        labels.append(_label_index(row["label"]))
+        else:
+            texts = [line.rstrip("\n") for line in fh if line.strip()]
+
+    if labels and len(labels) != len(texts):
+        raise ValueError(f"{path}: {len(texts) - len(labels)} of {len(texts)} rows have no label")
+    return texts, labels or None
+
+
+def build_first_stage(texts: List[str], y: List[Any], n_features: int = 1 << 18, seed: int = 0):
+    """Fits HashingVectorizer (uni+bigrams) -> SGDClassifier(log_loss) on `texts`."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+
+    model = Pipeline([
+        ("hash", HashingVectorizer(n_features=n_features, ngram_range=(1, 2), alternate_sign=False, norm="l2")),
+        ("clf", SGDClassifier(loss="log_loss", alpha=1e-5, max_iter=50, tol=1e-4, random_state=seed)),
+    ])
+    model.fit(texts, y)
+    return model
+
+
+def _argmax_indices(rows) -> List[str]:
+    # position in predict_proba, the same key the API's probabilities use
+    return [str(i) for i in rows.argmax(axis=1)]
+
+
+def _accuracy(predicted: List[str], labels: Optional[List[str]]) -> Optional[float]:
+    if labels is None:
+        return None
+    return sum(p == t for p, t in zip(predicted, labels)) / len(labels)
+
+
+def _batches(texts: List[str], size: int):
+    for start in range(0, len(texts), size):
+        yield texts[start:start + size]
+
+
+def _timed(score, texts: List[str], batch_size: int):
+    """Runs score(batch) over all texts; (stacked rows, ms per text, extra per batch)."""
+    import numpy as np
+
+    rows, extras = [], []
+    start = time.perf_counter()
+    for batch in _batches(texts, batch_size):
+        batch_rows, extra = score(batch)
+        rows.append(np.asarray(batch_rows))
+        extras.append(extra)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return np.vstack(rows), elapsed_ms / len(texts), extras
+
+
+def train(args: argparse.Namespace) -> None:
+    import joblib
+    import numpy as np
+
+    texts, labels = read_sample(args.sample)
+    full = load_model(args.model)
+    if args.labels == "sample":
+        if labels is None:
+            raise SystemExit(f"--labels sample given but {args.sample} has no labels")
+        y = [full.classes_[int(label)] for label in labels]
+    else:
+        # distillation: imitate the full model, labels in the file are ignored
+        y = list(full.classes_[np.asarray(full.predict_proba(texts)).argmax(axis=1)])
+
+    start = time.perf_counter()
+    first = build_first_stage(texts, y, n_features=1 << args.hash_bits)
+    fit_s = time.perf_counter() - start
+
+    if list(first.classes_) != list(full.classes_):
+        raise SystemExit(
+            f"First stage learned classes {list(first.classes_)}, the full model has {list(full.classes_)}: "
+            "the sample must contain every class"
+        )
+
+    agreement = float(np.mean(first.predict(texts) == np.asarray(y)))
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(first, args.out, compress=3)
+    print(f"[CASCADE] Trained on {len(texts)} texts in {fit_s:.1f} s, "
+          f"agreement with its targets {agreement:.3f}, wrote {args.out} ({args.out.stat().st_size / 1024:.0f} KiB)")
+
+
+def evaluate(args: argparse.Namespace) -> Dict:
+    texts, labels = read_sample(args.sample)
+    full = prepare_model(load_model(args.model))
+    # served exactly as the app would: compiled first stage, full model per MODEL_COMPILED
+    first = prepare_first_stage(load_model(args.first_stage))
+    if list(first.classes_) != list(full.classes_):
+        raise SystemExit(f"Class mismatch: first stage {list(first.classes_)}, full model {list(full.classes_)}")
+
+    # warm both so the first batch doesn't pay for lazy init
+    full.predict_proba(texts[:8])
+    first.predict_proba(texts[:8])
+
+    full_rows, full_ms, _ = _timed(lambda batch: (full.predict_proba(batch), None), texts, args.batch_size)
+    full_pred = _argmax_indices(full_rows)
+    first_rows, first_ms, _ = _timed(lambda batch: (first.predict_proba(batch), None), texts, args.batch_size)
+    first_pred = _argmax_indices(first_rows)
+
+    report = {
+        "sample": str(args.sample),
+        "texts": len(texts),
+        "labelled": labels is not None,
+        "batch_size": args.batch_size,
+        "full": {"accuracy": _accuracy(full_pred, labels), "ms_per_text": full_ms},
+        "first_stage": {
+            "accuracy": _accuracy(first_pred, labels),
+            "agreement_with_full": _accuracy(first_pred, full_pred),
+            "ms_per_text": first_ms,
+        },
+        "cascade": [],
+    }
+
+    for threshold in args.thresholds:
+        rows, ms, escalated = _timed(
+            lambda batch: cascade_predict(first, full, batch, threshold, {}), texts, args.batch_size
+        )
+        predicted = _argmax_indices(rows)
+        report["cascade"].append({
+            "threshold": threshold,
+            "escalation_rate": sum(sum(flags) for flags in escalated) / len(texts),
+            "accuracy": _accuracy(predicted, labels),
+            "agreement_with_full": _accuracy(predicted, full_pred),
+            "ms_per_text": ms,
+            "speedup": full_ms / ms if ms else None,
+        })
+    return report
+
+
+def _print_report(report: Dict) -> None:
+    def fmt(value, spec):
+        return "n/a" if value is None else format(value, spec)
+
+    print(f"{report['texts']} texts from {report['sample']}, batch size {report['batch_size']}"
+          + ("" if report["labelled"] else " (no labels: accuracy n/a, agreement is vs the full model)"))
+    print(f"{'model':<18} {'escalated':>9} {'accuracy':>9} {'agree':>7} {'ms/text':>9} {'speedup':>8}")
+    full, first = report["full"], report["first_stage"]
+    print(f"{'full':<18} {'100%':>9} {fmt(full['accuracy'], '.4f'):>9} {'1.0000':>7} {full['ms_per_text']:>9.4f} {'1.00x':>8}")
+    print(f"{'first stage':<18} {'0%':>9} {fmt(first['accuracy'], '.4f'):>9} "
+          f"{first['agreement_with_full']:>7.4f} {first['ms_per_text']:>9.4f} "
+          f"{full['ms_per_text'] / first['ms_per_text']:>7.2f}x")
+    for row in report["cascade"]:
+        print(f"{'cascade @' + format(row['threshold'], 'g'):<18} {row['escalation_rate']:>9.1%} "
+              f"{fmt(row['accuracy'], '.4f'):>9} {row['agreement_with_full']:>7.4f} "
+              f"{row['ms_per_text']:>9.4f} {fmt(row['speedup'], '.2f') + 'x':>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m quietsignal_backend.ml.cascade", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_cmd = commands.add_parser("train", help="distill a first-stage model from Model.joblib")
+    train_cmd.add_argument("sample", type=Path, help="texts to train on (labels optional)")
+    train_cmd.add_argument("--model", type=Path, default=MODEL_PATH, help="full model (default mlmodel/Model.joblib)")
+    train_cmd.add_argument("--out", type=Path, default=CASCADE_PATH, help=f"default mlmodel/{CASCADE_PATH.name}")
+    train_cmd.add_argument("--labels", choices=("model", "sample"), default="model",
+                           help="fit the full model's predictions (default) or the file's labels")
+    train_cmd.add_argument("--hash-bits", type=int, default=18, help="2**N hashed features (default 18)")
+
+    eval_cmd = commands.add_parser("evaluate", help="accuracy / latency / escalation rate per threshold")
+    eval_cmd.add_argument("sample", type=Path, help="labelled texts")
+    eval_cmd.add_argument("--model", type=Path, default=MODEL_PATH)
+    eval_cmd.add_argument("--first-stage", type=Path, default=CASCADE_PATH)
+    eval_cmd.add_argument("--thresholds", default=",".join(map(str, DEFAULT_THRESHOLDS)),
+                          type=lambda value: [float(t) for t in value.split(",")])
+    eval_cmd.add_argument("--batch-size", type=int, default=1, help="texts per call (1 = one /analyze request)")
+    eval_cmd.add_argument("--out", type=Path, help="also write the report as JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == "train":
+        train(args)
+        return
+
+    report = evaluate(args)
+    _print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
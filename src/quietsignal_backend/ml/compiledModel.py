@@ -0,0 +1,203 @@
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.utils import murmurhash3_32
+
+PARITY_TEXTS = [
+    "I feel great today, everything went well.",
+    "This is awful and I am exhausted.",
+    "It was an ordinary day.",
+    "",
+    "Mixed feelings: happy about work but sad about home!!",
+]
+PARITY_TOLERANCE = 1e-6
+
+
+class CompiledModel:
+    """
+    Lean inference path for a fitted text Pipeline of
+    (Count|Tfidf)Vectorizer [+ TfidfTransformer] -> linear classifier, or
+    HashingVectorizer(alternate_sign=False) -> linear classifier.
+
+    The vocabulary, idf weights and coefficients are pulled out once. Scoring is
+    tokenize -> feature ids -> one CSR matrix for the batch -> sparse dot with
+    the (n_features, n_classes) weight matrix -> softmax/sigmoid. This skips
+    the per-call input validation and estimator dispatch of the Pipeline.
+    """
+
+    def __init__(self, original: Any, analyzer: Callable[[str], List[str]], vocabulary: dict,
+                 idf: Optional[np.ndarray], binary: bool, sublinear_tf: bool, norm: Optional[str],
+                 weights: np.ndarray, intercept: np.ndarray, link: str,
+                 feature_id: Optional[Callable[[str], Optional[int]]] = None):
+        self.original = original
+        self.classes_ = original.classes_
+        self._analyzer = analyzer
+        self._vocabulary = vocabulary
+        # token -> column, the vocabulary unless the features are hashed
+        self._feature_id = feature_id or vocabulary.get
+        self._idf = idf
+        self._binary = binary
+        self._sublinear_tf = sublinear_tf
+        self._norm = norm
+        self._weights = weights
+        self._intercept = intercept
+        self._link = link
+        self._n_features = weights.shape[0]
+
+    def vectorize(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        feature_id = self._feature_id
+        indices: List[int] = []
+        counts: List[int] = []
+        indptr = [0]
+
+        for text in texts:
+            doc = Counter(idx for idx in map(feature_id, self._analyzer(text)) if idx is not None)
+            indices.extend(doc.keys())
+            counts.extend(doc.values())
+            indptr.append(len(indices))
+
+        data = np.asarray(counts, dtype=np.float64)
+        cols = np.asarray(indices, dtype=np.int64)
+
+        if self._binary:
+            data.fill(1.0)
+        elif self._sublinear_tf:
+            np.log(data, out=data)
+            data += 1.0
+        if self._idf is not None:
+            data *= self._idf[cols]
+
+        indptr = np.asarray(indptr)
+        if self._norm is not None:
+            # on the CSR data directly: sparse elementwise ops cost O(n_features)
+            # per row, which a 2**18 column hashed model feels
+            rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+            if self._norm == "l2":
+                row_norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(texts)))
+            else:
+                row_norms = np.bincount(rows, weights=np.abs(data), minlength=len(texts))
+            row_norms[row_norms == 0.0] = 1.0
+            data /= row_norms[rows]
+
+        return sparse.csr_matrix((data, cols, indptr), shape=(len(texts), self._n_features))
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(self.vectorize(texts) @ self._weights) + self._intercept
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self.predict_proba_vectors(self.vectorize(texts))
+
+    def predict_proba_vectors(self, X: sparse.csr_matrix) -> np.ndarray:
+        """predict_proba for rows already produced by vectorize()."""
+        scores = np.asarray(X @ self._weights) + self._intercept
+
+        if self._link == "binary":
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        if self._link == "softmax":
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+            scores /= scores.sum(axis=1, keepdims=True)
+            return scores
+
+        # one-vs-rest: independent sigmoids renormalized per row
+        probs = 1.0 / (1.0 + np.exp(-scores))
+        totals = probs.sum(axis=1, keepdims=True)
+        totals[totals == 0.0] = 1.0
+        return probs / totals
+
+
+def _unpack(pipeline: Any):
+    if not isinstance(pipeline, Pipeline):
+        return None
+    steps = [step for _, step in pipeline.steps if step not in (None, "passthrough")]
+
+    if len(steps) == 2 and type(steps[0]) is HashingVectorizer:
+        # signed hashing would need a per-token sign, only the unsigned variant is supported
+        if steps[0].alternate_sign:
+            return None
+        vectorizer, tfidf, clf = steps[0], None, steps[1]
+    elif len(steps) == 2 and type(steps[0]) in (CountVectorizer, TfidfVectorizer):
+        vectorizer, tfidf, clf = steps[0], steps[0] if isinstance(steps[0], TfidfVectorizer) else None, steps[1]
+    elif len(steps) == 3 and type(steps[0]) is CountVectorizer and type(steps[1]) is TfidfTransformer:
+        vectorizer, tfidf, clf = steps
+    else:
+        return None
+    return vectorizer, tfidf, clf
+
+
+def _link_for(clf: Any) -> Optional[str]:
+    if type(clf) is LogisticRegression:
+        if len(clf.classes_) <= 2:
+            return "binary"
+        multi_class = getattr(clf, "multi_class", "auto")
+        if multi_class == "ovr" or (multi_class == "auto" and clf.solver == "liblinear"):
+            return "ovr"
+        return "softmax"
+    if type(clf) is SGDClassifier and clf.loss == "log_loss":
+        return "binary" if len(clf.classes_) <= 2 else "ovr"
+    return None
+
+
+def _hashed_feature_id(n_features: int, cache_size: int = 1 << 17) -> Callable[[str], int]:
+    # FeatureHasher's column: |murmurhash3_32(token, seed=0)| mod n_features.
+    # Hashing one token from Python costs more than a vocabulary lookup, the
+    # cache turns the common tokens back into a dict hit
+    @lru_cache(maxsize=cache_size)
+    def feature_id(token: str) -> int:
+        return abs(murmurhash3_32(token, seed=0)) % n_features
+    return feature_id
+
+
+def compile_model(model: Any) -> Optional[CompiledModel]:
+    """
+    Returns a CompiledModel for supported pipelines, None otherwise.
+    The compiled path is only returned if it matches model.predict_proba on
+    PARITY_TEXTS within PARITY_TOLERANCE.
+    """
+    unpacked = _unpack(model)
+    if unpacked is None:
+        return None
+    vectorizer, tfidf, clf = unpacked
+
+    link = _link_for(clf)
+    if link is None:
+        return None
+
+    use_idf = tfidf is not None and tfidf.use_idf
+    hashed = type(vectorizer) is HashingVectorizer
+    compiled = CompiledModel(
+        original=model,
+        analyzer=vectorizer.build_analyzer(),
+        vocabulary={} if hashed else dict(vectorizer.vocabulary_),
+        idf=np.asarray(tfidf.idf_, dtype=np.float64) if use_idf else None,
+        binary=vectorizer.binary,
+        sublinear_tf=tfidf is not None and tfidf.sublinear_tf,
+        # a HashingVectorizer normalizes itself
+        norm=vectorizer.norm if hashed else (tfidf.norm if tfidf is not None else None),
+        weights=np.ascontiguousarray(np.asarray(clf.coef_, dtype=np.float64).T),
+        intercept=np.asarray(clf.intercept_, dtype=np.float64),
+        link=link,
+        feature_id=_hashed_feature_id(vectorizer.n_features) if hashed else None,
+    )
+
+    if parity_error(model, compiled) > PARITY_TOLERANCE:
+        return None
+    return compiled
+
+
+def parity_error(model: Any, compiled: CompiledModel, texts: Sequence[str] = PARITY_TEXTS) -> float:
+    """Max absolute difference between both paths' probabilities on `texts`."""
+    texts = list(texts) + list(compiled._vocabulary)[:20]
+    expected = np.asarray(model.predict_proba(texts))
+    actual = compiled.predict_proba(texts)
+    if expected.shape != actual.shape:
+        return float("inf")
+    return float(np.max(np.abs(expected - actual)))
@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..common.metrics import Counter, Histogram
+from .modelLoader import (
+    FIRST_STAGE,
+    Prediction,
+    cascade_registry,
+    init_worker,
+    predict_emotions_timed,
+    registry,
+    worker_initargs,
+)
+
+MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class _WorkerHTTPError(Exception):
+    """Picklable carrier for an HTTPException raised inside a pool process."""
+
+
+def _call_in_worker(fn: Callable, *args: Any) -> Any:
+    # HTTPException can't be unpickled, ship status and detail back as plain args
+    try:
+        return fn(*args)
+    except HTTPException as exc:
+        raise _WorkerHTTPError(exc.status_code, exc.detail)
+
+
+class InferenceExecutor:
+    """
+    Dedicated pool for model inference so predict_proba never runs on the
+    event loop.
+
+    mode="thread"  -> ThreadPoolExecutor, for estimators that release the GIL
+    mode="process" -> ProcessPoolExecutor, model preloaded in every worker
+
+    At most `workers + max_queue` jobs are admitted at once; anything beyond
+    that is rejected with a 503 instead of queueing without limit. Bulk
+    callers can pass wait=True to be held back until a slot frees up.
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor mode: {mode}")
+
+        self.mode = mode
+        self.workers = max(int(workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.capacity = self.workers + self.max_queue
+
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._in_flight = 0
+        self._slot_freed: Optional[asyncio.Event] = None
+
+        self.submitted = Counter()
+        self.rejected = Counter()
+        # per predict() call: time waiting for a worker (plus IPC in process
+        # mode), then the two halves of predict_proba
+        self.queue_ms = Histogram(MS_BUCKETS)
+        self.vectorize_ms = Histogram(MS_BUCKETS)
+        self.predict_ms = Histogram(MS_BUCKETS)
+        # cascade: first-stage time per call, texts answered by each stage
+        self.first_stage_ms = Histogram(MS_BUCKETS)
+        self.first_stage_answers = Counter()
+        self.escalations = Counter()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.mode == "process":
+                    # the children load exactly the artifact this process is serving
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                                     initargs=worker_initargs())
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+            return self._pool
+
+    def restart(self) -> None:
+        """
+        Retires the current pool: jobs already running finish on it, new jobs
+        go to a fresh pool. Process workers load the model once at start, so
+        this is how they pick up a new version.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    async def run(self, fn: Callable, *args: Any, wait: bool = False) -> Any:
+        # only touched from the event loop thread, no lock needed
+        while wait and self._in_flight >= self.capacity:
+            if self._slot_freed is None:
+                self._slot_freed = asyncio.Event()
+            await self._slot_freed.wait()
+
+        if self._in_flight >= self.capacity:
+            self.rejected.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Inference pool saturated, retry later",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        self.submitted.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                return await loop.run_in_executor(self._get_pool(), _call_in_worker, fn, *args)
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except _WorkerHTTPError as exc:
+            raise HTTPException(status_code=exc.args[0], detail=exc.args[1])
+        finally:
+            self._in_flight -= 1
+            if self._slot_freed is not None:
+                self._slot_freed.set()
+                self._slot_freed = None
+
+    async def predict(self, texts: List[str], wait: bool = False) -> Tuple[List[Prediction], Dict[str, float]]:
+        """
+        predict_emotions on the pool, plus {"queue", "vectorize", "predict"} ms
+        for the call. The caller decides which request those belong to.
+        """
+        start = time.perf_counter()
+        rows, timings = await self.run(predict_emotions_timed, texts, wait=wait)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        timings["queue"] = max(elapsed_ms - sum(timings.values()), 0.0)
+        self.queue_ms.observe(timings["queue"])
+        self.vectorize_ms.observe(timings["vectorize"])
+        self.predict_ms.observe(timings["predict"])
+        if "first-stage" in timings:
+            self.first_stage_ms.observe(timings["first-stage"])
+            answered = sum(1 for row in rows if row.stage == FIRST_STAGE)
+            self.first_stage_answers.inc(answered)
+            self.escalations.inc(len(rows) - answered)
+        return rows, timings
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "submitted": self.submitted.value,
+            "rejected": self.rejected.value,
+            "queue_ms": self.queue_ms.snapshot(),
+            "vectorize_ms": self.vectorize_ms.snapshot(),
+            "predict_ms": self.predict_ms.snapshot(),
+            "cascade": {
+                "first_stage_answers": self.first_stage_answers.value,
+                "escalations": self.escalations.value,
+                "first_stage_ms": self.first_stage_ms.snapshot(),
+            } if cascade_registry is not None else None,
+        }
+
+
+executor = InferenceExecutor(
+    mode=settings.INFERENCE_EXECUTOR,
+    workers=settings.INFERENCE_WORKERS,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+)
+
+if executor.mode == "process":
+    registry.on_swap(lambda version: executor.restart())
+    if cascade_registry is not None:
+        cascade_registry.on_swap(lambda version: executor.restart())
@@ -1,13 +1,294 @@
-import joblib
+import gc
+import hashlib
+import os
+import sys
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from fastapi import HTTPException
 
-MODEL_PATH = Path(__file__).resolve().parents[3] / "mlmodel" / "Model.joblib"
+from ..config import settings
+from ..utils.processStats import format_memory, memory_usage_mb
+from .modelRegistry import ModelRegistry, ModelVersion
 
-try:
-    MODEL = joblib.load(MODEL_PATH)
-except Exception:
-    MODEL = None
+MODEL_DIR = Path(__file__).resolve().parents[3] / "mlmodel"
+MODEL_PATH = MODEL_DIR / "Model.joblib"
+CASCADE_PATH = MODEL_DIR / settings.MODEL_CASCADE_FILENAME
+
+# which model answered a Prediction
+FIRST_STAGE = "first"
+FULL_STAGE = "full"
+
+
+class Prediction(NamedTuple):
+    probabilities: Dict[str, float]
+    # always the full model's version: a first-stage answer is part of serving it
+    model_version: Optional[str]
+    stage: str = FULL_STAGE
+
+
+def model_fingerprint(path: Path) -> Optional[str]:
+    """Short content hash of the artifact, changes whenever Model.joblib does."""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+    except OSError:
+        return None
+
+
+def load_model(path: Path = MODEL_PATH, mmap_mode: Optional[str] = None):
+    """
+    joblib.load with timing and memory reporting.
+    With mmap_mode="r" the numpy arrays inside the pipeline are mapped from the
+    page cache instead of copied, so every worker on the host shares them.
+    This only works for uncompressed artifacts (see export_uncompressed).
+    """
+    import joblib
+
+    before = memory_usage_mb()
+    start = time.perf_counter()
+
+    model = joblib.load(path, mmap_mode=mmap_mode)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    after = memory_usage_mb()
+    delta = (after["rss"] - before["rss"]) if after["rss"] is not None and before["rss"] is not None else None
+    print(
+        f"[MODEL] Loaded {path.name} in {elapsed_ms:.0f} ms "
+        f"(pid={os.getpid()}, mmap_mode={mmap_mode}, "
+        f"rss_delta={'n/a' if delta is None else f'{delta:.1f}MB'}, {format_memory(after)})"
+    )
+    return model
+
+
+def prepare_model(model):
+    """
+    With MODEL_COMPILED on, swaps supported pipelines for their CompiledModel
+    (same predict_proba contract); anything else is served as-is.
+    """
+    if not settings.MODEL_COMPILED:
+        return model
+    # imported here: pulling in sklearn is ~2s of import time nobody needs otherwise
+    from .compiledModel import compile_model
+
+    compiled = compile_model(model)
+    if compiled is None:
+        print(f"[MODEL] Compiled inference not available for {type(model).__name__}, using predict_proba")
+        return model
+    print("[MODEL] Using compiled inference path")
+    return compiled
+
+
+def prepare_first_stage(model):
+    """
+    The cascade's first stage is compiled whenever it can be, MODEL_COMPILED
+    or not: through the sklearn Pipeline a hashed model costs more per call
+    than a small full model.
+    """
+    from .compiledModel import compile_model
+
+    compiled = compile_model(model)
+    if compiled is None:
+        print(f"[MODEL] First stage {type(model).__name__} can't be compiled, using predict_proba")
+        return model
+    return compiled
+
+
+registry = ModelRegistry(
+    MODEL_PATH,
+    loader=lambda path: prepare_model(load_model(path, mmap_mode=settings.MODEL_MMAP_MODE or None)),
+    fingerprint=model_fingerprint,
+    watch_interval=settings.MODEL_WATCH_INTERVAL_S,
+)
+
+
+# the first stage has its own artifact, version and hot reload
+cascade_registry = ModelRegistry(
+    CASCADE_PATH,
+    loader=lambda path: prepare_first_stage(load_model(path)),
+    fingerprint=model_fingerprint,
+    watch_interval=settings.MODEL_WATCH_INTERVAL_S,
+) if settings.MODEL_CASCADE_ENABLED else None
+
+
+def get_model():
+    current = registry.current()
+    return current.model if current else None
+
+
+def get_model_version() -> Optional[str]:
+    current = registry.current()
+    return current.version if current else None
+
+
+def get_serving_version() -> Optional[str]:
+    """
+    Identifies what answers a prediction: the model version, plus the first
+    stage and threshold when the cascade is on. Cache keys use this.
+    """
+    version = get_model_version()
+    first = cascade_registry.current() if cascade_registry is not None else None
+    if first is None:
+        return version
+    return f"{version}+{first.version}@{settings.MODEL_CASCADE_THRESHOLD}"
+
+
+def preload_model() -> None:
+    """
+    Loads the model now instead of on first use. Under `gunicorn --preload`
+    this runs in the master before fork; gc.freeze() moves everything loaded
+    so far out of the collector's reach, so GC passes in the workers don't
+    write to (and un-share) the copy-on-write pages.
+    """
+    registry.current()
+    if cascade_registry is not None:
+        cascade_registry.current()
+    gc.freeze()
+
+
+def _serving(reg: Optional[ModelRegistry]) -> Tuple[Optional[str], Optional[str]]:
+    current = reg.current() if reg is not None else None
+    return (str(current.path), current.version) if current else (None, None)
+
+
+def worker_initargs() -> Tuple[Optional[str], ...]:
+    """(path, version) of the full model and of the cascade's first stage the parent is serving, for init_worker."""
+    return _serving(registry) + _serving(cascade_registry)
+
+
+def _load_in_worker(reg: ModelRegistry, path: Optional[str], version: Optional[str]) -> None:
+    reg.disable_watcher()
+    if path is None:
+        reg.current()
+        return
+    reg.reload(Path(path))
+    current = reg.current()
+    if current is None or current.version != version:
+        # the file changed after the parent loaded it; the parent's watcher
+        # (or the next reload) restarts the pool with the new version
+        print(f"[MODEL] Worker {os.getpid()} expected version {version} from {path}, "
+              f"got {current.version if current else None}")
+
+
+def init_worker(path: Optional[str] = None, version: Optional[str] = None,
+                first_path: Optional[str] = None, first_version: Optional[str] = None):
+    """
+    ProcessPoolExecutor initializer: loads (and warms) the artifacts the parent
+    is serving, a no-op when they were inherited through fork. Under spawn or
+    forkserver the child starts from fresh registries, which would otherwise
+    load the default artifacts rather than versions swapped in by
+    /admin/model/reload. Only the parent watches the artifacts; it restarts
+    the pool when a new version goes live.
+    """
+    _load_in_worker(registry, path, version)
+    if cascade_registry is not None:
+        _load_in_worker(cascade_registry, first_path, first_version)
+
+
+def _current_or_raise() -> ModelVersion:
+    current = registry.current()
+    if current is None:
+        raise HTTPException(status_code=500, detail="Model not found. Place Model.joblib in models/ folder.")
+    return current
+
+
+def _stages(model: Any) -> Optional[Tuple[Callable, Callable]]:
+    """(vectorize, predict_proba on vectors) when the model can be split, else None."""
+    if hasattr(model, "predict_proba_vectors"):
+        return model.vectorize, model.predict_proba_vectors
+    steps = getattr(model, "steps", None)
+    if steps and len(steps) > 1:
+        return model[:-1].transform, model[-1].predict_proba
+    return None
+
+
+def _predict_full(model: Any, texts: List[str], timings: Dict[str, float]):
+    stages = _stages(model)
+    start = time.perf_counter()
+    if stages is None:
+        vectorized = start
+        rows = model.predict_proba(texts)
+    else:
+        vectorize, predict_proba = stages
+        X = vectorize(texts)
+        vectorized = time.perf_counter()
+        rows = predict_proba(X)
+    done = time.perf_counter()
+    timings["vectorize"] = timings.get("vectorize", 0.0) + (vectorized - start) * 1000
+    timings["predict"] = timings.get("predict", 0.0) + (done - vectorized) * 1000
+    return rows
+
+
+def first_stage_model(full: Any) -> Optional[Any]:
+    """The cascade's first stage, None when off, missing or trained on other classes."""
+    current = cascade_registry.current() if cascade_registry is not None else None
+    if current is None:
+        return None
+    first = current.model
+    if list(getattr(first, "classes_", ())) != list(getattr(full, "classes_", ())):
+        return None
+    return first
+
+
+def cascade_predict(first: Any, full: Any, texts: List[str], threshold: float,
+                    timings: Dict[str, float]) -> Tuple[Any, List[bool]]:
+    """
+    Scores every text with `first`; texts whose top probability is below
+    `threshold` are rescored by `full` in one call. Returns the merged
+    probability rows and, per text, whether it was escalated.
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    rows = np.array(first.predict_proba(texts), dtype=np.float64)
+    timings["first-stage"] = (time.perf_counter() - start) * 1000
+
+    escalated = rows.max(axis=1) < threshold
+    unsure = np.flatnonzero(escalated)
+    if len(unsure):
+        rows[unsure] = _predict_full(full, [texts[i] for i in unsure], timings)
+    return rows, escalated.tolist()
+
+
+def predict_emotions_timed(texts: List[str]) -> Tuple[List[Prediction], Dict[str, float]]:
+    """
+    predict_emotions plus per-stage ms for the batch: "vectorize" and
+    "predict" for the full model (everything under "predict" when it can't
+    be split) and "first-stage" when the cascade is on. Runs in executor
+    workers, so the timings travel back with the result instead of being
+    recorded here.
+    """
+    current = _current_or_raise()
+    timings = {"vectorize": 0.0, "predict": 0.0}
+
+    first = first_stage_model(current.model)
+    if first is None:
+        rows = _predict_full(current.model, texts, timings)
+        escalated = None
+    else:
+        rows, escalated = cascade_predict(first, current.model, texts, settings.MODEL_CASCADE_THRESHOLD, timings)
+
+    predictions = [
+        Prediction(
+            {str(i): float(p) for i, p in enumerate(probs)},
+            current.version,
+            FULL_STAGE if escalated is None or escalated[n] else FIRST_STAGE,
+        )
+        for n, probs in enumerate(rows)
+    ]
+    return predictions, timings
+
+
+def predict_emotions(texts: List[str]) -> List[Prediction]:
+    """
+    Vectorized variant of predict_emotion: one predict_proba call for the
+    whole list, one Prediction per input text (same order). The whole batch is
+    scored by the same model version, even if a reload lands mid-call.
+    """
+    return predict_emotions_timed(texts)[0]
 
 
 def predict_emotion(text: str):
@@ -15,8 +296,28 @@ def predict_emotion(text: str):
     Returns dict[str,float] where keys are class indices as strings.
     Raises HTTPException if model missing.
     """
-    if MODEL is None:
-        raise HTTPException(status_code=500, detail="Model not found. Place Model.joblib in models/ folder.")
+    return predict_emotions([text])[0].probabilities
+
+
+def export_uncompressed(src: Path, dst: Path) -> None:
+    """Re-dumps an artifact without compression so it can be memory-mapped."""
+    import joblib
+
+    joblib.dump(joblib.load(src), dst, compress=0)
+    print(f"[MODEL] Wrote mmap-friendly copy of {src} to {dst}")
+
+
+# normally the app's startup loads the model (see startup.py); MODEL_PRELOAD
+# does it at import instead, which is what gunicorn --preload needs to share it
+if settings.MODEL_PRELOAD and __name__ != "__main__":
+    preload_model()
+
 
-    probs = MODEL.predict_proba([text])[0]
-    return {str(i): float(p) for i, p in enumerate(probs)}
+if __name__ == "__main__":
+    # python -m quietsignal_backend.ml.modelLoader export-mmap [src] [dst]
+    if len(sys.argv) >= 2 and sys.argv[1] == "export-mmap":
+        src = Path(sys.argv[2]) if len(sys.argv) > 2 else MODEL_PATH
+        dst = Path(sys.argv[3]) if len(sys.argv) > 3 else src
+        export_uncompressed(src, dst)
+    else:
+        print("usage: python -m quietsignal_backend.ml.modelLoader export-mmap [src] [dst]")
@@ -0,0 +1,196 @@
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+WARMUP_TEXTS = [
+    "I feel great today, everything went well.",
+    "This is awful and I am exhausted.",
+    "It was an ordinary day.",
+]
+
+
+class ModelVersion(NamedTuple):
+    version: str
+    model: Any
+    path: Path
+    loaded_at: datetime
+    load_ms: float
+    warmup_ms: float
+
+
+class ModelRegistry:
+    """
+    Holds the model currently serving predictions and swaps in new versions
+    without a restart.
+
+    A new artifact is loaded and warmed up off to the side, then published with
+    a single reference assignment: callers grab current() once per batch, so
+    in-flight batches finish on the version they started with.
+    """
+
+    def __init__(self, path: Path, loader: Callable[[Path], Any],
+                 fingerprint: Callable[[Path], Optional[str]],
+                 watch_interval: float = 0.0, history_size: int = 10):
+        self.path = path
+        self.loader = loader
+        self.fingerprint = fingerprint
+        self.watch_interval = watch_interval
+        self.history_size = history_size
+
+        self._current: Optional[ModelVersion] = None
+        self._loaded_once = False
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[ModelVersion], None]] = []
+        self._history: List[Dict] = []
+
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_stat = None
+
+    # --- reads -----------------------------------------------------------
+
+    def current(self) -> Optional[ModelVersion]:
+        if not self._loaded_once:
+            with self._reload_lock:
+                if not self._loaded_once:
+                    self._initial_load()
+                    self._start_watcher()
+        return self._current
+
+    def status(self) -> Dict:
+        current = self._current
+        return {
+            "current": self._describe(current) if current else None,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+            "watch_interval_s": self.watch_interval,
+            "history": list(self._history),
+        }
+
+    # --- swaps -----------------------------------------------------------
+
+    def on_swap(self, callback: Callable[[ModelVersion], None]) -> None:
+        self._listeners.append(callback)
+
+    def reload(self, path: Optional[Path] = None, force: bool = False) -> Optional[ModelVersion]:
+        """
+        Loads `path` (default: the registry path), warms it up and swaps it in.
+        Returns the new version, or None when the artifact is unchanged.
+        Raises if the new artifact can't be loaded - the old one keeps serving.
+        """
+        path = Path(path or self.path)
+        with self._reload_lock:
+            self._loaded_once = True
+            version = self.fingerprint(path)
+            if version is None:
+                raise FileNotFoundError(f"Model artifact not found: {path}")
+
+            current = self._current
+            if not force and current is not None and current.version == version:
+                return None
+
+            candidate = self._load(path, version)
+            self._publish(candidate)
+
+        for callback in self._listeners:
+            try:
+                callback(candidate)
+            except Exception as exc:
+                print(f"[MODEL] on_swap listener failed: {exc}")
+        return candidate
+
+    def reload_in_background(self, path: Optional[Path] = None, force: bool = False) -> threading.Thread:
+        def _run():
+            try:
+                self.reload(path, force=force)
+            except Exception as exc:
+                print(f"[MODEL] Background reload failed, keeping current version: {exc}")
+
+        thread = threading.Thread(target=_run, name="model-reload", daemon=True)
+        thread.start()
+        return thread
+
+    # --- file watcher ----------------------------------------------------
+
+    def disable_watcher(self) -> None:
+        self.watch_interval = 0.0
+        self._stop.set()
+
+    def _start_watcher(self) -> None:
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._last_stat = self._stat()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval):
+            stat = self._stat()
+            if stat is None or stat == self._last_stat:
+                continue
+            self._last_stat = stat
+            try:
+                if self.reload() is not None:
+                    print(f"[MODEL] Detected change in {self.path.name}, new version is live")
+            except Exception as exc:
+                print(f"[MODEL] Reload after file change failed, keeping current version: {exc}")
+
+    def _stat(self):
+        try:
+            st = self.path.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    # --- internals -------------------------------------------------------
+
+    def _initial_load(self) -> None:
+        self._loaded_once = True
+        version = self.fingerprint(self.path)
+        if version is None:
+            print(f"[MODEL] No model artifact at {self.path}")
+            return
+        try:
+            self._publish(self._load(self.path, version))
+        except Exception as exc:
+            print(f"[MODEL] Could not load {self.path}: {exc}")
+
+    def _load(self, path: Path, version: str) -> ModelVersion:
+        start = time.perf_counter()
+        model = self.loader(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # the first predict_proba calls pay for lazy init inside numpy/scipy,
+        # get that out of the way before real traffic hits this version
+        start = time.perf_counter()
+        model.predict_proba(WARMUP_TEXTS)
+        warmup_ms = (time.perf_counter() - start) * 1000
+
+        return ModelVersion(
+            version=version,
+            model=model,
+            path=path,
+            loaded_at=datetime.now(timezone.utc),
+            load_ms=load_ms,
+            warmup_ms=warmup_ms,
+        )
+
+    def _publish(self, candidate: ModelVersion) -> None:
+        self._current = candidate
+        self._history.insert(0, self._describe(candidate))
+        del self._history[self.history_size:]
+        print(
+            f"[MODEL] Serving version {candidate.version} from {candidate.path.name} "
+            f"(load {candidate.load_ms:.0f} ms, warmup {candidate.warmup_ms:.0f} ms)"
+        )
+
+    @staticmethod
+    def _describe(mv: ModelVersion) -> Dict:
+        return {
+            "version": mv.version,
+            "path": mv.path.name,
+            "loaded_at": mv.loaded_at.isoformat(),
+            "load_ms": round(mv.load_ms, 1),
+            "warmup_ms": round(mv.warmup_ms, 1),
+        }
@@ -0,0 +1,117 @@
+import hashlib
+import importlib
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from ..common.lruCache import LRUCache
+from ..common.metrics import Counter
+from . import modelLoader
+from .modelLoader import Prediction
+from .preprocess import simple_cleanup
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface for PredictionCache. Implement this and point
+    PREDICTION_CACHE_BACKEND at it ("package.module:ClassName", constructed
+    without arguments) to share predictions between uvicorn workers, e.g. on Redis.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def __len__(self) -> int:
+        # shared stores may not know their size cheaply
+        return 0
+
+
+class LocalCacheBackend(LRUCache, CacheBackend):
+    """In-process LRU with optional per-entry TTL. Stand-in for a shared backend."""
+
+
+class PredictionCache:
+    """
+    Content-addressed cache of Predictions.
+
+    The key is sha256(serving version + simple_cleanup(text)), so whitespace and
+    case variants of the same entry share a slot and a new Model.joblib (or
+    cascade first stage / threshold) never serves stale predictions.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: Optional[float] = None,
+                 enabled: bool = True,
+                 version_provider: Callable[[], Optional[str]] = modelLoader.get_serving_version):
+        self.backend = backend
+        self.ttl = ttl or None
+        self.enabled = enabled
+        self.version_provider = version_provider
+
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def key_for(self, text: str) -> str:
+        raw = f"{self.version_provider()}\0{simple_cleanup(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, text: str) -> Tuple[Optional[str], Optional[Prediction]]:
+        """
+        (key, cached prediction or None). A miss is stored under this key,
+        taken before scoring: a hot reload while the text is in the queue
+        must not file the old model's output under the new version.
+        """
+        if not self.enabled:
+            return None, None
+        key = self.key_for(text)
+        value = self.backend.get(key)
+        if value is None:
+            self.misses.inc()
+        else:
+            self.hits.inc()
+        return key, value
+
+    def store(self, key: Optional[str], prediction: Prediction) -> None:
+        if self.enabled and key is not None:
+            self.backend.set(key, prediction, self.ttl)
+
+    def stats(self) -> Dict:
+        hits, misses = self.hits.value, self.misses.value
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": (hits / (hits + misses)) if (hits + misses) else 0.0,
+            "model_version": self.version_provider(),
+        }
+
+
+def _load_backend(spec: str) -> CacheBackend:
+    if spec == "local":
+        return LocalCacheBackend(settings.PREDICTION_CACHE_SIZE)
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Invalid prediction cache backend: {spec} (expected 'local' or 'module:Class')")
+    backend_cls = getattr(importlib.import_module(module_name), class_name)
+    return backend_cls()
+
+
+def _build_cache() -> PredictionCache:
+    return PredictionCache(
+        backend=_load_backend(settings.PREDICTION_CACHE_BACKEND),
+        ttl=settings.PREDICTION_CACHE_TTL_S,
+        enabled=settings.PREDICTION_CACHE_ENABLED,
+    )
+
+
+prediction_cache = _build_cache()
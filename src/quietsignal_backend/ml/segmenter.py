@@ -0,0 +1,41 @@
+import re
+from typing import Iterator, NamedTuple, Optional
+
+# paragraphs are separated by one or more blank lines
+_PARAGRAPH_RE = re.compile(r"\S(?:.*?)(?=\n[ \t]*\n|\Z)", re.DOTALL)
+# a sentence runs up to and including its terminal punctuation, a paragraph
+# break or the end of text
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?]+(?=\s|\Z)|(?=\n[ \t]*\n)|\Z)", re.DOTALL)
+
+PATTERNS = {
+    "paragraph": _PARAGRAPH_RE,
+    "sentence": _SENTENCE_RE,
+}
+
+
+class Segment(NamedTuple):
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def iter_segments(text: str, mode: str, max_segments: Optional[int] = None) -> Iterator[Segment]:
+    """
+    Lazily splits text into paragraphs or sentences (re.finditer, no
+    intermediate list), stopping after max_segments.
+    Offsets refer to the original text.
+    """
+    pattern = PATTERNS.get(mode)
+    if pattern is None:
+        raise ValueError(f"Unknown segmentation mode: {mode}")
+
+    index = 0
+    for match in pattern.finditer(text):
+        segment = match.group().rstrip()
+        if not segment:
+            continue
+        if max_segments is not None and index >= max_segments:
+            return
+        yield Segment(index, match.start(), match.start() + len(segment), segment)
+        index += 1
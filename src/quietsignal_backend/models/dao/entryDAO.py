@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from ..entities.entryEntity import Entry
+from ...database.keyset import Cursor, before
+
+
+class EntryDAO:
+    @staticmethod
+    def create(db: Session, journal_id: int, user_id: int, content: str, sentiment: Dict, commit: bool = True):
+        entry = Entry(journal_id=journal_id, user_id=user_id, content=content, **sentiment)
+        db.add(entry)
+        if not commit:
+            db.flush()
+            return entry
+        db.commit()
+        db.refresh(entry)
+        return entry
+
+    @staticmethod
+    def bulk_insert(db: Session, rows: List[Dict], commit: bool = True) -> int:
+        """
+        One executemany INSERT for all rows (plain dicts of column values),
+        no ORM objects or per-row flush. Ids aren't returned.
+        """
+        if not rows:
+            return 0
+        db.execute(insert(Entry), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
+    @staticmethod
+    def get_for_user(db: Session, journal_id: int, entry_id: int, user_id: int):
+        return db.execute(
+            select(Entry).where(Entry.id == entry_id, Entry.journal_id == journal_id, Entry.user_id == user_id)
+        ).scalars().first()
+
+    @staticmethod
+    def get_for_update(db: Session, journal_id: int, entry_id: int, user_id: int):
+        """get_for_user with the row locked until the transaction ends, freshly read even if already loaded."""
+        return db.execute(
+            select(Entry)
+            .where(Entry.id == entry_id, Entry.journal_id == journal_id, Entry.user_id == user_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).scalars().first()
+
+    @staticmethod
+    def list_for_journal(db: Session, journal_id: int, limit: int, after: Optional[Cursor] = None) -> List[Entry]:
+        stmt = select(Entry).where(Entry.journal_id == journal_id)
+        if after is not None:
+            stmt = stmt.where(before(Entry.created_at, Entry.id, after))
+        stmt = stmt.order_by(Entry.created_at.desc(), Entry.id.desc()).limit(limit)
+        return list(db.execute(stmt).scalars())
+
+    @staticmethod
+    def replace_content(db: Session, entry_id: int, expected: str, content: str, sentiment: Dict) -> bool:
+        """
+        Compare-and-swap: rewrites content and sentiment only while the stored
+        content is still `expected`. False when another write got there first.
+        No commit.
+        """
+        result = db.execute(
+            update(Entry)
+            .where(Entry.id == entry_id, Entry.content == expected)
+            .values(content=content, **sentiment)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def replace_sentiment(db: Session, entry_id: int, content: str, updated_at, sentiment: Dict) -> bool:
+        """
+        Compare-and-swap for a re-score: writes `sentiment` only while the
+        entry still has the content and updated_at it was scored from. False
+        when it was written since. No commit.
+        """
+        result = db.execute(
+            update(Entry)
+            .where(Entry.id == entry_id, Entry.content == content, Entry.updated_at == updated_at)
+            .values(**sentiment)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
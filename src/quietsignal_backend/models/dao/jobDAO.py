@@ -0,0 +1,106 @@
+from datetime import timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+from ..entities.jobEntity import Job
+from ..entities.journalEntity import utcnow
+
+
+def _claimable(now, max_attempts: int):
+    return or_(
+        Job.status == "queued",
+        and_(Job.status == "running", Job.lease_expires_at < now, Job.attempts < max_attempts),
+    )
+
+
+class JobDAO:
+    @staticmethod
+    def create(db: Session, kind: str, params: Optional[Dict] = None):
+        job = Job(kind=kind, params=params or {}, status="queued")
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get(db: Session, job_id: int):
+        return db.get(Job, job_id)
+
+    @staticmethod
+    def find_pending(db: Session, kind: str, params: Dict):
+        """A queued or running job of `kind` with identical params, if any."""
+        jobs = db.execute(
+            select(Job).where(Job.kind == kind, Job.status.in_(("queued", "running"))).order_by(Job.id)
+        ).scalars()
+        return next((job for job in jobs if (job.params or {}) == params), None)
+
+    @staticmethod
+    def list_recent(db: Session, limit: int = 20) -> List[Job]:
+        return list(db.execute(select(Job).order_by(Job.id.desc()).limit(limit)).scalars())
+
+    @staticmethod
+    def claim(db: Session, worker_id: str, lease_s: float, max_attempts: int) -> Optional[Job]:
+        """
+        Leases the oldest claimable job. FOR UPDATE SKIP LOCKED keeps MySQL
+        workers off each other's candidates; the guarded UPDATE is what makes
+        it safe where that clause doesn't exist (SQLite): only one worker's
+        UPDATE matches, the others see rowcount 0 and try again.
+
+        A job whose lease expired `max_attempts` times is failed instead of
+        re-claimed - its worker died on it every time.
+        """
+        now = utcnow()
+        db.execute(
+            update(Job)
+            .where(Job.status == "running", Job.lease_expires_at < now, Job.attempts >= max_attempts)
+            .values(status="failed", error=f"Lease expired after {max_attempts} attempts",
+                    lease_owner=None, lease_expires_at=None, finished_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        candidate = db.execute(
+            select(Job.id).where(_claimable(now, max_attempts)).order_by(Job.id).limit(1).with_for_update(skip_locked=True)
+        ).scalar()
+        if candidate is None:
+            db.commit()
+            return None
+
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == candidate, _claimable(now, max_attempts))
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_s),
+                attempts=Job.attempts + 1,
+                started_at=func.coalesce(Job.started_at, now),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed != 1:
+            return None
+        return db.get(Job, candidate)
+
+    @staticmethod
+    def heartbeat(db: Session, job: Job, worker_id: str, lease_s: float, **values) -> bool:
+        """
+        Extends the lease and records progress, in the caller's transaction.
+        False means the lease was lost to another worker - stop working on the job.
+        """
+        return db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.lease_owner == worker_id, Job.status == "running")
+            .values(lease_expires_at=utcnow() + timedelta(seconds=lease_s), **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    @staticmethod
+    def finish(db: Session, job: Job, worker_id: str, status: str, error: Optional[str] = None) -> None:
+        db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.lease_owner == worker_id)
+            .values(status=status, error=error, lease_owner=None, lease_expires_at=None,
+                    finished_at=utcnow() if status in ("done", "failed") else None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
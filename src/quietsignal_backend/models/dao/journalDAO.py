@@ -0,0 +1,29 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..entities.journalEntity import Journal
+from ...database.keyset import Cursor, before
+
+
+class JournalDAO:
+    @staticmethod
+    def create(db: Session, user_id: int, title: str):
+        journal = Journal(user_id=user_id, title=title)
+        db.add(journal)
+        db.commit()
+        db.refresh(journal)
+        return journal
+
+    @staticmethod
+    def get_for_user(db: Session, journal_id: int, user_id: int):
+        return db.execute(
+            select(Journal).where(Journal.id == journal_id, Journal.user_id == user_id)
+        ).scalars().first()
+
+    @staticmethod
+    def list_for_user(db: Session, user_id: int, limit: int, after: Optional[Cursor] = None) -> List[Journal]:
+        stmt = select(Journal).where(Journal.user_id == user_id)
+        if after is not None:
+            stmt = stmt.where(before(Journal.created_at, Journal.id, after))
+        stmt = stmt.order_by(Journal.created_at.desc(), Journal.id.desc()).limit(limit)
+        return list(db.execute(stmt).scalars())
@@ -0,0 +1,113 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..entities.moodRollupEntity import MoodRollup
+from ...sentiment import index_to_label
+
+PERIODS = ("day", "week", "month")
+
+# (user_id, period, period_start, label) -> [label_count delta, prob_sum delta]
+RollupKey = Tuple[int, str, date, str]
+Deltas = Dict[RollupKey, List[float]]
+
+
+def period_start(period: str, ts: datetime) -> date:
+    day = ts.date()
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def add_entry_delta(deltas: Deltas, user_id: int, created_at: datetime,
+                    probs: Optional[Dict[str, float]], label: Optional[str], sign: int = 1) -> None:
+    """Accumulates one entry's contribution (sign=-1 takes it back out) into `deltas`."""
+    if not probs:
+        return
+    for period in PERIODS:
+        start = period_start(period, created_at)
+        for idx, p in probs.items():
+            name = index_to_label(idx)
+            delta = deltas.setdefault((user_id, period, start, name), [0, 0.0])
+            delta[0] += sign if name == label else 0
+            delta[1] += sign * p
+
+
+class MoodRollupDAO:
+    @staticmethod
+    def apply(db: Session, deltas: Deltas) -> None:
+        """
+        Adds `deltas` to the rollup rows, creating missing ones. Does not
+        commit: callers apply it in the same transaction as the entry write.
+        """
+        deltas = {k: v for k, v in deltas.items() if v[0] or v[1]}
+        if not deltas:
+            return
+
+        existing = set()
+        for user_id in {k[0] for k in deltas}:
+            keys = [k for k in deltas if k[0] == user_id]
+            rows = db.execute(
+                select(MoodRollup.period, MoodRollup.period_start, MoodRollup.label).where(
+                    MoodRollup.user_id == user_id,
+                    MoodRollup.period_start.in_({k[2] for k in keys}),
+                )
+            )
+            existing.update((user_id, *row) for row in rows)
+
+        missing = [
+            {"user_id": u, "period": p, "period_start": st, "label": lb, "label_count": 0, "prob_sum": 0.0}
+            for u, p, st, lb in deltas if (u, p, st, lb) not in existing
+        ]
+        if missing:
+            insert_rows = MoodRollup.__table__.insert()
+            try:
+                # savepoint: a concurrent writer may create the same bucket first
+                with db.begin_nested():
+                    db.execute(insert_rows, missing)
+            except IntegrityError:
+                for row in missing:
+                    try:
+                        with db.begin_nested():
+                            db.execute(insert_rows, row)
+                    except IntegrityError:
+                        pass
+
+        table = MoodRollup.__table__
+        db.execute(
+            update(table)
+            .where(
+                table.c.user_id == bindparam("k_user_id"),
+                table.c.period == bindparam("k_period"),
+                table.c.period_start == bindparam("k_period_start"),
+                table.c.label == bindparam("k_label"),
+            )
+            .values(
+                label_count=table.c.label_count + bindparam("d_count"),
+                prob_sum=table.c.prob_sum + bindparam("d_prob"),
+            ),
+            [
+                {"k_user_id": u, "k_period": p, "k_period_start": s, "k_label": lb, "d_count": c, "d_prob": pr}
+                for (u, p, s, lb), (c, pr) in deltas.items()
+            ],
+        )
+
+    @staticmethod
+    def list_for_user(db: Session, user_id: int, period: str,
+                      start: Optional[date] = None, end: Optional[date] = None) -> List[MoodRollup]:
+        stmt = select(MoodRollup).where(MoodRollup.user_id == user_id, MoodRollup.period == period)
+        if start is not None:
+            stmt = stmt.where(MoodRollup.period_start >= start)
+        if end is not None:
+            stmt = stmt.where(MoodRollup.period_start <= end)
+        return list(db.execute(stmt.order_by(MoodRollup.period_start)).scalars())
+
+    @staticmethod
+    def delete_for_users(db: Session, user_ids: Optional[Iterable[int]] = None) -> None:
+        stmt = delete(MoodRollup)
+        if user_ids is not None:
+            stmt = stmt.where(MoodRollup.user_id.in_(list(user_ids)))
+        db.execute(stmt)
@@ -1,8 +1,16 @@
+from typing import Dict, Iterable, List, Set
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from ..entities.userEntity import User
 from ...models.dto.userDTO import UserCreateDTO
 
 
+def _is_async(db) -> bool:
+    # duck-typed so sqlalchemy.ext.asyncio (optional extra) isn't imported here
+    return hasattr(db, "sync_session")
+
+
 class UserDAO:
     @staticmethod
     def get_by_username(db: Session, username: str):
@@ -27,4 +35,88 @@ class UserDAO:
     
     @staticmethod
     def get_by_email(db: Session, email: str):
-        return db.query(User).filter(User.email == email).first()
\ No newline at end of file
+        return db.query(User).filter(User.email == email).first()
+
+    @staticmethod
+    def update_password(db: Session, user: User, hashed_password: str):
+        user.hashed_password = hashed_password
+        db.commit()
+        return user
+
+    @staticmethod
+    def existing_usernames(db: Session, usernames: Iterable[str]) -> Set[str]:
+        # one IN query answered from the unique index
+        usernames = list(usernames)
+        if not usernames:
+            return set()
+        return set(db.execute(select(User.username).where(User.username.in_(usernames))).scalars())
+
+    @staticmethod
+    def existing_emails(db: Session, emails: Iterable[str]) -> Set[str]:
+        emails = list(emails)
+        if not emails:
+            return set()
+        return set(db.execute(select(User.email).where(User.email.in_(emails))).scalars())
+
+    @staticmethod
+    def ids_by_username(db: Session, usernames: Iterable[str]) -> Dict[str, int]:
+        usernames = list(usernames)
+        if not usernames:
+            return {}
+        return dict(db.execute(select(User.username, User.id).where(User.username.in_(usernames))).all())
+
+    @staticmethod
+    def bulk_insert(db: Session, rows: List[Dict], commit: bool = True) -> int:
+        """One executemany INSERT for all rows (dicts of column values). Ids aren't returned."""
+        if not rows:
+            return 0
+        db.execute(insert(User), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
+    # async variants: native on an AsyncSession, the sync methods on the
+    # threadpool for a regular Session
+
+    @staticmethod
+    async def get_by_username_async(db, username: str):
+        if not _is_async(db):
+            return await run_in_threadpool(UserDAO.get_by_username, db, username)
+        result = await db.execute(select(User).where(User.username == username).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_by_id_async(db, user_id: int):
+        if not _is_async(db):
+            return await run_in_threadpool(UserDAO.get_by_id, db, user_id)
+        return await db.get(User, user_id)
+
+    @staticmethod
+    async def get_by_email_async(db, email: str):
+        if not _is_async(db):
+            return await run_in_threadpool(UserDAO.get_by_email, db, email)
+        result = await db.execute(select(User).where(User.email == email).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_async(db, dto: UserCreateDTO, hashed_password: str):
+        if not _is_async(db):
+            return await run_in_threadpool(UserDAO.create, db, dto, hashed_password)
+        user = User(
+            name=dto.name,
+            username=dto.username,
+            hashed_password=hashed_password,
+            email=dto.email
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+    @staticmethod
+    async def update_password_async(db, user: User, hashed_password: str):
+        if not _is_async(db):
+            return await run_in_threadpool(UserDAO.update_password, db, user, hashed_password)
+        user.hashed_password = hashed_password
+        await db.commit()
+        return user
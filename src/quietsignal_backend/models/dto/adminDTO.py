@@ -0,0 +1,55 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+
+class ModelReloadRequestDTO(BaseModel):
+    # file inside mlmodel/ to load, defaults to Model.joblib
+    filename: Optional[str] = Field(None, max_length=255)
+    # reload even if the artifact fingerprint did not change
+    force: bool = False
+
+    model_config = {"extra": "forbid"}
+
+
+class RecalculateEntriesRequestDTO(BaseModel):
+    # only entries scored by another model version (or never scored)
+    only_stale: bool = True
+    # restrict to one user's entries, all users by default
+    user_id: Optional[int] = None
+
+    model_config = {"extra": "forbid"}
+
+
+class ProfileCaptureRequestDTO(BaseModel):
+    # "sample": stack sampler over all threads (.collapsed, flamegraph-ready)
+    # "cprofile": deterministic profile of the event loop thread (.prof)
+    mode: Literal["sample", "cprofile"] = "sample"
+    # profile the next N matching requests; None profiles a time window
+    requests: Optional[int] = Field(None, ge=1, le=10000)
+    # window length, or the time limit for a request capture (capped by PROFILER_MAX_SECONDS)
+    seconds: Optional[float] = Field(None, gt=0)
+    # only requests whose path starts with this count, e.g. "/analyze"
+    path_prefix: Optional[str] = Field(None, max_length=200)
+
+    model_config = {"extra": "forbid"}
+
+
+class JobOutDTO(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Optional[Dict[str, Any]] = None
+    total: Optional[int] = None
+    processed: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # derived from processed and the time since started_at
+    progress: Optional[float] = None
+    rows_per_s: Optional[float] = None
+    eta_s: Optional[float] = None
+
+    model_config = {"from_attributes": True, "extra": "forbid"}
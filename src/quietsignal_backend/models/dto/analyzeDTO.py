@@ -1,9 +1,18 @@
 from pydantic import BaseModel, Field
-from typing import Dict
+from datetime import date
+from typing import Dict, List, Literal, Optional
 
 
 class AnalyzeRequestDTO(BaseModel):
     text: str = Field(...)
+    # "full" scores the whole text at once, "paragraph"/"sentence" score each segment
+    mode: Literal["full", "paragraph", "sentence"] = "full"
+
+    model_config = {"extra": "forbid"}
+
+
+class AnalyzeBatchRequestDTO(BaseModel):
+    texts: List[str] = Field(..., min_length=1)
 
     model_config = {"extra": "forbid"}
 
@@ -11,5 +20,42 @@ class AnalyzeRequestDTO(BaseModel):
 class AnalyzeResponseDTO(BaseModel):
     label: str
     probabilities: Dict[str, float]
+    # fingerprint of the Model.joblib that produced the scores
+    model_version: Optional[str] = None
+    # "first" when the cascade's first-stage model was confident enough, else "full"
+    stage: Literal["first", "full"] = "full"
 
     model_config = {"from_attributes": True, "extra": "forbid"}
+
+
+class SegmentResultDTO(BaseModel):
+    index: int
+    start: int
+    end: int
+    label: str
+    probabilities: Dict[str, float]
+
+    model_config = {"extra": "forbid"}
+
+
+class SegmentedAnalyzeResponseDTO(AnalyzeResponseDTO):
+    # label/probabilities hold the length-weighted aggregate over segments,
+    # stage is "full" if any segment needed the full model
+    segments: List[SegmentResultDTO]
+    truncated: bool = False
+
+
+class TrendBucketDTO(BaseModel):
+    period_start: date
+    count: int
+    # both keyed by sentiment.CLASS_LABELS names
+    label_counts: Dict[str, int]
+    mean_probabilities: Dict[str, float]
+
+
+class TrendsResponseDTO(BaseModel):
+    period: Literal["day", "week", "month"]
+    start: date
+    end: date
+    # buckets without entries are left out
+    buckets: List[TrendBucketDTO]
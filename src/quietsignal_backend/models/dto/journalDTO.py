@@ -0,0 +1,59 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class JournalOutDTO(BaseModel):
+    id: int
+    title: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "extra": "forbid"}
+
+
+class JournalPageDTO(BaseModel):
+    items: List[JournalOutDTO]
+    # pass back as ?cursor= for the next page, None on the last one
+    next_cursor: Optional[str] = None
+
+
+class EntryCreateDTO(BaseModel):
+    content: str = Field(..., min_length=1)
+
+    model_config = {"extra": "forbid"}
+
+
+class EntryBatchCreateDTO(BaseModel):
+    contents: List[str] = Field(..., min_length=1)
+
+    model_config = {"extra": "forbid"}
+
+
+class EntryAppendDTO(BaseModel):
+    paragraph: str = Field(..., min_length=1)
+
+    model_config = {"extra": "forbid"}
+
+
+class EntryAppendBatchDTO(BaseModel):
+    paragraphs: List[str] = Field(..., min_length=1)
+
+    model_config = {"extra": "forbid"}
+
+
+class EntryOutDTO(BaseModel):
+    id: int
+    journal_id: int
+    content: str
+    created_at: datetime
+    updated_at: datetime
+    sentiment_label: Optional[str] = None
+    sentiment_probs: Optional[Dict[str, float]] = None
+    model_version: Optional[str] = None
+
+    model_config = {"from_attributes": True, "extra": "forbid"}
+
+
+class EntryPageDTO(BaseModel):
+    items: List[EntryOutDTO]
+    next_cursor: Optional[str] = None
@@ -32,3 +32,20 @@ class LoginRequestDTO(BaseModel):
     password: str
 
     model_config = {"extra": "forbid"}
+
+
+class LoginResponseDTO(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user: UserOutDTO
+
+    model_config = {"extra": "forbid"}
+
+
+class RefreshRequestDTO(BaseModel):
+    # falls back to the refresh_token cookie when omitted
+    refresh_token: Optional[str] = None
+
+    model_config = {"extra": "forbid"}
@@ -0,0 +1,3 @@
+# every entity module, so Base.metadata is complete (and foreign keys to
+# users resolve) whichever one a process happens to import first
+from . import userEntity, journalEntity, entryEntity, moodRollupEntity, jobEntity  # noqa: F401
@@ -0,0 +1,25 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text
+from ...database import Base
+from .journalEntity import utcnow
+
+
+class Entry(Base):
+    __tablename__ = "entries"
+
+    id = Column(Integer, primary_key=True)
+    journal_id = Column(Integer, ForeignKey("journals.id", ondelete="CASCADE"), nullable=False)
+    # denormalized from the journal so per-user reads don't need the join
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+
+    # scored when the content is written, reads never run the model
+    sentiment_label = Column(String(32), nullable=True)
+    sentiment_probs = Column(JSON, nullable=True)
+    model_version = Column(String(32), nullable=True)
+
+    __table_args__ = (
+        Index("ix_entries_journal_created", "journal_id", "created_at", "id"),
+        Index("ix_entries_user_created", "user_id", "created_at", "id"),
+    )
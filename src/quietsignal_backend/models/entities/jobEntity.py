@@ -0,0 +1,35 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from ...database import Base
+from .journalEntity import utcnow
+
+
+class Job(Base):
+    """
+    A unit of background work. Workers lease a job (lease_owner and
+    lease_expires_at); a lease that isn't renewed in time makes the job
+    claimable again, resuming from `cursor`.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(32), nullable=False)
+    status = Column(String(16), nullable=False, default="queued")   # queued | running | done | failed
+    params = Column(JSON, nullable=True)
+
+    total = Column(Integer, nullable=True)
+    processed = Column(Integer, nullable=False, default=0)
+    # last entry id handled, where a re-claimed job picks up
+    cursor = Column(Integer, nullable=False, default=0)
+
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from ...database import Base
+
+
+def utcnow() -> datetime:
+    # naive UTC, what MySQL DATETIME stores
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Journal(Base):
+    __tablename__ = "journals"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String(200), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+
+    __table_args__ = (
+        # keyset listing: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_journals_user_created", "user_id", "created_at", "id"),
+    )
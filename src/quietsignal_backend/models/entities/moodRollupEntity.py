@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+from ...database import Base
+
+
+class MoodRollup(Base):
+    """
+    Per user, period bucket and sentiment label: how many entries got that label
+    and the sum of that label's probability over all entries in the bucket.
+    One row per label keeps every update a plain `col = col + :delta`.
+    """
+    __tablename__ = "mood_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(String(8), primary_key=True)          # "day" | "week" | "month"
+    period_start = Column(Date, primary_key=True)         # UTC day / ISO Monday / 1st of month
+    label = Column(String(32), primary_key=True)          # a sentiment.CLASS_LABELS value
+    label_count = Column(Integer, nullable=False, default=0)
+    prob_sum = Column(Float, nullable=False, default=0.0)
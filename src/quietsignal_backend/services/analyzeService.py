@@ -1,24 +1,185 @@
-from ..ml.modelLoader import predict_emotion
+from typing import AsyncIterator, List, Optional, Tuple
+
+from ..config import settings
+from ..common import serverTiming
+from ..common.ndjson import dumps_line
+from ..ml.modelLoader import FIRST_STAGE, FULL_STAGE, Prediction, predict_emotions
+from ..ml.batchScheduler import scheduler
+from ..ml.inferenceExecutor import executor
+from ..ml.predictionCache import prediction_cache
+from ..ml.segmenter import iter_segments
 from ..sentiment import index_to_label
-from ..models.dto.analyzeDTO import AnalyzeResponseDTO
+from ..models.dto.analyzeDTO import AnalyzeResponseDTO, SegmentResultDTO, SegmentedAnalyzeResponseDTO
 
 class AnalyzeService:
 
     @staticmethod
-    def analyze_text(text: str):
-        probs = predict_emotion(text)  # returns dict[str, float]
-
+    def label_for(probs):
         best_idx = max(probs, key=probs.get)
-        label = index_to_label(best_idx)
+        return index_to_label(best_idx)
+
+    @staticmethod
+    def to_response(prediction: Prediction) -> AnalyzeResponseDTO:
+        return AnalyzeResponseDTO(
+            label=AnalyzeService.label_for(prediction.probabilities),
+            probabilities=prediction.probabilities,
+            model_version=prediction.model_version,
+            stage=prediction.stage,
+        )
+
+    @staticmethod
+    def predict_text(text: str) -> Prediction:
+        key, prediction = prediction_cache.lookup(text)
+        if prediction is None:
+            prediction = predict_emotions([text])[0]
+            prediction_cache.store(key, prediction)
+        return prediction
+
+    @staticmethod
+    def analyze_text(text: str):
+        probs = AnalyzeService.predict_text(text).probabilities  # dict[str, float]
+        label = AnalyzeService.label_for(probs)
 
         return label, probs
 
     @staticmethod
     def analyze(request):
-        text = request.text
-        label, probs = AnalyzeService.analyze_text(text)
+        return AnalyzeService.to_response(AnalyzeService.predict_text(request.text))
 
-        return AnalyzeResponseDTO(
-            label=label,
-            probabilities=probs
+    @staticmethod
+    async def predict_one(text: str) -> Prediction:
+        """Cache, then the micro-batching scheduler."""
+        key, prediction = prediction_cache.lookup(text)
+        if prediction is None:
+            prediction = await scheduler.submit(text)
+            prediction_cache.store(key, prediction)
+        return prediction
+
+    @staticmethod
+    async def predict_many(texts: List[str], wait: bool = False) -> List[Prediction]:
+        """Cache hits are reused, all misses go to the executor as one predict_proba call."""
+        cached = [prediction_cache.lookup(text) for text in texts]
+        misses = [text for text, (_, hit) in zip(texts, cached) if hit is None]
+        rows = iter(())
+        if misses:
+            scored, timings = await executor.predict(misses, wait=wait)
+            serverTiming.record_many(timings)
+            rows = iter(scored)
+
+        predictions = []
+        for key, prediction in cached:
+            if prediction is None:
+                prediction = next(rows)
+                prediction_cache.store(key, prediction)
+            predictions.append(prediction)
+        return predictions
+
+    @staticmethod
+    async def analyze_request(request):
+        if request.mode == "full":
+            return await AnalyzeService.analyze_batched(request)
+        return await AnalyzeService.analyze_segmented(request.text, request.mode)
+
+    @staticmethod
+    async def analyze_batched(request):
+        # goes through the micro-batching scheduler instead of a 1-row predict_proba
+        prediction = await AnalyzeService.predict_one(request.text)
+        return AnalyzeService.to_response(prediction)
+
+    @staticmethod
+    async def analyze_segmented(text: str, mode: str, max_segments: int = settings.ANALYZE_MAX_SEGMENTS):
+        """
+        Splits text into paragraphs/sentences, scores every segment in one
+        predict_proba call and aggregates the distributions weighted by
+        segment length.
+        """
+        # one extra segment tells us whether the cap cut the text short
+        segments = list(iter_segments(text, mode, max_segments + 1))
+        truncated = len(segments) > max_segments
+        segments = segments[:max_segments]
+
+        if not segments:
+            # nothing but whitespace, fall back to a single-text score
+            prediction = await AnalyzeService.predict_one(text)
+            return SegmentedAnalyzeResponseDTO(
+                **AnalyzeService.to_response(prediction).model_dump(), segments=[]
+            )
+
+        predictions = await AnalyzeService.predict_many([seg.text for seg in segments])
+
+        results = []
+        totals: dict = {}
+        total_weight = 0
+        model_version = None
+        stage = FIRST_STAGE
+        for seg, prediction in zip(segments, predictions):
+            probs = prediction.probabilities
+            model_version = model_version or prediction.model_version
+            if prediction.stage == FULL_STAGE:
+                stage = FULL_STAGE
+
+            weight = len(seg.text)
+            total_weight += weight
+            for idx, p in probs.items():
+                totals[idx] = totals.get(idx, 0.0) + p * weight
+
+            results.append(SegmentResultDTO(
+                index=seg.index,
+                start=seg.start,
+                end=seg.end,
+                label=AnalyzeService.label_for(probs),
+                probabilities=probs,
+            ))
+
+        aggregate = {idx: p / total_weight for idx, p in totals.items()}
+        return SegmentedAnalyzeResponseDTO(
+            label=AnalyzeService.label_for(aggregate),
+            probabilities=aggregate,
+            model_version=model_version,
+            stage=stage,
+            segments=results,
+            truncated=truncated,
         )
+
+    @staticmethod
+    def batching_stats():
+        return {**scheduler.stats(), "executor": executor.stats(), "cache": prediction_cache.stats()}
+
+    @staticmethod
+    async def analyze_stream(items: AsyncIterator[Tuple[Optional[str], Optional[str]]],
+                             chunk_size: int = settings.ANALYZE_BATCH_CHUNK_SIZE) -> AsyncIterator[str]:
+        """
+        Scores (text, error) items in vectorized chunks and yields one NDJSON
+        line per item, in input order, as soon as its chunk is done.
+        Items that already carry an error are echoed back as error lines.
+        """
+        chunk = []
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield await AnalyzeService._score_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            yield await AnalyzeService._score_chunk(chunk)
+
+    @staticmethod
+    async def _score_chunk(chunk: List[Tuple[Optional[str], Optional[str]]]) -> str:
+        cached = [prediction_cache.lookup(text) if error is None else (None, None) for text, error in chunk]
+        misses = [text for (text, error), (_, hit) in zip(chunk, cached) if error is None and hit is None]
+        rows = iter(())
+        if misses:
+            scored, timings = await executor.predict(misses, wait=True)
+            serverTiming.record_many(timings)
+            rows = iter(scored)
+
+        lines = []
+        for (text, error), (key, prediction) in zip(chunk, cached):
+            if error is not None:
+                lines.append(dumps_line({"error": error}))
+                continue
+            if prediction is None:
+                prediction = next(rows)
+                prediction_cache.store(key, prediction)
+            lines.append(AnalyzeService.to_response(prediction).model_dump_json() + "\n")
+        return "".join(lines)
@@ -1,20 +1,91 @@
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+from jwt.exceptions import PyJWTError
 from sqlalchemy.orm import Session
+from ..config import settings
 from ..models.dao.userDAO import UserDAO
-from ..utils.security import verify_password, hash_password
-from ..utils.jwtHandler import create_access_token
+from ..utils.security import password_hasher
+from ..utils.jwtHandler import ACCESS, REFRESH, create_access_token, create_refresh_token, decode_token
+from ..utils.principalCache import Principal
+from ..utils.tokenDenylist import token_denylist
+
+
+class TokenPair(NamedTuple):
+    access_token: str
+    refresh_token: str
+    expires_in: int  # access token lifetime, seconds
 
 
 class AuthService:
     @staticmethod
-    def register(db, dto):
-        # duplicate checks omitted
-        hashed = hash_password(dto.password)
-        return UserDAO.create(db, dto, hashed)
-    
+    def issue_token(user):
+        # full principal claims so AUTH_STATELESS can skip the DB lookup
+        return create_access_token(Principal.from_user(user).to_claims())
+
+    @staticmethod
+    def issue_tokens(user) -> TokenPair:
+        return TokenPair(
+            access_token=AuthService.issue_token(user),
+            refresh_token=create_refresh_token(user.username),
+            expires_in=int(settings.access_token_expires.total_seconds()),
+        )
+
+    @staticmethod
+    def revoke(token: Optional[str], token_type: str = ACCESS) -> bool:
+        """Denylists `token` until it expires; invalid or already expired tokens are ignored."""
+        if not token:
+            return False
+        try:
+            payload = decode_token(token)
+        except PyJWTError:
+            return False
+        if payload.get("typ", ACCESS) != token_type or "exp" not in payload:
+            return False
+        token_denylist.revoke(payload.get("jti"), payload["exp"])
+        return True
+
+    # async variants: pbkdf2 runs on the dedicated password_hasher pool, `db`
+    # is an AsyncSession or a sync Session (the DAO threadpools the latter)
+
     @staticmethod
-    def authenticate(db, username, password):
-        user = UserDAO.get_by_username(db, username)
-        if not user or not verify_password(password, user.hashed_password):
+    async def register_async(db, dto):
+        hashed = await password_hasher.hash(dto.password)
+        return await UserDAO.create_async(db, dto, hashed)
+
+    @staticmethod
+    async def authenticate_async(db, username, password):
+        user = await UserDAO.get_by_username_async(db, username)
+        if not user:
+            return None
+
+        ok, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        if not ok:
             return None
-        token = create_access_token({"sub": user.username, "role": user.role})
-        return token, user
+        if new_hash:
+            # stored hash predates the current cost settings
+            await UserDAO.update_password_async(db, user, new_hash)
+
+        return AuthService.issue_tokens(user), user
+
+    @staticmethod
+    async def refresh_async(db, refresh_token):
+        """
+        Rotation: the presented refresh token is revoked and a new pair
+        issued, so each refresh token works once. The user is reloaded, a
+        deleted account or changed role takes effect here.
+        """
+        try:
+            payload = decode_token(refresh_token)
+        except PyJWTError:
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+        if payload.get("typ") != REFRESH or not payload.get("sub"):
+            raise HTTPException(status_code=401, detail="Invalid token type")
+        # spent before the await, or two concurrent refreshes would both pass
+        if not token_denylist.revoke(payload.get("jti"), payload["exp"]):
+            raise HTTPException(status_code=401, detail="Refresh token revoked")
+
+        user = await UserDAO.get_by_username_async(db, payload["sub"])
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        return AuthService.issue_tokens(user), user
@@ -0,0 +1,53 @@
+from typing import Dict, List
+
+from fastapi import HTTPException
+
+from ..database import run_db
+from ..models.dao.jobDAO import JobDAO
+from ..models.dto.adminDTO import JobOutDTO
+from ..models.entities.journalEntity import utcnow
+
+RESCORE_ENTRIES = "rescore_entries"
+
+
+def _submit_tx(db, kind: str, params: Dict):
+    # an identical job that hasn't finished yet already covers this request
+    existing = JobDAO.find_pending(db, kind, params)
+    if existing is not None:
+        return existing, False
+    return JobDAO.create(db, kind, params), True
+
+
+class JobService:
+
+    @staticmethod
+    def describe(job) -> JobOutDTO:
+        out = JobOutDTO.model_validate(job)
+        if job.total:
+            out.progress = round(min(job.processed / job.total, 1.0), 4)
+        if job.started_at is not None and job.processed:
+            elapsed = ((job.finished_at or utcnow()) - job.started_at).total_seconds()
+            if elapsed > 0:
+                out.rows_per_s = round(job.processed / elapsed, 1)
+                if job.total and job.status == "running":
+                    out.eta_s = round(max(job.total - job.processed, 0) / out.rows_per_s, 1)
+        return out
+
+    @staticmethod
+    async def submit_rescore(db, only_stale: bool = True, user_id: int = None):
+        """Queues a re-score of stored entries for the job workers. Returns (job, created)."""
+        params = {"only_stale": only_stale, "user_id": user_id}
+        job, created = await run_db(db, _submit_tx, RESCORE_ENTRIES, params)
+        return JobService.describe(job), created
+
+    @staticmethod
+    async def get(db, job_id: int) -> JobOutDTO:
+        job = await run_db(db, JobDAO.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JobService.describe(job)
+
+    @staticmethod
+    async def recent(db, limit: int = 20) -> List[JobOutDTO]:
+        jobs = await run_db(db, JobDAO.list_recent, limit)
+        return [JobService.describe(job) for job in jobs]
@@ -0,0 +1,134 @@
+import os
+import socket
+import sys
+import time
+from typing import Callable, Dict
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..ml.modelLoader import get_model_version, predict_emotions
+from ..models.dao.entryDAO import EntryDAO
+from ..models.dao.jobDAO import JobDAO
+from ..models.entities.entryEntity import Entry
+from ..models.entities.jobEntity import Job
+from .jobService import RESCORE_ENTRIES
+from .journalService import JournalService
+from .rollupService import RollupService
+
+
+class LeaseLost(Exception):
+    """Another worker took over the job (our lease expired)."""
+
+
+def rescore_entries(db: Session, job: Job, worker_id: str) -> None:
+    """
+    Re-scores stored entries in id order, JOB_BATCH_SIZE at a time: one
+    predict_proba call per batch, then the new scores and their rollup deltas
+    committed together with the job's progress so a re-claimed job resumes
+    exactly where the last batch ended.
+
+    Nothing is locked while the model runs. Each score is written with a
+    compare-and-swap on the content and updated_at it was computed from; an
+    entry written in the meantime was scored by that write and is skipped.
+    """
+    params = job.params or {}
+    conditions = []
+    if params.get("user_id") is not None:
+        conditions.append(Entry.user_id == params["user_id"])
+    if params.get("only_stale", True):
+        version = get_model_version()
+        conditions.append(or_(Entry.model_version.is_(None), Entry.model_version != version))
+
+    total = job.total
+    if total is None:
+        total = db.execute(select(func.count()).select_from(Entry).where(Entry.id > job.cursor, *conditions)).scalar()
+        total += job.processed
+        if not JobDAO.heartbeat(db, job, worker_id, settings.JOB_LEASE_S, total=total):
+            db.rollback()
+            raise LeaseLost()
+        db.commit()
+
+    cursor, processed = job.cursor, job.processed
+    columns = (Entry.id, Entry.user_id, Entry.created_at, Entry.updated_at, Entry.content,
+               Entry.sentiment_probs, Entry.sentiment_label)
+    while True:
+        started = time.perf_counter()
+        rows = db.execute(
+            select(*columns).where(Entry.id > cursor, *conditions).order_by(Entry.id).limit(settings.JOB_BATCH_SIZE)
+        ).all()
+        # end the read transaction before the model runs
+        db.rollback()
+        if not rows:
+            break
+
+        predictions = predict_emotions([row.content for row in rows])
+        changes, skipped = [], 0
+        for row, prediction in zip(rows, predictions):
+            sentiment = JournalService.sentiment_columns(prediction)
+            if not EntryDAO.replace_sentiment(db, row.id, row.content, row.updated_at, sentiment):
+                skipped += 1
+                continue
+            changes.append((row.user_id, row.created_at, row.sentiment_probs, row.sentiment_label,
+                            sentiment["sentiment_probs"], sentiment["sentiment_label"]))
+        RollupService.apply_changes(db, changes)
+
+        cursor, processed = rows[-1].id, processed + len(rows)
+        if not JobDAO.heartbeat(db, job, worker_id, settings.JOB_LEASE_S, processed=processed, cursor=cursor):
+            db.rollback()
+            raise LeaseLost()
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        note = f", {skipped} written meanwhile" if skipped else ""
+        print(f"[JOBS] job {job.id}: {processed}/{total} entries ({len(rows) / elapsed:.0f} rows/s{note})")
+
+
+HANDLERS: Dict[str, Callable[[Session, Job, str], None]] = {
+    RESCORE_ENTRIES: rescore_entries,
+}
+
+
+def run_job(db: Session, job: Job, worker_id: str) -> None:
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        handler(db, job, worker_id)
+    except LeaseLost:
+        print(f"[JOBS] Lost the lease on job {job.id}, leaving it to the new owner")
+        return
+    except Exception as exc:
+        db.rollback()
+        retry = job.attempts < settings.JOB_MAX_ATTEMPTS
+        print(f"[JOBS] Job {job.id} failed (attempt {job.attempts}): {exc}")
+        JobDAO.finish(db, job, worker_id, "queued" if retry else "failed", error=str(exc))
+        return
+    JobDAO.finish(db, job, worker_id, "done")
+    print(f"[JOBS] Job {job.id} done")
+
+
+def run_worker(once: bool = False) -> None:
+    """Claims and runs jobs until interrupted; `once` stops when the queue is empty."""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"[JOBS] Worker {worker_id} polling every {settings.JOB_POLL_INTERVAL_S}s")
+    while True:
+        with SessionLocal() as db:
+            job = JobDAO.claim(db, worker_id, settings.JOB_LEASE_S, settings.JOB_MAX_ATTEMPTS)
+            if job is not None:
+                print(f"[JOBS] Claimed job {job.id} ({job.kind}, attempt {job.attempts})")
+                run_job(db, job, worker_id)
+                continue
+        if once:
+            return
+        time.sleep(settings.JOB_POLL_INTERVAL_S)
+
+
+if __name__ == "__main__":
+    # python -m quietsignal_backend.services.jobWorker [--once]
+    try:
+        run_worker(once="--once" in sys.argv[1:])
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,223 @@
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..database import run_db
+from ..database.keyset import decode_cursor, encode_cursor
+from ..ml.modelLoader import Prediction
+from ..models.dao.entryDAO import EntryDAO
+from ..models.dao.journalDAO import JournalDAO
+from ..models.dto.journalDTO import EntryOutDTO, EntryPageDTO, JournalOutDTO, JournalPageDTO
+from ..models.entities.journalEntity import utcnow
+from .analyzeService import AnalyzeService
+from .rollupService import RollupService
+
+PARAGRAPH_SEPARATOR = "\n\n"
+# an append re-reads and re-scores when another write changed the entry meanwhile
+APPEND_MAX_ATTEMPTS = 3
+
+
+def _cursor_or_400(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _next_cursor(rows: List, limit: int) -> Optional[str]:
+    # rows were fetched with limit + 1, the extra one only says "there's more"
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.id)
+
+
+# units of work: the entry write and its rollup update share one transaction
+
+def _create_entry_tx(db, journal_id: int, user_id: int, content: str, sentiment: Dict):
+    entry = EntryDAO.create(db, journal_id, user_id, content, sentiment, commit=False)
+    RollupService.apply_changes(
+        db, [(user_id, entry.created_at, None, None, entry.sentiment_probs, entry.sentiment_label)]
+    )
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def _import_entries_tx(db, chunks: List[List[Dict]]) -> int:
+    # one transaction for the whole import: it lands completely or not at all
+    created = 0
+    for rows in chunks:
+        created += EntryDAO.bulk_insert(db, rows, commit=False)
+        RollupService.apply_changes(
+            db, [(r["user_id"], r["created_at"], None, None, r["sentiment_probs"], r["sentiment_label"]) for r in rows]
+        )
+    db.commit()
+    return created
+
+
+def _journal_exists_tx(db, journal_id: int, user_id: int) -> bool:
+    found = JournalDAO.get_for_user(db, journal_id, user_id) is not None
+    # the model runs next, don't keep the read transaction's connection through it
+    db.rollback()
+    return found
+
+
+def _entry_content_tx(db, journal_id: int, entry_id: int, user_id: int) -> Optional[str]:
+    entry = EntryDAO.get_for_user(db, journal_id, entry_id, user_id)
+    content = entry.content if entry is not None else None
+    # end the read transaction: no connection is held while the model scores
+    db.rollback()
+    return content
+
+
+def _append_entry_tx(db, journal_id: int, entry_id: int, user_id: int, expected: str, content: str,
+                     sentiment: Dict):
+    """
+    Saves `content`, scored as `sentiment`, if the entry still holds `expected`
+    (what the content was built from). None when a concurrent append won.
+    The rollup's old side comes from the locked row, not from the read the
+    content was built on, so a re-score in between can't be subtracted twice.
+    """
+    entry = EntryDAO.get_for_update(db, journal_id, entry_id, user_id)
+    if entry is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Entry not found")
+    if entry.content != expected:
+        db.rollback()
+        return None
+    old_probs, old_label = entry.sentiment_probs, entry.sentiment_label
+    # still a compare-and-swap: SQLite ignores FOR UPDATE
+    if not EntryDAO.replace_content(db, entry.id, expected, content, sentiment):
+        db.rollback()
+        return None
+    RollupService.apply_changes(
+        db, [(entry.user_id, entry.created_at, old_probs, old_label, sentiment["sentiment_probs"],
+              sentiment["sentiment_label"])]
+    )
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+class JournalService:
+
+    @staticmethod
+    def sentiment_columns(prediction: Prediction) -> Dict:
+        return {
+            "sentiment_label": AnalyzeService.label_for(prediction.probabilities),
+            "sentiment_probs": prediction.probabilities,
+            "model_version": prediction.model_version,
+        }
+
+    @staticmethod
+    async def create_journal(db, user, title: str) -> JournalOutDTO:
+        journal = await run_db(db, JournalDAO.create, user.id, title)
+        return JournalOutDTO.model_validate(journal)
+
+    @staticmethod
+    async def list_journals(db, user, limit: int, cursor: Optional[str] = None) -> JournalPageDTO:
+        after = _cursor_or_400(cursor)
+        rows = await run_db(db, JournalDAO.list_for_user, user.id, limit + 1, after)
+        return JournalPageDTO(
+            items=[JournalOutDTO.model_validate(j) for j in rows[:limit]],
+            next_cursor=_next_cursor(rows, limit),
+        )
+
+    @staticmethod
+    async def _journal_or_404(db, user, journal_id: int):
+        journal = await run_db(db, JournalDAO.get_for_user, journal_id, user.id)
+        if journal is None:
+            raise HTTPException(status_code=404, detail="Journal not found")
+        return journal
+
+    @staticmethod
+    async def _require_journal(db, user, journal_id: int) -> None:
+        """_journal_or_404 for callers that score next: the connection is released before returning."""
+        if not await run_db(db, _journal_exists_tx, journal_id, user.id):
+            raise HTTPException(status_code=404, detail="Journal not found")
+
+    @staticmethod
+    async def _entry_or_404(db, user, journal_id: int, entry_id: int):
+        entry = await run_db(db, EntryDAO.get_for_user, journal_id, entry_id, user.id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Entry not found")
+        return entry
+
+    @staticmethod
+    async def create_entry(db, user, journal_id: int, content: str) -> EntryOutDTO:
+        await JournalService._require_journal(db, user, journal_id)
+        # scored before the write so the row lands with its sentiment
+        prediction = await AnalyzeService.predict_one(content)
+        entry = await run_db(
+            db, _create_entry_tx, journal_id, user.id, content, JournalService.sentiment_columns(prediction)
+        )
+        return EntryOutDTO.model_validate(entry)
+
+    @staticmethod
+    async def import_entries(db, user, journal_id: int, contents: List[str],
+                             chunk_size: int = settings.ENTRY_IMPORT_CHUNK_SIZE) -> int:
+        """
+        Bulk create: each chunk is scored with one predict_proba call, then
+        every chunk is written with one executemany INSERT in a single
+        transaction, so a failed import leaves no partial rows behind.
+        Returns the number of rows created.
+        """
+        await JournalService._require_journal(db, user, journal_id)
+
+        chunks = []
+        for start in range(0, len(contents), chunk_size):
+            chunk = contents[start:start + chunk_size]
+            predictions = await AnalyzeService.predict_many(chunk, wait=True)
+            now = utcnow()
+            rows = [
+                {
+                    "journal_id": journal_id,
+                    "user_id": user.id,
+                    "content": content,
+                    "created_at": now,
+                    "updated_at": now,
+                    **JournalService.sentiment_columns(prediction),
+                }
+                for content, prediction in zip(chunk, predictions)
+            ]
+            chunks.append(rows)
+        return await run_db(db, _import_entries_tx, chunks)
+
+    @staticmethod
+    async def list_entries(db, user, journal_id: int, limit: int, cursor: Optional[str] = None) -> EntryPageDTO:
+        after = _cursor_or_400(cursor)
+        await JournalService._journal_or_404(db, user, journal_id)
+        rows = await run_db(db, EntryDAO.list_for_journal, journal_id, limit + 1, after)
+        return EntryPageDTO(
+            items=[EntryOutDTO.model_validate(e) for e in rows[:limit]],
+            next_cursor=_next_cursor(rows, limit),
+        )
+
+    @staticmethod
+    async def get_entry(db, user, journal_id: int, entry_id: int) -> EntryOutDTO:
+        entry = await JournalService._entry_or_404(db, user, journal_id, entry_id)
+        return EntryOutDTO.model_validate(entry)
+
+    @staticmethod
+    async def append(db, user, journal_id: int, entry_id: int, paragraphs: List[str]) -> EntryOutDTO:
+        """
+        Appends paragraphs to the entry and re-scores the whole content before
+        saving. The write only lands on the content that was scored; if another
+        append changed the entry meanwhile, it is read and scored again (409
+        after APPEND_MAX_ATTEMPTS).
+        """
+        for _ in range(APPEND_MAX_ATTEMPTS):
+            expected = await run_db(db, _entry_content_tx, journal_id, entry_id, user.id)
+            if expected is None:
+                raise HTTPException(status_code=404, detail="Entry not found")
+            content = PARAGRAPH_SEPARATOR.join([expected, *paragraphs])
+            prediction = await AnalyzeService.predict_one(content)
+            saved = await run_db(
+                db, _append_entry_tx, journal_id, entry_id, user.id, expected, content,
+                JournalService.sentiment_columns(prediction),
+            )
+            if saved is not None:
+                return EntryOutDTO.model_validate(saved)
+        raise HTTPException(status_code=409, detail="Entry is being changed concurrently, try again")
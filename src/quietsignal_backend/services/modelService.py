@@ -0,0 +1,43 @@
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..ml.modelLoader import MODEL_DIR, cascade_registry, registry
+
+
+class ModelService:
+    @staticmethod
+    def status():
+        status = registry.status()
+        if cascade_registry is not None:
+            status["cascade"] = {"threshold": settings.MODEL_CASCADE_THRESHOLD, **cascade_registry.status()}
+        return status
+
+    @staticmethod
+    def resolve_artifact(filename: Optional[str]) -> Path:
+        if not filename:
+            return registry.path
+        path = (MODEL_DIR / filename).resolve()
+        # only artifacts that live directly in mlmodel/ can be loaded
+        if path.parent != MODEL_DIR.resolve() or path.suffix != ".joblib":
+            raise HTTPException(status_code=400, detail="filename must be a .joblib file inside mlmodel/")
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=f"Model artifact {filename} not found")
+        return path
+
+    @staticmethod
+    async def reload(filename: Optional[str] = None, force: bool = False):
+        """
+        Loads and warms the artifact on a worker thread (requests keep being
+        served by the current version meanwhile), then swaps it in.
+        Returns the new version, or None if the artifact is unchanged.
+        """
+        path = ModelService.resolve_artifact(filename)
+        try:
+            new_version = await asyncio.to_thread(registry.reload, path, force)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Model reload failed: {exc}")
+        return new_version.version if new_version else None
@@ -0,0 +1,132 @@
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import run_db
+from ..models.dao.moodRollupDAO import PERIODS, Deltas, MoodRollupDAO, add_entry_delta, period_start
+from ..models.dto.analyzeDTO import TrendBucketDTO, TrendsResponseDTO
+from ..models.entities.entryEntity import Entry
+from ..models.entities.journalEntity import utcnow
+from ..sentiment import CLASS_LABELS
+
+# default window when no start date is given, in periods
+DEFAULT_WINDOW = {"day": 30, "week": 26, "month": 12}
+
+# (user_id, created_at, old_probs, old_label, new_probs, new_label); old or new may be None
+SentimentChange = Tuple[int, datetime, Optional[Dict[str, float]], Optional[str],
+                        Optional[Dict[str, float]], Optional[str]]
+
+
+class RollupService:
+
+    @staticmethod
+    def apply_changes(db: Session, changes: Iterable[SentimentChange]) -> None:
+        """
+        Folds entry sentiment changes into the rollups, inside the caller's
+        transaction (no commit) so entries and aggregates can't drift apart.
+        """
+        deltas: Deltas = {}
+        for user_id, created_at, old_probs, old_label, new_probs, new_label in changes:
+            add_entry_delta(deltas, user_id, created_at, old_probs, old_label, sign=-1)
+            add_entry_delta(deltas, user_id, created_at, new_probs, new_label, sign=1)
+        MoodRollupDAO.apply(db, deltas)
+
+    @staticmethod
+    def _window(period: str, start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+        end = end or utcnow().date()
+        if start is None:
+            periods = DEFAULT_WINDOW[period]
+            if period == "month":
+                start = end.replace(day=1)
+                for _ in range(periods - 1):
+                    start = (start - timedelta(days=1)).replace(day=1)
+            else:
+                step = 7 if period == "week" else 1
+                start = end - timedelta(days=step * (periods - 1))
+        return period_start(period, datetime.combine(start, datetime.min.time())), end
+
+    @staticmethod
+    async def trends(db, user, period: str, start: Optional[date] = None, end: Optional[date] = None) -> TrendsResponseDTO:
+        """Mood time series for `user`, read from the rollups only."""
+        if period not in PERIODS:
+            raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(PERIODS)}")
+        start, end = RollupService._window(period, start, end)
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must not be after end")
+
+        rows = await run_db(db, MoodRollupDAO.list_for_user, user.id, period, start, end)
+
+        by_bucket: Dict[date, List] = {}
+        for row in rows:
+            by_bucket.setdefault(row.period_start, []).append(row)
+
+        buckets = []
+        for bucket_start, bucket_rows in sorted(by_bucket.items()):
+            label_counts = {label: 0 for label in CLASS_LABELS.values()}
+            prob_sums = {label: 0.0 for label in CLASS_LABELS.values()}
+            for row in bucket_rows:
+                label_counts[row.label] = row.label_count
+                prob_sums[row.label] = row.prob_sum
+            count = sum(label_counts.values())
+            if count <= 0:
+                continue
+            buckets.append(TrendBucketDTO(
+                period_start=bucket_start,
+                count=count,
+                label_counts=label_counts,
+                mean_probabilities={label: s / count for label, s in prob_sums.items()},
+            ))
+
+        return TrendsResponseDTO(period=period, start=start, end=end, buckets=buckets)
+
+    @staticmethod
+    def rebuild(db: Session, user_ids: Optional[List[int]] = None,
+                chunk_size: int = settings.ROLLUP_REBUILD_CHUNK_SIZE) -> int:
+        """
+        Regenerates the rollups from the stored entry sentiment, reading entries
+        in id order `chunk_size` rows at a time. Runs as one transaction, so
+        readers keep seeing the old rollups until it commits. Returns the
+        number of entries folded in.
+        """
+        MoodRollupDAO.delete_for_users(db, user_ids)
+
+        columns = (Entry.id, Entry.user_id, Entry.created_at, Entry.sentiment_probs, Entry.sentiment_label)
+        last_id = 0
+        total = 0
+        while True:
+            stmt = select(*columns).where(Entry.id > last_id)
+            if user_ids is not None:
+                stmt = stmt.where(Entry.user_id.in_(user_ids))
+            chunk = db.execute(stmt.order_by(Entry.id).limit(chunk_size)).all()
+            if not chunk:
+                break
+
+            RollupService.apply_changes(
+                db, ((row.user_id, row.created_at, None, None, row.sentiment_probs, row.sentiment_label) for row in chunk)
+            )
+            last_id = chunk[-1].id
+            total += len(chunk)
+            print(f"[ROLLUP] {total} entries processed")
+
+        db.commit()
+        return total
+
+
+if __name__ == "__main__":
+    # python -m quietsignal_backend.services.rollupService rebuild [user_id ...]
+    if len(sys.argv) >= 2 and sys.argv[1] == "rebuild":
+        from ..database import SessionLocal
+
+        ids = [int(arg) for arg in sys.argv[2:]] or None
+        started = time.perf_counter()
+        with SessionLocal() as session:
+            count = RollupService.rebuild(session, ids)
+        print(f"[ROLLUP] Rebuilt rollups from {count} entries in {time.perf_counter() - started:.1f}s")
+    else:
+        print("usage: python -m quietsignal_backend.services.rollupService rebuild [user_id ...]")
@@ -0,0 +1,183 @@
+import csv
+import io
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..common.ndjson import dumps_line
+from ..database import SessionLocal
+from ..models.dao.userDAO import UserDAO
+from ..models.dto.userDTO import UserCreateDTO
+from ..utils.security import bulk_password_hasher
+
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+CSV_COLUMNS = ("name", "username", "email", "password")
+CSV_REQUIRED_COLUMNS = ("name", "username", "password")
+
+# (line number, row dict or None, parse error or None), the shape iter_ndjson yields
+Item = Tuple[int, Any, Optional[str]]
+
+
+def read_csv_header(spool: IO[bytes]) -> Tuple[IO[str], Any, List[str]]:
+    """
+    Opens a spooled CSV upload: (text stream, csv reader, normalized header).
+    Raises ValueError when the header row isn't usable.
+    """
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [column.strip().lower() for column in next(reader, [])]
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in header]
+    unknown = [column for column in header if column not in CSV_COLUMNS]
+    if missing or unknown:
+        text.close()
+        raise ValueError(
+            f"CSV header must have {', '.join(CSV_REQUIRED_COLUMNS)} (email optional)"
+            + (f"; missing: {', '.join(missing)}" if missing else "")
+            + (f"; unknown: {', '.join(unknown)}" if unknown else "")
+        )
+    return text, reader, header
+
+
+async def iter_csv(text: IO[str], reader: Any, header: Sequence[str]) -> AsyncIterator[Item]:
+    # rows come off the spool a line at a time, like iter_spool
+    try:
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            if len(values) != len(header):
+                yield reader.line_num, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            row = dict(zip(header, values))
+            if not row.get("email"):
+                row["email"] = None
+            yield reader.line_num, row, None
+    except (csv.Error, UnicodeDecodeError) as exc:
+        # the rest of the file can't be read reliably, report it on the row where it broke
+        yield reader.line_num + 1, None, f"Unreadable CSV, import stopped: {exc}"
+    finally:
+        text.close()
+
+
+def _existing_tx(usernames: List[str], emails: List[str]) -> Tuple[Set[str], Set[str]]:
+    with SessionLocal() as db:
+        return UserDAO.existing_usernames(db, usernames), UserDAO.existing_emails(db, emails)
+
+
+def _insert_tx(rows: List[Dict]) -> Tuple[Dict[str, int], Set[str]]:
+    """Inserts rows in one transaction; returns username -> id and the usernames that collided."""
+    with SessionLocal() as db:
+        conflicts = set()
+        try:
+            UserDAO.bulk_insert(db, rows)
+        except IntegrityError:
+            # someone took a name or email since the pre-check, find out which rows
+            db.rollback()
+            for row in rows:
+                try:
+                    UserDAO.bulk_insert(db, [row])
+                except IntegrityError:
+                    db.rollback()
+                    conflicts.add(row["username"])
+        created = [row["username"] for row in rows if row["username"] not in conflicts]
+        return UserDAO.ids_by_username(db, created), conflicts
+
+
+class UserImportService:
+
+    @staticmethod
+    async def import_stream(items: AsyncIterator[Item],
+                            chunk_size: int = settings.USER_IMPORT_CHUNK_SIZE) -> AsyncIterator[str]:
+        """
+        Creates users from (line, row, error) items chunk by chunk and yields
+        one NDJSON result line per row, in input order, then a summary line.
+        Per chunk: one IN query each for taken usernames and emails, one
+        process-pool fan-out for the hashes and one INSERT transaction.
+        """
+        seen_usernames: Set[str] = set()
+        seen_emails: Set[str] = set()
+        summary = {"rows": 0, "created": 0, "duplicate": 0, "invalid": 0}
+
+        chunk: List[Item] = []
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield await UserImportService._import_chunk(chunk, seen_usernames, seen_emails, summary)
+                chunk = []
+        if chunk:
+            yield await UserImportService._import_chunk(chunk, seen_usernames, seen_emails, summary)
+
+        yield dumps_line({"summary": summary})
+
+    @staticmethod
+    async def _import_chunk(chunk: List[Item], seen_usernames: Set[str], seen_emails: Set[str],
+                            summary: Dict[str, int]) -> str:
+        results: Dict[int, Dict] = {}
+        candidates: List[Tuple[int, UserCreateDTO]] = []
+
+        for line_no, value, error in chunk:
+            if error is None and not isinstance(value, dict):
+                error = "Expected an object with name, username, email, password"
+            if error is not None:
+                results[line_no] = {"row": line_no, "status": "invalid", "error": error}
+                continue
+            try:
+                dto = UserCreateDTO.model_validate(value)
+            except ValidationError as e:
+                # never echo the input back, it holds the password
+                results[line_no] = {
+                    "row": line_no,
+                    "status": "invalid",
+                    "errors": e.errors(include_url=False, include_context=False, include_input=False),
+                }
+                continue
+            if dto.username in seen_usernames or (dto.email and dto.email in seen_emails):
+                results[line_no] = {"row": line_no, "username": dto.username, "status": "duplicate",
+                                    "error": "Username or email repeated in this import"}
+                continue
+            seen_usernames.add(dto.username)
+            if dto.email:
+                seen_emails.add(dto.email)
+            candidates.append((line_no, dto))
+
+        if candidates:
+            taken_usernames, taken_emails = await run_in_threadpool(
+                _existing_tx,
+                [dto.username for _, dto in candidates],
+                [dto.email for _, dto in candidates if dto.email],
+            )
+            fresh = []
+            for line_no, dto in candidates:
+                if dto.username in taken_usernames:
+                    error = "Username already exists"
+                elif dto.email and dto.email in taken_emails:
+                    error = "Email already exists"
+                else:
+                    fresh.append((line_no, dto))
+                    continue
+                results[line_no] = {"row": line_no, "username": dto.username, "status": "duplicate", "error": error}
+
+            if fresh:
+                hashes = await bulk_password_hasher.hash_many([dto.password for _, dto in fresh])
+                rows = [
+                    {"name": dto.name, "username": dto.username, "email": dto.email, "hashed_password": hashed}
+                    for (_, dto), hashed in zip(fresh, hashes)
+                ]
+                ids, conflicts = await run_in_threadpool(_insert_tx, rows)
+                for line_no, dto in fresh:
+                    if dto.username in conflicts:
+                        results[line_no] = {"row": line_no, "username": dto.username, "status": "duplicate",
+                                            "error": "Username or email already exists"}
+                    else:
+                        results[line_no] = {"row": line_no, "username": dto.username, "status": "created",
+                                            "id": ids.get(dto.username)}
+
+        lines = []
+        for line_no, _, _ in chunk:
+            result = results[line_no]
+            summary["rows"] += 1
+            summary[result["status"]] += 1
+            lines.append(dumps_line(result))
+        return "".join(lines)
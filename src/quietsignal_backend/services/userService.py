@@ -2,12 +2,18 @@
 from sqlalchemy.orm import Session
 from ..models.dao.userDAO import UserDAO
 from ..models.dto.userDTO import UserCreateDTO, UserOutDTO
-from ..utils.security import hash_password
+from ..utils.security import hash_password, password_hasher
 
 
 class UserService:
     @staticmethod
     def create_user(db: Session, data: UserCreateDTO):
         hashed = hash_password(data.password)
-        user = UserDAO.create(db, username=data.username, hashed_password=hashed, email=data.email)
+        user = UserDAO.create(db, data, hashed)
+        return UserOutDTO.model_validate(user)
+
+    @staticmethod
+    async def create_user_async(db, data: UserCreateDTO):
+        hashed = await password_hasher.hash(data.password)
+        user = await UserDAO.create_async(db, data, hashed)
         return UserOutDTO.model_validate(user)
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+from typing import Callable, Dict
+
+from sqlalchemy import text
+
+from .config import settings
+
+# step name -> duration in ms, filled in by run_startup()
+startup_timings: Dict[str, float] = {}
+
+
+async def _step(name: str, fn: Callable[[], None]) -> None:
+    # blocking work goes to a thread so independent steps overlap
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(fn)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        startup_timings[name] = round(elapsed_ms, 1)
+        print(f"[STARTUP] {name} took {elapsed_ms:.0f} ms")
+
+
+def init_schema() -> None:
+    """CREATE DATABASE / tables / missing columns, one worker at a time."""
+    from .database.dbInitializer import initialize_database, schema_lock
+
+    with schema_lock(settings.DB_INIT_LOCK_TIMEOUT_S) as acquired:
+        if not acquired:
+            raise RuntimeError(
+                f"Timed out after {settings.DB_INIT_LOCK_TIMEOUT_S}s waiting for the schema lock"
+            )
+        initialize_database()
+
+
+def warm_db() -> None:
+    """Opens DB_WARMUP_CONNECTIONS pooled connections so early requests skip the connect."""
+    from .database import engine
+
+    count = max(0, min(settings.DB_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE))
+    connections = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    except Exception as exc:
+        # not fatal, requests will connect on demand
+        print(f"[STARTUP] DB warmup failed: {exc}")
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def load_model() -> None:
+    from .ml.modelLoader import cascade_registry, registry
+
+    registry.current()
+    if cascade_registry is not None:
+        cascade_registry.current()
+
+
+async def run_startup() -> Dict[str, float]:
+    """
+    Schema check and pool warmup run in parallel with the model load; each
+    step reports its own time. A schema failure aborts startup.
+    """
+    start = time.perf_counter()
+
+    async def _db():
+        if settings.DB_INIT_ON_STARTUP:
+            await _step("schema", init_schema)
+        await _step("db warmup", warm_db)
+
+    await asyncio.gather(_db(), _step("model load", load_model))
+
+    from .utils.tokenDenylist import token_denylist
+
+    # no-op with the local backend
+    token_denylist.start_sync()
+
+    startup_timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    print(f"[STARTUP] Ready in {startup_timings['total']:.0f} ms")
+    return startup_timings
+
+
+async def run_shutdown() -> None:
+    from .database import engine, read_engine, async_engine
+    from .ml.inferenceExecutor import executor
+    from .utils.security import bulk_password_hasher, password_hasher
+    from .utils.tokenDenylist import token_denylist
+
+    token_denylist.stop_sync()
+    await asyncio.to_thread(executor.shutdown)
+    await asyncio.to_thread(password_hasher.shutdown)
+    await asyncio.to_thread(bulk_password_hasher.shutdown)
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+
+
+if __name__ == "__main__":
+    # deploy step when DB_INIT_ON_STARTUP=false:
+    # python -m quietsignal_backend.startup init-db
+    if len(sys.argv) >= 2 and sys.argv[1] == "init-db":
+        start = time.perf_counter()
+        init_schema()
+        print(f"[STARTUP] schema took {(time.perf_counter() - start) * 1000:.0f} ms")
+    else:
+        print("usage: python -m quietsignal_backend.startup init-db")
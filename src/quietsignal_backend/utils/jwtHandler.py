@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 import jwt
 from jwt.exceptions import PyJWTError
@@ -9,12 +10,30 @@ SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+# "typ" claim; tokens issued before it existed are access tokens
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+def new_jti() -> str:
+    # uuid4 hex: 128 random bits, hashed as-is by the token denylist
+    return uuid.uuid4().hex
+
+
+def _encode(data: Dict[str, Any], token_type: str, expires_delta: timedelta) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    now = datetime.now(timezone.utc)
+    to_encode.update({"exp": now + expires_delta, "iat": now, "jti": new_jti(), "typ": token_type})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    return _encode(data, ACCESS, expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(username: str, expires_delta: Optional[timedelta] = None) -> str:
+    # only the subject: refreshing reloads the user, so role changes apply
+    return _encode({"sub": username}, REFRESH, expires_delta or settings.refresh_token_expires)
 
 
 def decode_token(token: str) -> Dict[str, Any]:
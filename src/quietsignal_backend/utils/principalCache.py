@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event, inspect
+
+from ..config import settings
+from ..common.lruCache import LRUCache
+from ..common.metrics import Counter
+from ..models.entities.userEntity import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    What the auth layer needs to know about the caller. Detached from the
+    session, so it can be cached and shared between requests.
+    """
+    id: int
+    name: str
+    username: str
+    email: Optional[str]
+    role: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, name=user.name, username=user.username, email=user.email, role=user.role)
+
+    @classmethod
+    def from_claims(cls, payload: Mapping[str, Any]) -> Optional["Principal"]:
+        """Builds a principal from signed token claims, None for tokens issued without them."""
+        try:
+            return cls(
+                id=int(payload["uid"]),
+                name=payload["name"],
+                username=payload["sub"],
+                email=payload.get("email"),
+                role=payload["role"],
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def to_claims(self) -> Dict[str, Any]:
+        return {"sub": self.username, "role": self.role, "uid": self.id, "name": self.name, "email": self.email}
+
+
+class PrincipalCache:
+    """
+    Short-lived username -> Principal cache in front of UserDAO.get_by_username.
+    Entries are dropped when the user row changes through the ORM (see
+    install_invalidation_hooks); bulk UPDATEs must call invalidate() themselves.
+    Each worker has its own cache, the TTL bounds cross-worker staleness.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.ttl = ttl
+        self.enabled = ttl > 0
+        self._cache = LRUCache(max_size)
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self.invalidations = Counter()
+
+    def get(self, username: str) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        principal = self._cache.get(username)
+        if principal is None:
+            self.misses.inc()
+        else:
+            self.hits.inc()
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        if self.enabled:
+            self._cache.set(principal.username, principal, self.ttl)
+
+    def invalidate(self, username: Optional[str]) -> None:
+        if username:
+            self._cache.delete(username)
+            self.invalidations.inc()
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "invalidations": self.invalidations.value,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_S,
+)
+
+
+def _invalidate_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate(target.username)
+    # a rename leaves the old username cached otherwise
+    for old_username in inspect(target).attrs.username.history.deleted or ():
+        principal_cache.invalidate(old_username)
+
+
+def install_invalidation_hooks() -> None:
+    if not event.contains(User, "after_update", _invalidate_user):
+        event.listen(User, "after_update", _invalidate_user)
+        event.listen(User, "after_delete", _invalidate_user)
+
+
+install_invalidation_hooks()
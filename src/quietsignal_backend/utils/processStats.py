@@ -0,0 +1,38 @@
+import os
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def memory_usage_mb() -> Dict[str, Optional[float]]:
+    """
+    Memory of the current process in MB.
+    rss: resident set size, pss: proportional share (pages shared with other
+    workers, e.g. an mmap'ed model, are split between them). pss is Linux only;
+    on other platforms rss falls back to the peak RSS when available.
+    """
+    usage: Dict[str, Optional[float]] = {"rss": None, "pss": None}
+
+    try:
+        with open("/proc/self/smaps_rollup") as fh:
+            for line in fh:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    usage[key.lower()] = int(rest.split()[0]) / 1024
+        return usage
+    except OSError:
+        pass
+
+    if resource is not None:
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss"] = peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+    return usage
+
+
+def format_memory(usage: Dict[str, Optional[float]]) -> str:
+    parts = [f"{key}={value:.1f}MB" for key, value in usage.items() if value is not None]
+    return " ".join(parts) or "n/a"
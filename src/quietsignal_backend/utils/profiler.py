@@ -0,0 +1,246 @@
+import asyncio
+import cProfile
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+
+MODES = ("sample", "cprofile")
+
+# the profiler's own routes and scrapes would only add noise to a capture
+IGNORED_PREFIXES = ("/admin/profiler", "/metrics")
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler. Every `interval_s` a background thread reads
+    sys._current_frames() and counts each thread's stack, so work on the
+    inference and DB threadpools shows up next to the event loop. Output is
+    the collapsed-stack format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileCapture:
+    """
+    One capture: either the next `requests` matching requests or, without a
+    request count, a `seconds` window. `seconds` also bounds request captures.
+    """
+
+    def __init__(self, mode: str, requests: Optional[int], seconds: float, path_prefix: Optional[str]):
+        self.id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.requests = requests
+        self.seconds = seconds
+        self.path_prefix = path_prefix
+        self.status = "armed"  # armed -> running -> done | failed
+        self.matched = 0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.file: Optional[Path] = None
+        self.error: Optional[str] = None
+
+        self._sampler: Optional[StackSampler] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._deadline: Optional[asyncio.TimerHandle] = None
+
+    def matches(self, path: str) -> bool:
+        if path.startswith(IGNORED_PREFIXES):
+            return False
+        return self.path_prefix is None or path.startswith(self.path_prefix)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "status": self.status,
+            "requests": self.requests,
+            "matched": self.matched,
+            "seconds": self.seconds,
+            "path_prefix": self.path_prefix,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "samples": self._sampler.samples if self._sampler is not None else None,
+            "file": self.file.name if self.file is not None else None,
+            "size_bytes": self.file.stat().st_size if self.file is not None and self.file.exists() else None,
+            "error": self.error,
+        }
+
+
+class Profiler:
+    """
+    Opt-in production profiling, one capture at a time.
+
+    mode="sample"   -> StackSampler over all threads, saved as .collapsed
+    mode="cprofile" -> cProfile of the event loop thread (routing, pydantic,
+                       response rendering; not the executor threads), saved
+                       as .prof for pstats / snakeviz
+
+    While no capture is active ProfilerMiddleware does one attribute check
+    per request, and with PROFILER_ENABLED off it isn't installed at all.
+    Everything runs on the event loop thread, so no locking.
+    """
+
+    def __init__(self, enabled: bool, directory: Path, interval_ms: float, max_seconds: float, keep: int):
+        self.enabled = enabled
+        self.directory = directory
+        self.interval_s = max(interval_ms, 0.1) / 1000.0
+        self.max_seconds = max_seconds
+        self.active: Optional[ProfileCapture] = None
+        self._history: Deque[ProfileCapture] = deque()
+        self._keep = max(int(keep), 1)
+
+    def start(self, mode: str, requests: Optional[int], seconds: Optional[float],
+              path_prefix: Optional[str] = None) -> ProfileCapture:
+        if not self.enabled:
+            raise HTTPException(status_code=400, detail="Profiler is disabled, set PROFILER_ENABLED=true")
+        if mode not in MODES:
+            raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(MODES)}")
+        if self.active is not None:
+            raise HTTPException(status_code=409, detail=f"Capture {self.active.id} is still running")
+
+        capture = ProfileCapture(mode, requests, min(seconds or self.max_seconds, self.max_seconds), path_prefix)
+        capture._deadline = asyncio.get_running_loop().call_later(capture.seconds, self.finish, capture)
+        self.active = capture
+        self._remember(capture)
+        if requests is None:
+            self._begin(capture)
+        return capture
+
+    def request_started(self, capture: ProfileCapture) -> None:
+        if capture.status == "armed":
+            self._begin(capture)
+
+    def request_finished(self, capture: ProfileCapture) -> None:
+        capture.matched += 1
+        if capture.requests is not None and capture.matched >= capture.requests:
+            self.finish(capture)
+
+    def _begin(self, capture: ProfileCapture) -> None:
+        capture.status = "running"
+        capture.started_at = time.time()
+        try:
+            if capture.mode == "sample":
+                capture._sampler = StackSampler(self.interval_s)
+                capture._sampler.start()
+            else:
+                capture._profile = cProfile.Profile()
+                capture._profile.enable()
+        except Exception as exc:
+            # e.g. another profiler already hooked into the interpreter
+            self._fail(capture, exc)
+
+    def finish(self, capture: ProfileCapture) -> None:
+        if self.active is not capture:
+            return
+        self.active = None
+        if capture._deadline is not None:
+            capture._deadline.cancel()
+        capture.finished_at = time.time()
+
+        if capture.status == "armed":
+            # deadline hit before a matching request came in
+            capture.status = "done"
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if capture._sampler is not None:
+                capture._sampler.stop()
+                capture.file = self.directory / f"{capture.id}.collapsed"
+                capture.file.write_text(capture._sampler.collapsed(), encoding="utf-8")
+            elif capture._profile is not None:
+                capture._profile.disable()
+                capture.file = self.directory / f"{capture.id}.prof"
+                capture._profile.dump_stats(str(capture.file))
+            capture.status = "done"
+            print(f"[PROFILER] Capture {capture.id} ({capture.mode}, {capture.matched} requests) saved to {capture.file}")
+        except Exception as exc:
+            self._fail(capture, exc)
+
+    def stop(self) -> Optional[ProfileCapture]:
+        capture = self.active
+        if capture is not None:
+            self.finish(capture)
+        return capture
+
+    def _fail(self, capture: ProfileCapture, exc: Exception) -> None:
+        capture.status = "failed"
+        capture.error = str(exc)
+        if self.active is capture:
+            self.active = None
+            if capture._deadline is not None:
+                capture._deadline.cancel()
+        print(f"[PROFILER] Capture {capture.id} failed: {exc}")
+
+    def _remember(self, capture: ProfileCapture) -> None:
+        self._history.append(capture)
+        while len(self._history) > self._keep:
+            old = self._history.popleft()
+            if old.file is not None:
+                old.file.unlink(missing_ok=True)
+
+    def get(self, capture_id: str) -> ProfileCapture:
+        for capture in self._history:
+            if capture.id == capture_id:
+                return capture
+        raise HTTPException(status_code=404, detail="Capture not found")
+
+    def captures(self) -> List[Dict]:
+        return [capture.to_dict() for capture in reversed(self._history)]
+
+
+profiler = Profiler(
+    enabled=settings.PROFILER_ENABLED,
+    directory=Path(settings.PROFILER_DIR),
+    interval_ms=settings.PROFILER_SAMPLE_INTERVAL_MS,
+    max_seconds=settings.PROFILER_MAX_SECONDS,
+    keep=settings.PROFILER_KEEP,
+)
@@ -0,0 +1,172 @@
+import math
+import time
+from typing import Dict, Hashable, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..common.metrics import Counter
+
+
+class TokenBucketTable:
+    """
+    One token bucket per key (client IP, username) in a single dict of
+    key -> (tokens, last refill). A bucket refills at `rate` tokens/s up to
+    `burst`; once it's been idle long enough to be full again it is
+    indistinguishable from a new one and gets evicted. Keys are re-inserted
+    on every use, so the dict is ordered by last use and eviction only ever
+    looks at its front. `max_keys` bounds memory when many keys are active.
+
+    Only touched from the event loop thread, no lock needed.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.max_keys = max(int(max_keys), 1)
+        # time an empty bucket needs to be full again
+        self.idle_after = self.burst / self.rate
+        self._buckets: Dict[Hashable, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: Hashable, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """Takes `cost` tokens from `key`'s bucket: 0.0 when admitted, else seconds until it would be."""
+        now = time.monotonic() if now is None else now
+        buckets = self._buckets
+        entry = buckets.pop(key, None)
+        if entry is None:
+            tokens = self.burst
+        else:
+            tokens = min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+
+        if tokens >= cost:
+            buckets[key] = (tokens - cost, now)
+            wait = 0.0
+        else:
+            buckets[key] = (tokens, now)
+            wait = (cost - tokens) / self.rate
+
+        self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while len(buckets) > self.max_keys:
+            del buckets[next(iter(buckets))]
+        # a couple per call keeps up with the insert rate
+        for _ in range(2):
+            oldest = next(iter(buckets), None)
+            if oldest is None or now - buckets[oldest][1] < self.idle_after:
+                return
+            del buckets[oldest]
+
+
+class ConcurrencyLimit:
+    """In-flight cap for one endpoint class; over it the request is shed, not queued."""
+
+    def __init__(self, limit: int):
+        self.limit = max(int(limit), 1)
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        # event loop thread only
+        if self._in_flight >= self.limit:
+            return False
+        self._in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self._in_flight -= 1
+
+
+def _retry_after(wait: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(wait)))}
+
+
+class EndpointLimits:
+    """
+    Admission policy of one endpoint class: token buckets per client IP and
+    per principal (429 when empty) and a global concurrency cap (503 when
+    full). A rate of 0 or a cap of 0 disables that limit.
+    """
+
+    def __init__(self, name: str, ip_rate: float, ip_burst: int, user_rate: float, user_burst: int,
+                 concurrency: int, max_keys: int):
+        self.name = name
+        self.by_ip = TokenBucketTable(ip_rate, ip_burst, max_keys) if ip_rate > 0 else None
+        self.by_user = TokenBucketTable(user_rate, user_burst, max_keys) if user_rate > 0 else None
+        self.concurrency = ConcurrencyLimit(concurrency) if concurrency > 0 else None
+
+        self.rejected_ip = Counter()
+        self.rejected_user = Counter()
+        self.rejected_concurrency = Counter()
+
+    def check_ip(self, ip: str) -> None:
+        if self.by_ip is None:
+            return
+        wait = self.by_ip.take(ip)
+        if wait:
+            self.rejected_ip.inc()
+            raise HTTPException(status_code=429, detail="Too many requests, slow down", headers=_retry_after(wait))
+
+    def check_user(self, username: Optional[str], cost: float = 1.0) -> None:
+        if self.by_user is None or not username:
+            return
+        wait = self.by_user.take(username, cost)
+        if wait:
+            self.rejected_user.inc()
+            raise HTTPException(status_code=429, detail="Too many requests, slow down", headers=_retry_after(wait))
+
+    def acquire(self) -> None:
+        """Takes a concurrency slot; pair with release() when the response is done."""
+        if self.concurrency is not None and not self.concurrency.try_acquire():
+            self.rejected_concurrency.inc()
+            raise HTTPException(status_code=503, detail="Server busy, retry later", headers=_retry_after(1))
+
+    def release(self) -> None:
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+    def stats(self) -> Dict:
+        return {
+            "ip_buckets": len(self.by_ip) if self.by_ip is not None else None,
+            "user_buckets": len(self.by_user) if self.by_user is not None else None,
+            "in_flight": self.concurrency.in_flight if self.concurrency is not None else None,
+            "concurrency_limit": self.concurrency.limit if self.concurrency is not None else None,
+            "rejected_ip": self.rejected_ip.value,
+            "rejected_user": self.rejected_user.value,
+            "rejected_concurrency": self.rejected_concurrency.value,
+        }
+
+
+# "analyze": anything that runs the model; "auth": anything that runs pbkdf2
+rate_limits: Dict[str, EndpointLimits] = {
+    "analyze": EndpointLimits(
+        "analyze",
+        ip_rate=settings.RATE_LIMIT_ANALYZE_IP_PER_S,
+        ip_burst=settings.RATE_LIMIT_ANALYZE_IP_BURST,
+        user_rate=settings.RATE_LIMIT_ANALYZE_USER_PER_S,
+        user_burst=settings.RATE_LIMIT_ANALYZE_USER_BURST,
+        concurrency=settings.CONCURRENCY_LIMIT_ANALYZE,
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    ),
+    "auth": EndpointLimits(
+        "auth",
+        ip_rate=settings.RATE_LIMIT_AUTH_IP_PER_S,
+        ip_burst=settings.RATE_LIMIT_AUTH_IP_BURST,
+        user_rate=settings.RATE_LIMIT_AUTH_USER_PER_S,
+        user_burst=settings.RATE_LIMIT_AUTH_USER_BURST,
+        concurrency=settings.CONCURRENCY_LIMIT_AUTH,
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    ),
+}
+
+
+def rate_limit_stats() -> Dict:
+    return {"enabled": settings.RATE_LIMIT_ENABLED, **{name: limits.stats() for name, limits in rate_limits.items()}}
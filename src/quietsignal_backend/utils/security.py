@@ -1,9 +1,188 @@
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
-pwd_ctx = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+from ..config import settings
+from ..common import serverTiming
+from ..common.metrics import Counter, Histogram
+
+
+def _build_context() -> CryptContext:
+    options = {}
+    if settings.PASSWORD_HASH_ROUNDS:
+        # pin min/max to the configured cost so any hash made with other
+        # parameters is flagged by verify_and_update and rehashed on login
+        rounds = settings.PASSWORD_HASH_ROUNDS
+        options = {
+            "pbkdf2_sha256__default_rounds": rounds,
+            "pbkdf2_sha256__min_rounds": rounds,
+            "pbkdf2_sha256__max_rounds": rounds,
+        }
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto", **options)
+
+
+pwd_ctx = _build_context()
 
 def hash_password(plain: str) -> str:
     return pwd_ctx.hash(plain)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_ctx.verify(plain, hashed)
+
+def verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(matches, new_hash) - new_hash is set when the stored hash uses outdated parameters."""
+    return pwd_ctx.verify_and_update(plain, hashed)
+
+def hash_passwords(plains: List[str]) -> List[str]:
+    # one pool task per slice, not per password, to keep pickling overhead down
+    return [pwd_ctx.hash(plain) for plain in plains]
+
+
+MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class PasswordHasher:
+    """
+    Runs pbkdf2 on its own small thread pool (hashlib releases the GIL while
+    hashing) instead of the threadpool every sync route shares.
+
+    At most `workers + max_pending` operations are admitted; a login storm
+    beyond that gets 503s while the rest of the API keeps its threads.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(int(workers), 1)
+        self.max_pending = max(int(max_pending), 0)
+        self.capacity = self.workers + self.max_pending
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+
+        self.queue_wait_ms = Histogram(MS_BUCKETS)
+        self.hash_ms = Histogram(MS_BUCKETS)
+        self.rejected = Counter()
+        self.rehashed = Counter()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._pool
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        # only touched from the event loop thread, no lock needed
+        if self._in_flight >= self.capacity:
+            self.rejected.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, retry later",
+                headers={"Retry-After": "1"},
+            )
+
+        queued_at = time.perf_counter()
+
+        def _timed():
+            started = time.perf_counter()
+            self.queue_wait_ms.observe((started - queued_at) * 1000)
+            try:
+                return fn(*args)
+            finally:
+                self.hash_ms.observe((time.perf_counter() - started) * 1000)
+
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), _timed)
+        finally:
+            self._in_flight -= 1
+            serverTiming.record("hash", (time.perf_counter() - queued_at) * 1000)
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(hash_password, plain)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        ok, new_hash = await self._run(verify_and_update, plain, hashed)
+        if ok and new_hash:
+            self.rehashed.inc()
+        return ok, new_hash
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected.value,
+            "rehashed": self.rehashed.value,
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "hash_ms": self.hash_ms.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+class BulkPasswordHasher:
+    """
+    Process pool for hashing many passwords at once (bulk user import).
+    Each batch is split into one slice per worker so pbkdf2 runs on every
+    core, outside the login pool and off the server process entirely.
+    Started on first use.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(int(workers), 0) or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.batch_ms = Histogram((10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000))
+        self.hashed = Counter()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def hash_many(self, plains: List[str]) -> List[str]:
+        if not plains:
+            return []
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        size = math.ceil(len(plains) / self.workers)
+        slices = await asyncio.gather(*(
+            loop.run_in_executor(pool, hash_passwords, plains[i:i + size]) for i in range(0, len(plains), size)
+        ))
+        self.batch_ms.observe((time.perf_counter() - started) * 1000)
+        self.hashed.inc(len(plains))
+        return [hashed for part in slices for hashed in part]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "started": self._pool is not None,
+            "hashed": self.hashed.value,
+            "batch_ms": self.batch_ms.snapshot(),
+        }
+
+
+bulk_password_hasher = BulkPasswordHasher(workers=settings.USER_IMPORT_HASH_WORKERS)
@@ -0,0 +1,221 @@
+import hashlib
+import importlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..common.metrics import Counter
+
+_LOW_64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Fixed-size bit array with k probes per key (double hashing over one
+    128-bit seed). `might_contain` is O(k) whatever the number of keys, and
+    never wrong about a key that was added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _seed(key: str) -> int:
+        # jtis are uuid4 hex, already uniformly random: use them as the hash
+        if len(key) == 32:
+            try:
+                return int(key, 16)
+            except ValueError:
+                pass
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest(), "big")
+
+    def add(self, key: str) -> None:
+        seed = self._seed(key)
+        h1, h2 = seed & _LOW_64, (seed >> 64) | 1
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, key: str) -> bool:
+        seed = self._seed(key)
+        h1, h2 = seed & _LOW_64, (seed >> 64) | 1
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class DenylistBackend(ABC):
+    """
+    Where revocations are published so every worker learns about them.
+    Implement this and point TOKEN_DENYLIST_BACKEND at it
+    ("package.module:ClassName", constructed without arguments), e.g. on a
+    Redis stream. Only the sync thread calls it, never a request.
+    """
+
+    # False: nothing to pull, don't start the sync thread
+    shared = True
+
+    @abstractmethod
+    def publish(self, jti: str, expires_at: float) -> None:
+        ...
+
+    @abstractmethod
+    def fetch(self, cursor: Any) -> Tuple[List[Tuple[str, float]], Any]:
+        """(jti, expires_at) pairs published after `cursor` (None: every live one) and the next cursor."""
+
+
+class LocalDenylistBackend(DenylistBackend):
+    """
+    In-process stand-in: the revoking worker already holds the entry. With
+    several workers a token revoked in one stays valid in the others until
+    its exp; use a shared backend there.
+    """
+
+    shared = False
+
+    def publish(self, jti: str, expires_at: float) -> None:
+        pass
+
+    def fetch(self, cursor: Any) -> Tuple[List[Tuple[str, float]], Any]:
+        return [], cursor
+
+
+class TokenDenylist:
+    """
+    Revoked token ids, checked on every authenticated request without I/O.
+
+    A BloomFilter answers "not revoked" for almost every token after k bit
+    probes; only filter hits consult the exact jti -> exp map, which rules
+    out false positives. Entries are dropped once their token expired (the
+    filter is rebuilt from the survivors). Revocations reach other workers
+    through the backend, pulled every `sync_interval` seconds by a thread.
+    """
+
+    def __init__(self, backend: DenylistBackend, capacity: int, error_rate: float, sync_interval: float):
+        self.backend = backend
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+
+        self._exact: Dict[str, float] = {}
+        self._filter = BloomFilter(self.capacity, error_rate)
+        # entries the current filter was sized for, past that its error rate climbs
+        self._filter_capacity = self.capacity
+        # writers only; readers see either the old or the new filter/map
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+        self._cursor: Any = None
+        self._sync_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.revocations = Counter()
+        self.filter_hits = Counter()
+        self.false_positives = Counter()
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        # tokens issued before jti existed can't be revoked, they expire on their own
+        if not jti or not self._filter.might_contain(jti):
+            return False
+        self.filter_hits.inc()
+        if jti in self._exact:
+            return True
+        self.false_positives.inc()
+        return False
+
+    def revoke(self, jti: Optional[str], expires_at: float) -> bool:
+        """
+        Check-and-set: False when this worker already had `jti` revoked, so
+        concurrent callers can't both spend a single-use token.
+        """
+        if not jti or expires_at <= time.time():
+            return True
+        if not self._add(jti, expires_at):
+            return False
+        self.revocations.inc()
+        self.backend.publish(jti, expires_at)
+        return True
+
+    def _add(self, jti: str, expires_at: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if jti in self._exact:
+                return False
+            if now >= self._next_prune or len(self._exact) >= self._filter_capacity:
+                self._rebuild(now)
+            self._exact[jti] = expires_at
+            self._filter.add(jti)
+            return True
+
+    def _rebuild(self, now: float) -> None:
+        # Bloom filters can't delete: start over with the entries still live
+        live = {jti: exp for jti, exp in self._exact.items() if exp > now}
+        self._filter_capacity = max(self.capacity, 2 * len(live))
+        bloom = BloomFilter(self._filter_capacity, self.error_rate)
+        for jti in live:
+            bloom.add(jti)
+        self._filter, self._exact = bloom, live
+        self._next_prune = now + settings.TOKEN_DENYLIST_PRUNE_S
+
+    def start_sync(self) -> None:
+        if not self.backend.shared or self.sync_interval <= 0 or self._sync_thread is not None:
+            return
+        self._sync_thread = threading.Thread(target=self._sync_loop, name="token-denylist-sync", daemon=True)
+        self._sync_thread.start()
+
+    def stop_sync(self) -> None:
+        self._stop.set()
+
+    def _sync_loop(self) -> None:
+        while True:
+            try:
+                entries, self._cursor = self.backend.fetch(self._cursor)
+                for jti, expires_at in entries:
+                    if expires_at > time.time():
+                        self._add(jti, expires_at)
+            except Exception as exc:
+                print(f"[AUTH] Token denylist sync failed: {exc}")
+            if self._stop.wait(self.sync_interval):
+                return
+
+    def stats(self) -> Dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self),
+            "filter_bits": self._filter.size,
+            "filter_hashes": self._filter.hashes,
+            "revocations": self.revocations.value,
+            "filter_hits": self.filter_hits.value,
+            "false_positives": self.false_positives.value,
+            "syncing": self._sync_thread is not None and self._sync_thread.is_alive(),
+        }
+
+
+def _load_backend(spec: str) -> DenylistBackend:
+    if spec == "local":
+        return LocalDenylistBackend()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Invalid token denylist backend: {spec} (expected 'local' or 'module:Class')")
+    backend_cls = getattr(importlib.import_module(module_name), class_name)
+    return backend_cls()
+
+
+token_denylist = TokenDenylist(
+    backend=_load_backend(settings.TOKEN_DENYLIST_BACKEND),
+    capacity=settings.TOKEN_DENYLIST_CAPACITY,
+    error_rate=settings.TOKEN_DENYLIST_ERROR_RATE,
+    sync_interval=settings.TOKEN_DENYLIST_SYNC_S,
+)
@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+# Settings are read once at import, so the test environment has to be in place
+# before anything imports quietsignal_backend: a throwaway SQLite file for the
+# sync engine, aiosqlite for the async one (DB_ASYNC_URL defaults to it).
+_DB_DIR = tempfile.mkdtemp(prefix="quietsignal-tests-")
+os.environ.update({
+    "JWT_SECRET_KEY": "test-secret-key-not-for-production-0123456789",
+    "mysql_user": "test",
+    "mysql_password": "test",
+    "mysql_db": "test",
+    "DB_URL": f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}",
+    "DB_ASYNC_ENABLED": "true",
+    "DB_INIT_ON_STARTUP": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "PROFILER_ENABLED": "false",
+    # the model is loaded on first use, or monkeypatched away, never at import
+    "MODEL_PRELOAD": "false",
+    # the cost of a hash doesn't matter here, only that it verifies
+    "PASSWORD_HASH_ROUNDS": "1000",
+})
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def schema():
+    from quietsignal_backend.database import Base, engine
+    import quietsignal_backend.models.entities  # noqa: F401
+
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def client(schema):
+    # no lifespan: the routes under test need the schema, not the model
+    from fastapi.testclient import TestClient
+    from quietsignal_backend.main import app
+
+    return TestClient(app)
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import pytest
+
+from quietsignal_backend.ml import inferenceExecutor
+from quietsignal_backend.ml.modelLoader import Prediction
+from quietsignal_backend.ml.predictionCache import prediction_cache
+from quietsignal_backend.services.analyzeService import AnalyzeService
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    prediction_cache.backend.clear()
+    calls = []
+
+    def fake_predict(texts):
+        calls.append(list(texts))
+        predictions = [Prediction({"0": 0.1, "1": 0.2, "2": 0.7}, "v-test") for _ in texts]
+        return predictions, {"vectorize": 0.0, "predict": 0.0}
+
+    monkeypatch.setattr(inferenceExecutor, "predict_emotions_timed", fake_predict)
+    return calls
+
+
+def _stream(items, chunk_size):
+    async def source():
+        for item in items:
+            yield item
+
+    async def main():
+        return [chunk async for chunk in AnalyzeService.analyze_stream(source(), chunk_size=chunk_size)]
+    return asyncio.run(main())
+
+
+def test_results_keep_input_order_and_echo_errors(model_calls):
+    items = [("a", None), (None, "line 2: Invalid JSON"), ("b", None), ("c", None), ("d", None)]
+
+    chunks = _stream(items, chunk_size=2)
+
+    # one predict_proba call per chunk, error items are never sent to the model
+    assert model_calls == [["a"], ["b", "c"], ["d"]]
+    lines = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert len(lines) == len(items)
+    assert lines[1] == {"error": "line 2: Invalid JSON"}
+    assert [line["label"] for i, line in enumerate(lines) if i != 1] == ["positive"] * 4
+    assert {line["model_version"] for i, line in enumerate(lines) if i != 1} == {"v-test"}
+
+
+def test_chunk_of_errors_skips_the_model(model_calls):
+    chunks = _stream([(None, "bad"), (None, "worse")], chunk_size=8)
+    assert model_calls == []
+    assert chunks == ['{"error":"bad"}\n{"error":"worse"}\n']
+
+
+def test_repeated_texts_come_from_the_cache(model_calls):
+    _stream([("same text", None)], chunk_size=8)
+    _stream([("Same  TEXT", None), ("other", None)], chunk_size=8)
+    assert model_calls == [["same text"], ["other"]]
@@ -0,0 +1,64 @@
+import json
+import uuid
+from datetime import datetime
+
+from quietsignal_backend.common.apiResponse import EnvelopeResponse, error_response, success_response
+from quietsignal_backend.models.dto.userDTO import UserOutDTO
+
+
+def _body(response):
+    return json.loads(response.body)
+
+
+def test_success_renders_nested_dtos_and_omits_errors():
+    user = UserOutDTO(id=1, name="Ada", username="ada", email=None)
+    response = success_response({"user": user, "at": datetime(2026, 3, 4, 12, 0)}, "Fetched", 201)
+
+    assert response.status_code == 200
+    assert _body(response) == {
+        "success": True,
+        "status_code": 201,
+        "message": "Fetched",
+        "data": {"user": user.model_dump(), "at": "2026-03-04T12:00:00"},
+    }
+
+
+def test_error_keeps_errors_and_can_set_the_http_status():
+    response = error_response("Invalid", 422, [{"loc": ["texts"]}], http_status=422, headers={"X-Test": "1"})
+    assert response.status_code == 422
+    assert response.headers["X-Test"] == "1"
+    assert _body(response) == {
+        "success": False, "status_code": 422, "message": "Invalid", "data": None, "errors": [{"loc": ["texts"]}],
+    }
+
+
+def test_plain_content_renders_as_json():
+    assert _body(EnvelopeResponse({"raw": True})) == {"raw": True}
+
+
+def test_http_exceptions_use_the_envelope_with_the_real_status(client):
+    client.cookies.clear()
+    response = client.get("/users/me")
+    assert response.status_code == 401
+    assert response.json() == {
+        "success": False, "status_code": 401, "message": "Not authenticated", "data": None,
+    }
+
+
+def test_login_data_is_typed(client):
+    username = f"envelope_{uuid.uuid4().hex[:8]}"
+    client.post("/auth/register", json={"name": "Env", "username": username, "password": "s3cret-pass"})
+    response = client.post("/auth/login", json={"username": username, "password": "s3cret-pass"})
+    client.cookies.clear()
+
+    data = response.json()["data"]
+    assert set(data) == {"access_token", "refresh_token", "token_type", "expires_in", "user"}
+    assert data["user"]["username"] == username
+    # the cookie is set on the envelope response itself
+    assert response.headers["set-cookie"].startswith(f"access_token={data['access_token']};")
+
+
+def test_openapi_schema_carries_the_payload_types(client):
+    schemas = client.app.openapi()["components"]["schemas"]
+    login = next(schema for name, schema in schemas.items() if name.startswith("APIResponse_LoginResponseDTO"))
+    assert login["properties"]["data"]["anyOf"][0]["$ref"].endswith("LoginResponseDTO")
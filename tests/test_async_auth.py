@@ -0,0 +1,203 @@
+import asyncio
+import uuid
+
+import pytest
+from passlib.hash import pbkdf2_sha256
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from quietsignal_backend.database import AsyncSessionLocal, async_engine
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.models.dto.userDTO import UserCreateDTO
+from quietsignal_backend.utils.principalCache import principal_cache
+from quietsignal_backend.utils.security import verify_password
+
+
+def _run(fn):
+    """Runs fn(AsyncSession) on a fresh event loop, like one request would."""
+    async def main():
+        try:
+            async with AsyncSessionLocal() as db:
+                assert isinstance(db, AsyncSession)
+                return await fn(db)
+        finally:
+            # pooled aiosqlite connections belong to this loop
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+def _dto(**overrides):
+    name = overrides.pop("username", None) or f"user_{uuid.uuid4().hex[:8]}"
+    data = {"name": "Test User", "username": name, "password": "s3cret-pass", "email": f"{name}@example.com"}
+    data.update(overrides)
+    return UserCreateDTO(**data)
+
+
+def test_engine_uses_aiosqlite(schema):
+    assert async_engine is not None
+    assert async_engine.url.drivername == "sqlite+aiosqlite"
+
+
+@pytest.mark.parametrize("dependency", ["get_app_db", "get_read_db"])
+def test_routes_and_principal_lookups_get_an_async_session(schema, dependency):
+    from quietsignal_backend import database
+
+    async def main():
+        sessions = getattr(database, dependency)()
+        db = await sessions.__anext__()
+        try:
+            return type(db)
+        finally:
+            await sessions.aclose()
+            await async_engine.dispose()
+
+    assert asyncio.run(main()) is AsyncSession
+
+
+def test_async_dao_create_and_lookups(schema):
+    dto = _dto()
+
+    async def scenario(db):
+        created = await UserDAO.create_async(db, dto, "hashed")
+        return (
+            created,
+            await UserDAO.get_by_username_async(db, dto.username),
+            await UserDAO.get_by_email_async(db, dto.email),
+            await UserDAO.get_by_id_async(db, created.id),
+            await UserDAO.get_by_username_async(db, "no-such-user"),
+        )
+
+    created, by_username, by_email, by_id, missing = _run(scenario)
+    assert created.id is not None
+    assert created.role == "user"
+    assert by_username.id == by_email.id == by_id.id == created.id
+    assert missing is None
+
+
+def test_async_dao_update_password_is_committed(schema):
+    dto = _dto()
+    _run(lambda db: UserDAO.create_async(db, dto, "old-hash"))
+
+    async def update(db):
+        user = await UserDAO.get_by_username_async(db, dto.username)
+        await UserDAO.update_password_async(db, user, "new-hash")
+
+    _run(update)
+    # read back through a new session on a new loop
+    assert _run(lambda db: UserDAO.get_by_username_async(db, dto.username)).hashed_password == "new-hash"
+
+
+def test_register_login_me_refresh_logout(client):
+    dto = _dto()
+    response = client.post("/auth/register", json=dto.model_dump())
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status_code"] == 201
+    assert body["data"]["username"] == dto.username
+
+    stored = _run(lambda db: UserDAO.get_by_username_async(db, dto.username))
+    assert verify_password(dto.password, stored.hashed_password)
+
+    response = client.post("/auth/login", json={"username": dto.username, "password": dto.password})
+    assert response.json()["status_code"] == 200
+    tokens = response.json()["data"]
+    assert tokens["user"]["username"] == dto.username
+    client.cookies.clear()
+    auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # a cold principal cache: the lookup goes through the async session
+    principal_cache.clear()
+    response = client.get("/users/me", headers=auth)
+    assert response.status_code == 200
+    assert response.json()["data"]["id"] == stored.id
+    assert principal_cache.get(dto.username).id == stored.id
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()["data"]
+    client.cookies.clear()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    # rotation: the old refresh token is spent
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    new_auth = {"Authorization": f"Bearer {rotated['access_token']}"}
+    response = client.post("/auth/logout", headers=new_auth, json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 200
+    client.cookies.clear()
+    assert client.get("/users/me", headers=new_auth).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+
+
+def test_login_rejects_bad_credentials(client):
+    dto = _dto()
+    client.post("/auth/register", json=dto.model_dump())
+
+    response = client.post("/auth/login", json={"username": dto.username, "password": "wrong-password"})
+    assert response.json()["status_code"] == 401
+    response = client.post("/auth/login", json={"username": "nobody-" + dto.username, "password": dto.password})
+    assert response.json()["status_code"] == 401
+
+
+def test_login_rehashes_outdated_password(client):
+    dto = _dto()
+    # a hash made with other rounds than PASSWORD_HASH_ROUNDS
+    old_hash = pbkdf2_sha256.using(rounds=1234).hash(dto.password)
+    _run(lambda db: UserDAO.create_async(db, dto, old_hash))
+
+    response = client.post("/auth/login", json={"username": dto.username, "password": dto.password})
+    client.cookies.clear()
+    assert response.json()["status_code"] == 200
+
+    new_hash = _run(lambda db: UserDAO.get_by_username_async(db, dto.username)).hashed_password
+    assert new_hash != old_hash
+    assert verify_password(dto.password, new_hash)
+
+
+def test_create_user_route(client):
+    dto = _dto()
+    response = client.post("/users/", json=dto.model_dump())
+    assert response.json()["status_code"] == 201
+    assert response.json()["data"]["username"] == dto.username
+    assert _run(lambda db: UserDAO.get_by_username_async(db, dto.username)) is not None
+
+
+def test_me_without_token(client):
+    client.cookies.clear()
+    assert client.get("/users/me").status_code == 401
+    assert client.get("/auth/me").json()["status_code"] == 401
+
+
+def test_concurrent_refreshes_spend_the_token_once(client, monkeypatch):
+    from fastapi import HTTPException
+    from quietsignal_backend.services.authService import AuthService
+
+    dto = _dto()
+    client.post("/auth/register", json=dto.model_dump())
+    response = client.post("/auth/login", json={"username": dto.username, "password": dto.password})
+    refresh_token = response.json()["data"]["refresh_token"]
+    client.cookies.clear()
+
+    load_user = UserDAO.get_by_username_async
+
+    async def slow_load_user(db, username):
+        # both refreshes are past their revocation check before either loads the user
+        await asyncio.sleep(0.05)
+        return await load_user(db, username)
+
+    monkeypatch.setattr(UserDAO, "get_by_username_async", staticmethod(slow_load_user))
+
+    async def refresh():
+        async with AsyncSessionLocal() as db:
+            return await AuthService.refresh_async(db, refresh_token)
+
+    async def main():
+        try:
+            return await asyncio.gather(refresh(), refresh(), return_exceptions=True)
+        finally:
+            await async_engine.dispose()
+
+    outcomes = asyncio.run(main())
+    rejected = [o for o in outcomes if isinstance(o, HTTPException)]
+    assert len(rejected) == 1 and rejected[0].status_code == 401
+    assert len([o for o in outcomes if not isinstance(o, Exception)]) == 1
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from quietsignal_backend.ml import inferenceExecutor
+from quietsignal_backend.ml.batchScheduler import BatchScheduler
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    """predict_proba batches the scheduler sent to the model."""
+    calls = []
+
+    def fake_predict(texts):
+        calls.append(list(texts))
+        return [{"0": 0.0, "1": float(len(text))} for text in texts], {"vectorize": 0.0, "predict": 0.0}
+
+    monkeypatch.setattr(inferenceExecutor, "predict_emotions_timed", fake_predict)
+    return calls
+
+
+def _submit_all(scheduler, texts):
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(text) for text in texts))
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_call(model_calls):
+    scheduler = BatchScheduler(window_ms=50, max_batch_size=32)
+    texts = ["a", "bb", "ccc", "dddd"]
+
+    rows = _submit_all(scheduler, texts)
+
+    assert model_calls == [texts]
+    # every caller gets its own row back
+    assert [row["1"] for row in rows] == [1.0, 2.0, 3.0, 4.0]
+    assert scheduler.stats()["batches"] == 1
+    assert scheduler.stats()["items"] == 4
+
+
+def test_full_batch_flushes_without_waiting(model_calls):
+    # the window is far longer than the test, only max_batch_size can flush
+    scheduler = BatchScheduler(window_ms=60_000, max_batch_size=2)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*(scheduler.submit(text) for text in ["a", "b", "c", "d"])), timeout=5
+        )
+
+    rows = asyncio.run(main())
+    # the two batches may finish in either order
+    assert sorted(model_calls) == [["a", "b"], ["c", "d"]]
+    assert [row["1"] for row in rows] == [1.0] * 4
+
+
+def test_zero_window_scores_each_request_alone(model_calls):
+    scheduler = BatchScheduler(window_ms=0, max_batch_size=32)
+    _submit_all(scheduler, ["a", "b"])
+    assert model_calls == [["a"], ["b"]]
+
+
+def test_model_error_reaches_every_caller(monkeypatch):
+    def broken(texts):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr(inferenceExecutor, "predict_emotions_timed", broken)
+    scheduler = BatchScheduler(window_ms=50, max_batch_size=32)
+
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(t) for t in ["a", "b"]), return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert scheduler.stats()["pending"] == 0
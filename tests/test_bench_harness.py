@@ -0,0 +1,59 @@
+import argparse
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "bench_harness", Path(__file__).resolve().parents[1] / "benchmarks" / "harness.py"
+)
+harness = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(harness)
+
+
+def _run(results):
+    return {"suite": "load", "results": results}
+
+
+def test_compare_flags_slower_latency_and_lower_throughput():
+    baseline = _run({"analyze": {"p95_ms": 10.0, "rps": 100.0}, "gone": {"p95_ms": 1.0}})
+    current = _run({"analyze": {"p95_ms": 12.0, "rps": 85.0}, "new": {"p95_ms": 99.0}})
+
+    regressions = harness.compare(baseline, current, max_regression=0.10)
+    assert regressions == [
+        "analyze p95_ms: 10.000 -> 12.000 (+20% worse)",
+        "analyze rps: 100.000 -> 85.000 (+15% worse)",
+    ]
+    assert harness.compare(baseline, current, max_regression=0.25) == []
+
+
+def test_compare_flags_more_errors():
+    baseline = _run({"login": {"p95_ms": 5.0, "errors": {}}})
+    current = _run({"login": {"p95_ms": 5.0, "errors": {"429": 3}}})
+    assert harness.compare(baseline, current, max_regression=0.10) == ["login errors: 0 -> 3"]
+
+
+def test_failed_requests_fail_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(harness, "environment", lambda: {})
+    args = argparse.Namespace(out=tmp_path / "run.json", baseline=None, max_regression=0.10)
+
+    # fast 401s would look like a latency win
+    with pytest.raises(SystemExit) as failed:
+        harness.finish("load", {"me": {"p95_ms": 0.5, "errors": {"401": 200}}}, args)
+    assert failed.value.code == 1
+    # the results are still written, for a look at what went wrong
+    assert json.loads(args.out.read_text(encoding="utf-8"))["results"]["me"]["errors"] == {"401": 200}
+
+    harness.finish("load", {"me": {"p95_ms": 0.5, "errors": {}}}, args)
+
+
+def test_regression_against_the_baseline_fails_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(harness, "environment", lambda: {})
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_run({"analyze": {"p95_ms": 10.0}})), encoding="utf-8")
+    args = argparse.Namespace(out=None, baseline=baseline, max_regression=0.10)
+
+    harness.finish("load", {"analyze": {"p95_ms": 10.5}}, args)
+    with pytest.raises(SystemExit):
+        harness.finish("load", {"analyze": {"p95_ms": 20.0}}, args)
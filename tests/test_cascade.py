@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+import pytest
+
+from quietsignal_backend.config import settings
+from quietsignal_backend.ml import modelLoader
+from quietsignal_backend.ml.cascade import build_first_stage, read_sample
+from quietsignal_backend.ml.compiledModel import CompiledModel
+from quietsignal_backend.ml.modelLoader import (
+    FIRST_STAGE,
+    FULL_STAGE,
+    cascade_predict,
+    init_worker,
+    model_fingerprint,
+    predict_emotions_timed,
+    prepare_first_stage,
+)
+from quietsignal_backend.ml.modelRegistry import ModelRegistry
+
+CLASSES = np.array(["negative", "neutral", "positive"])
+
+
+class FixedModel:
+    """Answers `rows[text]` (uniform for anything else), records what it was asked."""
+
+    def __init__(self, rows, classes=CLASSES, name=None):
+        self.rows = rows
+        self.classes_ = classes
+        self.name = name
+        self.calls = []
+
+    def predict_proba(self, texts):
+        self.calls.append(list(texts))
+        return np.array([self.rows.get(text, [1 / 3] * 3) for text in texts])
+
+
+FIRST = FixedModel({"sure": [0.95, 0.03, 0.02], "unsure": [0.5, 0.3, 0.2]})
+FULL = FixedModel({"sure": [0.1, 0.1, 0.8], "unsure": [0.2, 0.2, 0.6]})
+
+
+def _registry(path, model):
+    path.write_text(path.name)
+    return ModelRegistry(path, loader=lambda p: model, fingerprint=model_fingerprint)
+
+
+@pytest.fixture
+def cascade(tmp_path, monkeypatch):
+    first, full = FixedModel(FIRST.rows), FixedModel(FULL.rows)
+    monkeypatch.setattr(modelLoader, "registry", _registry(tmp_path / "Model.joblib", full))
+    monkeypatch.setattr(modelLoader, "cascade_registry", _registry(tmp_path / "Cascade.joblib", first))
+    monkeypatch.setattr(settings, "MODEL_CASCADE_THRESHOLD", 0.9)
+    # loaded and warmed up before the test looks at the calls
+    modelLoader.registry.current(), modelLoader.cascade_registry.current()
+    first.calls.clear(), full.calls.clear()
+    return first, full
+
+
+def test_only_unsure_texts_are_escalated():
+    first, full = FixedModel(FIRST.rows), FixedModel(FULL.rows)
+    timings = {}
+    rows, escalated = cascade_predict(first, full, ["sure", "unsure", "sure"], 0.9, timings)
+
+    assert escalated == [False, True, False]
+    assert full.calls == [["unsure"]]
+    np.testing.assert_allclose(rows, [FIRST.rows["sure"], FULL.rows["unsure"], FIRST.rows["sure"]])
+    assert set(timings) == {"first-stage", "vectorize", "predict"}
+
+
+def test_nothing_escalated_skips_the_full_model():
+    full = FixedModel(FULL.rows)
+    _, escalated = cascade_predict(FixedModel(FIRST.rows), full, ["sure"], 0.9, {})
+    assert escalated == [False] and full.calls == []
+
+
+def test_predictions_report_the_stage_that_answered(cascade):
+    predictions, timings = predict_emotions_timed(["sure", "unsure"])
+    assert [p.stage for p in predictions] == [FIRST_STAGE, FULL_STAGE]
+    assert predictions[0].probabilities == {"0": 0.95, "1": 0.03, "2": 0.02}
+    assert "first-stage" in timings
+
+
+def test_first_stage_with_other_classes_is_ignored(cascade, monkeypatch):
+    first, full = cascade
+    first.classes_ = np.array(["negative", "positive"])
+    predictions, _ = predict_emotions_timed(["sure"])
+    assert predictions[0].stage == FULL_STAGE
+    assert first.calls == []
+
+
+def test_serving_version_changes_with_the_first_stage_and_threshold(cascade, monkeypatch):
+    with_cascade = modelLoader.get_serving_version()
+    assert with_cascade.startswith(modelLoader.get_model_version() + "+")
+
+    monkeypatch.setattr(settings, "MODEL_CASCADE_THRESHOLD", 0.8)
+    assert modelLoader.get_serving_version() not in (with_cascade, modelLoader.get_model_version())
+
+    monkeypatch.setattr(modelLoader, "cascade_registry", None)
+    assert modelLoader.get_serving_version() == modelLoader.get_model_version()
+
+
+def test_init_worker_loads_both_artifacts_it_is_given(tmp_path, monkeypatch):
+    loaded = []
+
+    def registry(name):
+        path = tmp_path / name
+        path.write_text(name)
+        return ModelRegistry(path, loader=lambda p: loaded.append(p.name) or FixedModel({}, name=p.name),
+                             fingerprint=model_fingerprint)
+
+    monkeypatch.setattr(modelLoader, "registry", registry("Model.joblib"))
+    monkeypatch.setattr(modelLoader, "cascade_registry", registry("Cascade.joblib"))
+    full_v2, first_v2 = tmp_path / "Model-v2.joblib", tmp_path / "Cascade-v2.joblib"
+    full_v2.write_text("full two")
+    first_v2.write_text("first two")
+
+    init_worker(str(full_v2), model_fingerprint(full_v2), str(first_v2), model_fingerprint(first_v2))
+
+    assert modelLoader.registry.current().model.name == "Model-v2.joblib"
+    assert modelLoader.cascade_registry.current().model.name == "Cascade-v2.joblib"
+    assert loaded == ["Model-v2.joblib", "Cascade-v2.joblib"]
+    assert modelLoader.worker_initargs() == (
+        str(full_v2), model_fingerprint(full_v2), str(first_v2), model_fingerprint(first_v2),
+    )
+
+
+def test_distilled_first_stage_is_compiled():
+    texts = ["awful sad day", "terrible tired", "normal commute", "usual lunch", "great happy", "wonderful fun"] * 5
+    labels = ["negative", "negative", "neutral", "neutral", "positive", "positive"] * 5
+    model = build_first_stage(texts, labels, n_features=1 << 12)
+
+    first = prepare_first_stage(model)
+    assert isinstance(first, CompiledModel)
+    np.testing.assert_allclose(first.predict_proba(texts[:6]), model.predict_proba(texts[:6]), atol=1e-9)
+
+
+def test_read_sample_formats(tmp_path):
+    csv_file = tmp_path / "sample.csv"
+    csv_file.write_text("text,label\nbad day,negative\nfine,1\n", encoding="utf-8")
+    assert read_sample(csv_file) == (["bad day", "fine"], ["0", "1"])
+
+    ndjson_file = tmp_path / "sample.ndjson"
+    ndjson_file.write_text("\n".join(json.dumps(row) for row in [{"text": "great"}, {"text": "meh"}]), encoding="utf-8")
+    assert read_sample(ndjson_file) == (["great", "meh"], None)
+
+    partly = tmp_path / "partly.csv"
+    partly.write_text("text,label\nbad,negative\ngood,\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_sample(partly)
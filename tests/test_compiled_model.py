@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from quietsignal_backend.ml.compiledModel import CompiledModel, compile_model
+
+WORDS = {
+    "negative": "awful sad tired exhausted angry lonely terrible worried".split(),
+    "neutral": "ordinary normal usual fine okay plain regular routine".split(),
+    "positive": "great happy wonderful calm grateful excited lovely proud".split(),
+}
+FILLER = "today the day at work home it was and I felt really a bit".split()
+
+# held out: none of these are in PARITY_TEXTS, some words were never seen in training
+CHECK_TEXTS = [
+    "Today was great, I felt happy and proud at work",
+    "awful awful awful day, so tired",
+    "It was a routine day at home",
+    "calm but worried about tomorrow",
+    "zebra quantum xylophone",
+    "",
+    "   ",
+    "GREAT!!! Lovely... sad?",
+    "happy " * 200,
+]
+
+
+def _corpus(labels, n=240, seed=0):
+    rng = np.random.default_rng(seed)
+    texts, y = [], []
+    for i in range(n):
+        label = labels[i % len(labels)]
+        words = list(rng.choice(WORDS[label], size=4)) + list(rng.choice(FILLER, size=rng.integers(1, 6)))
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+        y.append(label)
+    return texts, y
+
+
+def _ovr_logistic_regression():
+    try:
+        return LogisticRegression(multi_class="ovr", max_iter=1000)
+    except TypeError:
+        pytest.skip("this scikit-learn has no one-vs-rest LogisticRegression")
+
+
+PIPELINES = {
+    "count+lr": lambda: Pipeline([("vec", CountVectorizer()), ("clf", LogisticRegression(max_iter=1000))]),
+    "count-binary+lr": lambda: Pipeline([
+        ("vec", CountVectorizer(binary=True, ngram_range=(1, 2))),
+        ("clf", LogisticRegression(max_iter=1000)),
+    ]),
+    "tfidf+lr-softmax": lambda: Pipeline([
+        ("vec", TfidfVectorizer(sublinear_tf=True)),
+        ("clf", LogisticRegression(max_iter=1000)),
+    ]),
+    "tfidf+lr-ovr": lambda: Pipeline([("vec", TfidfVectorizer()), ("clf", _ovr_logistic_regression())]),
+    "tfidf-l1+sgd": lambda: Pipeline([
+        ("vec", TfidfVectorizer(norm="l1")),
+        ("clf", SGDClassifier(loss="log_loss", random_state=0)),
+    ]),
+    "count+tfidftransformer+lr": lambda: Pipeline([
+        ("vec", CountVectorizer()),
+        ("tfidf", TfidfTransformer()),
+        ("clf", LogisticRegression(max_iter=1000)),
+    ]),
+    "hashing+sgd": lambda: Pipeline([
+        ("hash", HashingVectorizer(n_features=1 << 12, ngram_range=(1, 2), alternate_sign=False)),
+        ("clf", SGDClassifier(loss="log_loss", random_state=0)),
+    ]),
+}
+
+
+def _assert_parity(model):
+    compiled = compile_model(model)
+    assert isinstance(compiled, CompiledModel)
+    assert list(compiled.classes_) == list(model.classes_)
+
+    expected = np.asarray(model.predict_proba(CHECK_TEXTS))
+    actual = compiled.predict_proba(CHECK_TEXTS)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(actual.sum(axis=1), 1.0)
+
+    # row by row, the shape /analyze sends through the micro-batcher
+    for text, row in zip(CHECK_TEXTS, expected):
+        np.testing.assert_allclose(compiled.predict_proba([text])[0], row, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", sorted(PIPELINES))
+def test_multiclass_parity(name):
+    model = PIPELINES[name]()
+    model.fit(*_corpus(["negative", "neutral", "positive"]))
+    _assert_parity(model)
+
+
+@pytest.mark.parametrize("name", ["count+lr", "tfidf+lr-softmax", "count+tfidftransformer+lr", "hashing+sgd"])
+def test_binary_parity(name):
+    model = PIPELINES[name]()
+    model.fit(*_corpus(["negative", "positive"]))
+    assert len(model.classes_) == 2
+    _assert_parity(model)
+
+
+def test_signed_hashing_is_not_compiled():
+    model = Pipeline([
+        ("hash", HashingVectorizer(n_features=1 << 12)),
+        ("clf", SGDClassifier(loss="log_loss", random_state=0)),
+    ])
+    model.fit(*_corpus(["negative", "neutral", "positive"]))
+    assert compile_model(model) is None
+
+
+def test_unsupported_classifier_is_not_compiled():
+    model = Pipeline([("vec", CountVectorizer()), ("clf", SGDClassifier(loss="hinge", random_state=0))])
+    model.fit(*_corpus(["negative", "neutral", "positive"]))
+    assert compile_model(model) is None
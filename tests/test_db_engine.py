@@ -0,0 +1,84 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import SingletonThreadPool
+
+from quietsignal_backend.config import settings
+from quietsignal_backend.database import create_db_engine
+from quietsignal_backend.database.poolMetrics import InstrumentedQueuePool, pool_metrics
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{os.path.join(tmp_path, 'pool.db')}"
+
+
+def test_pool_is_sized_from_settings(db_url):
+    engine = create_db_engine(db_url, name="test-sized")
+    try:
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+        assert engine.pool._max_overflow == settings.DB_MAX_OVERFLOW
+        assert engine.pool._recycle == settings.DB_POOL_RECYCLE_S
+    finally:
+        engine.dispose()
+
+
+def test_overrides_win(db_url):
+    engine = create_db_engine(db_url, name="test-overrides", pool_size=3, max_overflow=0)
+    try:
+        assert engine.pool.size() == 3 and engine.pool._max_overflow == 0
+    finally:
+        engine.dispose()
+
+
+def test_memory_sqlite_keeps_its_own_pool():
+    engine = create_db_engine("sqlite://", name="test-memory")
+    try:
+        assert isinstance(engine.pool, SingletonThreadPool)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+        # still reports, just without QueuePool sizing
+        assert pool_metrics["test-memory"].stats()["connects"] == 1
+    finally:
+        engine.dispose()
+
+
+def test_checkout_wait_and_hold_are_recorded(db_url):
+    engine = create_db_engine(db_url, name="test-timed")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        stats = pool_metrics["test-timed"].stats()
+        assert stats["connects"] == 1
+        assert stats["checkout_wait_ms"]["count"] == 1
+        assert stats["checkout_hold_ms"]["count"] == 1
+        assert stats["checked_out"] == 0 and stats["checked_in"] == 1
+    finally:
+        engine.dispose()
+
+
+def test_checkout_timeout_is_counted(db_url):
+    engine = create_db_engine(db_url, name="test-timeout", pool_size=1, max_overflow=0, pool_timeout=0.05)
+    try:
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+        assert pool_metrics["test-timeout"].stats()["checkout_timeouts"] == 1
+    finally:
+        engine.dispose()
+
+
+def test_dispose_keeps_reporting_to_the_same_metrics(db_url):
+    engine = create_db_engine(db_url, name="test-dispose")
+    try:
+        metrics = pool_metrics["test-dispose"]
+        engine.dispose()
+        assert engine.pool.metrics is metrics
+        with engine.connect():
+            pass
+        assert metrics.stats()["checkout_wait_ms"]["count"] == 1
+    finally:
+        engine.dispose()
@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+import pytest
+
+from quietsignal_backend.database import AsyncSessionLocal, SessionLocal, async_engine
+from quietsignal_backend.ml.modelLoader import Prediction
+from quietsignal_backend.models.dao.entryDAO import EntryDAO
+from quietsignal_backend.models.dao.journalDAO import JournalDAO
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.models.dto.userDTO import UserCreateDTO
+from quietsignal_backend.services.analyzeService import AnalyzeService
+from quietsignal_backend.services.journalService import JournalService
+
+
+class _User:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def _fake_prediction(text: str) -> Prediction:
+    positive = (len(text) % 97) / 100
+    return Prediction({"0": 1.0 - positive - 0.01, "1": 0.01, "2": positive}, "test-model")
+
+
+@pytest.fixture
+def journal(schema, monkeypatch):
+    name = f"importer_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = UserDAO.create(db, UserCreateDTO(name="Importer", username=name, password="s3cret-pass"), "x")
+        journal = JournalDAO.create(db, user.id, "diary")
+        user_id, journal_id = user.id, journal.id
+
+    batches = []
+
+    async def predict_many(texts, wait=False):
+        batches.append(list(texts))
+        return [_fake_prediction(text) for text in texts]
+
+    monkeypatch.setattr(AnalyzeService, "predict_many", staticmethod(predict_many))
+    return _User(user_id), journal_id, batches
+
+
+def _import(user, journal_id, contents, chunk_size):
+    async def main():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await JournalService.import_entries(db, user, journal_id, contents, chunk_size=chunk_size)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _stored(journal_id):
+    with SessionLocal() as db:
+        return EntryDAO.list_for_journal(db, journal_id, 100)
+
+
+def test_every_chunk_is_scored_in_one_call(journal):
+    user, journal_id, batches = journal
+    contents = [f"Entry number {i}." + "!" * i for i in range(5)]
+
+    assert _import(user, journal_id, contents, chunk_size=2) == 5
+
+    assert batches == [contents[0:2], contents[2:4], contents[4:5]]
+    stored = {entry.content: entry for entry in _stored(journal_id)}
+    assert set(stored) == set(contents)
+    for content, entry in stored.items():
+        assert entry.sentiment_probs == _fake_prediction(content).probabilities
+
+
+def test_failed_import_leaves_no_rows(journal, monkeypatch):
+    user, journal_id, _ = journal
+    bulk_insert = EntryDAO.bulk_insert
+    chunks_written = []
+
+    def failing_second_chunk(db, rows, commit=True):
+        chunks_written.append(rows)
+        if len(chunks_written) == 2:
+            raise RuntimeError("connection lost")
+        return bulk_insert(db, rows, commit=commit)
+
+    monkeypatch.setattr(EntryDAO, "bulk_insert", staticmethod(failing_second_chunk))
+
+    with pytest.raises(RuntimeError):
+        _import(user, journal_id, ["one", "two", "three"], chunk_size=2)
+    # the first chunk was inserted, but never committed
+    assert len(chunks_written) == 2
+    assert _stored(journal_id) == []
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from quietsignal_backend.ml.inferenceExecutor import InferenceExecutor
+
+
+@pytest.fixture
+def pool():
+    executor = InferenceExecutor(mode="thread", workers=1, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_runs_off_the_event_loop(pool):
+    async def main():
+        return await pool.run(threading.get_ident), threading.get_ident()
+
+    worker, loop = asyncio.run(main())
+    assert worker != loop
+
+
+def test_overflow_is_rejected_with_503(pool):
+    release = threading.Event()
+
+    async def main():
+        # one running, one queued: the pool is at capacity
+        admitted = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(pool.capacity)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(*admitted)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["submitted"] == pool.capacity
+    assert stats["in_flight"] == 0
+
+
+def test_errors_release_the_slot(pool):
+    def broken():
+        raise HTTPException(status_code=500, detail="Model not found")
+
+    async def main():
+        for _ in range(pool.capacity + 1):
+            with pytest.raises(HTTPException):
+                await pool.run(broken)
+
+    asyncio.run(main())
+    assert pool.stats()["in_flight"] == 0
+    assert pool.stats()["rejected"] == 0
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="gpu", workers=1, max_queue=0)
+
+
+def test_bulk_callers_wait_for_a_slot(pool):
+    release = threading.Event()
+
+    async def main():
+        admitted = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(pool.capacity)]
+        await asyncio.sleep(0)
+        waiting = asyncio.ensure_future(pool.run(lambda: "scored", wait=True))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        release.set()
+        await asyncio.gather(*admitted)
+        return await waiting
+
+    assert asyncio.run(main()) == "scored"
+    assert pool.stats()["rejected"] == 0
@@ -0,0 +1,198 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+from quietsignal_backend.config import settings
+from quietsignal_backend.database import AsyncSessionLocal, SessionLocal, async_engine
+from quietsignal_backend.ml.modelLoader import Prediction
+from quietsignal_backend.models.dao.jobDAO import JobDAO
+from quietsignal_backend.models.dao.journalDAO import JournalDAO
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.models.dto.userDTO import UserCreateDTO
+from quietsignal_backend.models.entities.entryEntity import Entry
+from quietsignal_backend.models.entities.jobEntity import Job
+from quietsignal_backend.models.entities.journalEntity import utcnow
+from quietsignal_backend.models.entities.moodRollupEntity import MoodRollup
+from quietsignal_backend.services import jobWorker
+from quietsignal_backend.services.analyzeService import AnalyzeService
+from quietsignal_backend.services.jobService import RESCORE_ENTRIES
+from quietsignal_backend.services.journalService import JournalService
+from quietsignal_backend.services.rollupService import RollupService
+
+NEGATIVE = {"0": 0.7, "1": 0.2, "2": 0.1}
+POSITIVE = {"0": 0.1, "1": 0.1, "2": 0.8}
+
+
+class _User:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def _session(fn):
+    async def main():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await fn(db)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(schema):
+    # claim() takes the oldest job of any test, so each one starts clean
+    with SessionLocal() as db:
+        db.query(Job).delete()
+        db.commit()
+
+
+@pytest.fixture
+def journal(schema, monkeypatch):
+    name = f"jobs_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = UserDAO.create(db, UserCreateDTO(name="Jobs", username=name, password="s3cret-pass"), "x")
+        journal = JournalDAO.create(db, user.id, "diary")
+        user_id, journal_id = user.id, journal.id
+
+    # entries are written as negative by the old model, re-scored as positive by the new one
+    async def predict_one(text):
+        return Prediction(NEGATIVE, "old-model")
+
+    async def predict_many(texts, wait=False):
+        return [Prediction(NEGATIVE, "old-model") for _ in texts]
+
+    monkeypatch.setattr(AnalyzeService, "predict_one", staticmethod(predict_one))
+    monkeypatch.setattr(AnalyzeService, "predict_many", staticmethod(predict_many))
+    monkeypatch.setattr(jobWorker, "get_model_version", lambda: "new-model")
+    monkeypatch.setattr(jobWorker, "predict_emotions", lambda texts: [Prediction(POSITIVE, "new-model") for _ in texts])
+    monkeypatch.setattr(settings, "JOB_BATCH_SIZE", 2)
+    return _User(user_id), journal_id
+
+
+def _job(user, **params):
+    with SessionLocal() as db:
+        return JobDAO.create(db, RESCORE_ENTRIES, {"user_id": user.id, **params}).id
+
+
+def _entries(user):
+    with SessionLocal() as db:
+        rows = db.query(Entry).filter(Entry.user_id == user.id).order_by(Entry.id).all()
+        return [(row.content, row.sentiment_label, row.model_version) for row in rows]
+
+
+def _rollups(user):
+    with SessionLocal() as db:
+        rows = db.query(MoodRollup).filter(MoodRollup.user_id == user.id).all()
+        return {(r.period, r.period_start, r.label): (r.label_count, round(r.prob_sum, 9)) for r in rows}
+
+
+def _expire_lease(job_id, attempts):
+    with SessionLocal() as db:
+        db.execute(update(Job).where(Job.id == job_id).values(
+            lease_expires_at=utcnow() - timedelta(seconds=1), attempts=attempts))
+        db.commit()
+
+
+def test_claim_leases_the_job_once(schema):
+    job_id = _job(_User(0))
+    with SessionLocal() as db:
+        job = JobDAO.claim(db, "worker-a", 60, 3)
+        assert job.id == job_id
+        assert job.status == "running" and job.lease_owner == "worker-a" and job.attempts == 1
+        assert job.lease_expires_at > utcnow()
+        assert JobDAO.claim(db, "worker-b", 60, 3) is None
+
+
+def test_expired_lease_moves_the_job_to_another_worker(schema):
+    job_id = _job(_User(0))
+    with SessionLocal() as db:
+        stale = JobDAO.claim(db, "worker-a", 60, 3)
+    _expire_lease(job_id, attempts=1)
+
+    with SessionLocal() as db:
+        job = JobDAO.claim(db, "worker-b", 60, 3)
+        assert job.id == job_id and job.lease_owner == "worker-b" and job.attempts == 2
+        # the first worker finds out on its next heartbeat
+        assert JobDAO.heartbeat(db, stale, "worker-a", 60) is False
+        db.rollback()
+
+
+def test_expired_lease_past_max_attempts_fails_the_job(schema):
+    job_id = _job(_User(0))
+    with SessionLocal() as db:
+        JobDAO.claim(db, "worker-a", 60, 3)
+    _expire_lease(job_id, attempts=3)
+
+    with SessionLocal() as db:
+        assert JobDAO.claim(db, "worker-b", 60, 3) is None
+        job = JobDAO.get(db, job_id)
+        assert job.status == "failed" and job.lease_owner is None and job.finished_at is not None
+        assert "3 attempts" in job.error
+
+
+def test_rescore_keeps_rollups_equal_to_a_rebuild(journal):
+    user, journal_id = journal
+    _session(lambda db: JournalService.import_entries(db, user, journal_id, ["one", "two", "three"], chunk_size=10))
+    _job(user)
+
+    with SessionLocal() as db:
+        job = JobDAO.claim(db, "worker-a", 60, 3)
+        jobWorker.run_job(db, job, "worker-a")
+        db.refresh(job)
+        assert job.status == "done" and job.processed == job.total == 3
+
+    assert [label for _, label, _ in _entries(user)] == ["positive"] * 3
+    maintained = _rollups(user)
+    with SessionLocal() as db:
+        RollupService.rebuild(db, [user.id])
+    assert maintained == _rollups(user)
+
+
+def test_reclaimed_job_resumes_from_its_cursor(journal):
+    user, journal_id = journal
+    _session(lambda db: JournalService.import_entries(db, user, journal_id, ["one", "two", "three"], chunk_size=10))
+    job_id = _job(user, only_stale=False)
+    with SessionLocal() as db:
+        first_id = db.query(Entry.id).filter(Entry.user_id == user.id).order_by(Entry.id).limit(1).scalar()
+        db.execute(update(Job).where(Job.id == job_id).values(cursor=first_id, processed=1, total=3))
+        db.commit()
+
+    with SessionLocal() as db:
+        job = JobDAO.claim(db, "worker-a", 60, 3)
+        jobWorker.rescore_entries(db, job, "worker-a")
+        db.refresh(job)
+        assert job.processed == 3
+
+    # the entry before the cursor counts as done and isn't touched again
+    assert [label for _, label, _ in _entries(user)] == ["negative", "positive", "positive"]
+
+
+def test_entry_written_during_scoring_is_not_overwritten(journal, monkeypatch):
+    user, journal_id = journal
+    entry = _session(lambda db: JournalService.create_entry(db, user, journal_id, "Started."))
+    _job(user)
+
+    def predict_while_appending(texts):
+        # no row is locked while the model runs, so this append goes through
+        _session(lambda db: JournalService.append(db, user, journal_id, entry.id, ["Went on."]))
+        return [Prediction(POSITIVE, "new-model") for _ in texts]
+
+    monkeypatch.setattr(jobWorker, "predict_emotions", predict_while_appending)
+    with SessionLocal() as db:
+        job = JobDAO.claim(db, "worker-a", 60, 3)
+        jobWorker.rescore_entries(db, job, "worker-a")
+        db.refresh(job)
+        assert job.processed == 1
+
+    # the append's content and score stand, not the job's score of the old content
+    content, label, version = _entries(user)[0]
+    assert "Went on." in content
+    assert (label, version) == ("negative", "old-model")
+    maintained = _rollups(user)
+    with SessionLocal() as db:
+        RollupService.rebuild(db, [user.id])
+    assert maintained == _rollups(user)
@@ -0,0 +1,160 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from quietsignal_backend.database import AsyncSessionLocal, SessionLocal, async_engine
+from quietsignal_backend.ml.modelLoader import Prediction
+from quietsignal_backend.models.dao.entryDAO import EntryDAO
+from quietsignal_backend.models.dao.journalDAO import JournalDAO
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.models.dto.userDTO import UserCreateDTO
+from quietsignal_backend.models.entities.moodRollupEntity import MoodRollup
+from quietsignal_backend.services import journalService
+from quietsignal_backend.services.analyzeService import AnalyzeService
+from quietsignal_backend.services.journalService import PARAGRAPH_SEPARATOR, JournalService
+from quietsignal_backend.services.rollupService import RollupService
+
+
+def _fake_prediction(text: str) -> Prediction:
+    # deterministic and content dependent, so a stale score is visible
+    positive = (len(text) % 97) / 100
+    return Prediction({"0": 1.0 - positive - 0.01, "1": 0.01, "2": positive}, "test-model")
+
+
+class GatedModel:
+    """
+    Stands in for AnalyzeService.predict_one. The first `hold` calls wait for
+    each other, so that many appends have read the entry before any of them
+    writes, the interleaving that used to lose a paragraph.
+    """
+
+    def __init__(self, hold: int):
+        self.hold = hold
+        self.calls = 0
+        self.waiting = 0
+        self.released = asyncio.Event()
+
+    async def __call__(self, text: str) -> Prediction:
+        self.calls += 1
+        if self.calls <= self.hold:
+            self.waiting += 1
+            if self.waiting == self.hold:
+                self.released.set()
+            await asyncio.wait_for(self.released.wait(), timeout=5)
+        return _fake_prediction(text)
+
+
+@pytest.fixture
+def entry(schema, monkeypatch):
+    name = f"writer_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = UserDAO.create(db, UserCreateDTO(name="Writer", username=name, password="s3cret-pass"), "x")
+        journal = JournalDAO.create(db, user.id, "diary")
+        user_id, journal_id = user.id, journal.id
+
+    monkeypatch.setattr(AnalyzeService, "predict_one", staticmethod(lambda text: _async(_fake_prediction(text))))
+
+    async def create():
+        try:
+            async with AsyncSessionLocal() as db:
+                created = await JournalService.create_entry(db, _User(user_id), journal_id, "First paragraph.")
+                return created.id
+        finally:
+            await async_engine.dispose()
+
+    return _User(user_id), journal_id, asyncio.run(create())
+
+
+class _User:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+async def _async(value):
+    return value
+
+
+def _append_concurrently(user, journal_id, entry_id, paragraphs):
+    async def one(paragraph):
+        # one session per request, as get_app_db hands out
+        async with AsyncSessionLocal() as db:
+            return await JournalService.append(db, user, journal_id, entry_id, [paragraph])
+
+    async def main():
+        try:
+            return await asyncio.gather(*(one(p) for p in paragraphs))
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _stored(user, journal_id, entry_id):
+    with SessionLocal() as db:
+        return EntryDAO.get_for_user(db, journal_id, entry_id, user.id)
+
+
+def _rollups(user):
+    with SessionLocal() as db:
+        rows = db.query(MoodRollup).filter(MoodRollup.user_id == user.id).all()
+        return {(r.period, r.period_start, r.label): (r.label_count, round(r.prob_sum, 9)) for r in rows}
+
+
+def _assert_rollups_match_entries(user):
+    maintained = _rollups(user)
+    with SessionLocal() as db:
+        RollupService.rebuild(db, [user.id])
+    assert maintained == _rollups(user)
+
+
+def test_concurrent_appends_keep_every_paragraph(entry, monkeypatch):
+    user, journal_id, entry_id = entry
+    model = GatedModel(hold=2)
+    monkeypatch.setattr(AnalyzeService, "predict_one", staticmethod(model))
+
+    _append_concurrently(user, journal_id, entry_id, ["Second.", "Third."])
+
+    stored = _stored(user, journal_id, entry_id)
+    paragraphs = stored.content.split(PARAGRAPH_SEPARATOR)
+    assert paragraphs[0] == "First paragraph."
+    assert sorted(paragraphs[1:]) == ["Second.", "Third."]
+    # the loser re-read the entry and scored the content that was actually saved
+    assert model.calls == 3
+    assert stored.sentiment_probs == _fake_prediction(stored.content).probabilities
+    _assert_rollups_match_entries(user)
+
+
+def test_rescore_during_append_keeps_rollups_consistent(entry, monkeypatch):
+    user, journal_id, entry_id = entry
+
+    async def rescoring_model(text):
+        # a re-scoring job updates the entry while the append waits on the model
+        with SessionLocal() as db:
+            row = EntryDAO.get_for_user(db, journal_id, entry_id, user.id)
+            rescored = {"0": 0.05, "1": 0.05, "2": 0.9}
+            RollupService.apply_changes(
+                db, [(user.id, row.created_at, row.sentiment_probs, row.sentiment_label, rescored, "positive")]
+            )
+            row.sentiment_probs, row.sentiment_label = rescored, "positive"
+            db.commit()
+        return _fake_prediction(text)
+
+    monkeypatch.setattr(AnalyzeService, "predict_one", staticmethod(rescoring_model))
+    _append_concurrently(user, journal_id, entry_id, ["Second."])
+
+    assert _stored(user, journal_id, entry_id).content.endswith("Second.")
+    _assert_rollups_match_entries(user)
+
+
+def test_append_gives_up_with_409(entry, monkeypatch):
+    user, journal_id, entry_id = entry
+    monkeypatch.setattr(AnalyzeService, "predict_one", staticmethod(lambda text: _async(_fake_prediction(text))))
+    # every write finds the entry changed under it
+    monkeypatch.setattr(journalService.EntryDAO, "replace_content", staticmethod(lambda *args: False))
+
+    with pytest.raises(HTTPException) as raised:
+        _append_concurrently(user, journal_id, entry_id, ["Never saved."])
+    assert raised.value.status_code == 409
+    assert _stored(user, journal_id, entry_id).content == "First paragraph."
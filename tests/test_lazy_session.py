@@ -0,0 +1,78 @@
+import asyncio
+import uuid
+
+from quietsignal_backend.config import settings
+from quietsignal_backend.database import LazySession, get_read_db
+from quietsignal_backend.database.poolMetrics import pool_metrics
+from quietsignal_backend.utils.principalCache import principal_cache
+
+
+class FakeSession:
+    closed = False
+
+    def query(self, what):
+        return what
+
+    def close(self):
+        self.closed = True
+
+
+def test_session_is_built_on_first_use():
+    built = []
+
+    def factory():
+        built.append(FakeSession())
+        return built[-1]
+
+    db = LazySession(factory)
+    assert not db.materialized and built == []
+
+    assert db.query("users") == "users"
+    db.query("again")
+    assert db.materialized and len(built) == 1
+
+    db.close()
+    assert built[0].closed and not db.materialized
+
+
+def test_unused_session_is_never_built():
+    def factory():
+        raise AssertionError("session built")
+
+    with LazySession(factory) as db:
+        pass
+    assert not db.materialized
+
+
+def test_dependency_closes_only_a_used_session(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ASYNC_ENABLED", False)
+
+    async def main():
+        gen = get_read_db()
+        db = await gen.__anext__()
+        assert not db.materialized
+        await gen.aclose()
+        return db
+
+    assert not asyncio.run(main()).materialized
+
+
+def _checkouts():
+    # sync and async pools alike, whichever the lookup went through
+    return sum(metrics.stats()["checkout_wait_ms"]["count"] for metrics in pool_metrics.values())
+
+
+def test_cached_principal_needs_no_connection(client):
+    username = f"lazy-{uuid.uuid4().hex[:8]}"
+    client.post("/auth/register", json={"name": "Lazy", "username": username, "password": "secret-pass"})
+    login = client.post("/auth/login", json={"username": username, "password": "secret-pass"})
+    assert login.json()["success"]
+
+    principal_cache.clear()
+    before = _checkouts()
+    assert client.get("/users/me").json()["data"]["username"] == username
+    assert _checkouts() > before
+
+    before = _checkouts()
+    assert client.get("/users/me").json()["data"]["username"] == username
+    assert _checkouts() == before
@@ -0,0 +1,54 @@
+import pytest
+
+from quietsignal_backend.common import lruCache
+from quietsignal_backend.common.lruCache import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(lruCache.time, "monotonic", lambda: now["t"])
+    return now
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions.value == 1
+
+
+def test_ttl_expires_entries(clock):
+    cache = LRUCache(10)
+    cache.set("short", 1, ttl=5)
+    cache.set("forever", 2)
+
+    clock["t"] += 4
+    assert cache.get("short") == 1
+    clock["t"] += 1
+    assert cache.get("short") is None
+    assert cache.get("forever") == 2
+    assert len(cache) == 1
+
+
+def test_delete_and_clear():
+    cache = LRUCache(10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None and len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_size_is_at_least_one():
+    cache = LRUCache(0)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
@@ -0,0 +1,67 @@
+from quietsignal_backend.api.instrumentation import http_request_duration_ms
+from quietsignal_backend.common import serverTiming
+from quietsignal_backend.common.metrics import Counter, Histogram, HistogramFamily, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 5, 10))
+    for value in (0.5, 1, 3, 7, 50):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"1": 2, "5": 3, "10": 4, "+Inf": 5}
+    assert snapshot["count"] == 5 and snapshot["sum"] == 61.5
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry(namespace="test")
+    counter = Counter()
+    counter.inc(3)
+    family = HistogramFamily(("route",), (10,))
+    family.labels('/a"b').observe(4)
+    registry.counter("things_total", "Things seen", counter)
+    registry.gauge("per_pool", "Per pool", lambda: [({"pool": "primary"}, 2)])
+    registry.histogram("latency_ms", "Latency", family)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_things_total counter" in lines
+    assert "test_things_total 3" in lines
+    assert 'test_per_pool{pool="primary"} 2' in lines
+    assert 'test_latency_ms_bucket{route="/a\\"b",le="10"} 1' in lines
+    assert 'test_latency_ms_bucket{route="/a\\"b",le="+Inf"} 1' in lines
+    assert 'test_latency_ms_count{route="/a\\"b"} 1' in lines
+
+
+def test_broken_source_is_left_out_of_the_scrape():
+    registry = MetricsRegistry()
+    registry.gauge("broken", "Raises", lambda: 1 / 0)
+    registry.gauge("fine", "Works", lambda: 1)
+    assert registry.render() == "# HELP fine Works\n# TYPE fine gauge\nfine 1\n"
+
+
+def test_record_outside_a_request_is_a_noop():
+    serverTiming.record("db", 1.0)
+    assert serverTiming.current() is None
+
+    token = serverTiming.begin()
+    try:
+        serverTiming.record("db", 1.0)
+        serverTiming.record_many({"db": 0.5, "hash": 2.0})
+        assert serverTiming.current() == {"db": 1.5, "hash": 2.0}
+    finally:
+        serverTiming.end(token)
+    assert serverTiming.header_value({"db": 1.5}, 4) == "db;dur=1.50, app;dur=4.00"
+
+
+def test_requests_are_timed_by_route_template(client):
+    client.cookies.clear()
+    response = client.get("/users/me")
+    assert response.status_code == 401
+    assert "app;dur=" in response.headers["Server-Timing"]
+
+    labels = [labels for labels, _ in http_request_duration_ms.collect()]
+    assert {"method": "GET", "route": "/users/me", "status": "401"} in labels
+
+    scrape = client.get("/metrics")
+    assert scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'quietsignal_http_request_duration_ms_count{method="GET",route="/users/me",status="401"}' in scrape.text
@@ -0,0 +1,49 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from quietsignal_backend.ml.modelLoader import export_uncompressed, load_model, model_fingerprint
+from quietsignal_backend.utils.processStats import format_memory, memory_usage_mb
+
+TEXTS = ["happy great day", "sad awful day", "fine normal day", "great lovely", "awful tired", "plain routine"]
+LABELS = [2, 0, 1, 2, 0, 1]
+
+
+@pytest.fixture
+def compressed_artifact(tmp_path):
+    model = Pipeline([("vec", CountVectorizer()), ("clf", LogisticRegression(max_iter=1000))]).fit(TEXTS, LABELS)
+    path = tmp_path / "Model.joblib"
+    joblib.dump(model, path, compress=3)
+    return model, path
+
+
+def test_uncompressed_copy_is_memory_mapped(compressed_artifact, tmp_path):
+    model, path = compressed_artifact
+    mapped_path = tmp_path / "Model-mmap.joblib"
+    export_uncompressed(path, mapped_path)
+
+    mapped = load_model(mapped_path, mmap_mode="r")
+
+    assert isinstance(mapped.named_steps["clf"].coef_, np.memmap)
+    np.testing.assert_array_equal(mapped.predict_proba(TEXTS), model.predict_proba(TEXTS))
+
+
+def test_fingerprint_follows_content(compressed_artifact, tmp_path):
+    _, path = compressed_artifact
+    copy = tmp_path / "copy.joblib"
+    copy.write_bytes(path.read_bytes())
+
+    assert model_fingerprint(path) == model_fingerprint(copy)
+    copy.write_bytes(path.read_bytes() + b"\0")
+    assert model_fingerprint(path) != model_fingerprint(copy)
+    assert model_fingerprint(tmp_path / "missing.joblib") is None
+
+
+def test_memory_report():
+    usage = memory_usage_mb()
+    assert set(usage) == {"rss", "pss"}
+    assert format_memory({"rss": 12.34, "pss": None}) == "rss=12.3MB"
+    assert format_memory({"rss": None, "pss": None}) == "n/a"
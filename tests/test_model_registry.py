@@ -0,0 +1,107 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pytest
+from sklearn.dummy import DummyClassifier
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.pipeline import Pipeline
+
+from quietsignal_backend.ml import modelLoader
+from quietsignal_backend.ml.modelLoader import get_model_version, init_worker, model_fingerprint
+from quietsignal_backend.ml.modelRegistry import ModelRegistry
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+
+    def predict_proba(self, texts):
+        return [[0.5, 0.5] for _ in texts]
+
+
+class Broken:
+    def predict_proba(self, texts):
+        raise RuntimeError("cannot score")
+
+
+def _artifact(path, content):
+    path.write_text(content)
+    return path
+
+
+def _registry(path, loaded):
+    def loader(p):
+        loaded.append(p.name)
+        return Broken() if p.read_text() == "broken" else FakeModel(p.read_text())
+    return ModelRegistry(path, loader=loader, fingerprint=model_fingerprint)
+
+
+def test_reload_swaps_and_notifies(tmp_path):
+    loaded, swapped = [], []
+    registry = _registry(_artifact(tmp_path / "Model.joblib", "one"), loaded)
+    registry.on_swap(lambda version: swapped.append(version.version))
+    first = registry.current()
+
+    new = registry.reload(_artifact(tmp_path / "Model-v2.joblib", "two"))
+
+    assert registry.current() is new
+    assert new.model.name == "two" and new.version != first.version
+    assert swapped == [new.version]
+    assert [entry["path"] for entry in registry.status()["history"]] == ["Model-v2.joblib", "Model.joblib"]
+
+
+def test_unchanged_artifact_is_not_reloaded(tmp_path):
+    loaded = []
+    registry = _registry(_artifact(tmp_path / "Model.joblib", "one"), loaded)
+    registry.current()
+
+    assert registry.reload() is None
+    assert registry.reload(force=True) is not None
+    assert loaded == ["Model.joblib", "Model.joblib"]
+
+
+def test_failed_reload_keeps_serving_the_old_version(tmp_path):
+    registry = _registry(_artifact(tmp_path / "Model.joblib", "one"), [])
+    before = registry.current()
+
+    with pytest.raises(RuntimeError):
+        # warmup runs predict_proba before the swap
+        registry.reload(_artifact(tmp_path / "Model-bad.joblib", "broken"))
+    with pytest.raises(FileNotFoundError):
+        registry.reload(tmp_path / "missing.joblib")
+    assert registry.current() is before
+
+
+def test_in_flight_batches_keep_their_version(tmp_path):
+    registry = _registry(_artifact(tmp_path / "Model.joblib", "one"), [])
+    grabbed = registry.current()
+    registry.reload(_artifact(tmp_path / "Model-v2.joblib", "two"))
+    assert grabbed.model.name == "one"
+
+
+def _dump_model(path, label):
+    model = Pipeline([("vec", CountVectorizer()), ("clf", DummyClassifier(strategy="constant", constant=label))])
+    joblib.dump(model.fit(["alpha beta", "gamma delta"], [label, label]), path)
+    return model_fingerprint(path)
+
+
+def test_init_worker_loads_the_artifact_it_is_given(tmp_path, monkeypatch):
+    loaded = []
+    fresh = _registry(_artifact(tmp_path / "Model.joblib", "default"), loaded)
+    # a spawned child starts from a registry nobody has loaded yet
+    monkeypatch.setattr(modelLoader, "registry", fresh)
+
+    init_worker(str(_artifact(tmp_path / "Model-v2.joblib", "two")), model_fingerprint(tmp_path / "Model-v2.joblib"))
+
+    assert fresh.current().model.name == "two"
+    assert loaded == ["Model-v2.joblib"]
+
+
+def test_spawned_workers_serve_the_parent_version(tmp_path):
+    path = tmp_path / "Model-v2.joblib"
+    version = _dump_model(path, 1)
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker, initargs=(str(path), version)) as pool:
+        assert pool.submit(get_model_version).result(timeout=60) == version
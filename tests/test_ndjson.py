@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from quietsignal_backend.common.ndjson import iter_ndjson, iter_spool, spool_body
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _parse(*chunks, **kwargs):
+    async def main():
+        return [row async for row in iter_ndjson(_chunks(*chunks), **kwargs)]
+    return asyncio.run(main())
+
+
+def test_lines_split_across_chunks():
+    rows = _parse(b'"one"\n{"text": "t', b'wo"}\n\n', b'  \n"thr', b'ee"')
+    assert rows == [(1, "one", None), (2, {"text": "two"}, None), (5, "three", None)]
+
+
+def test_invalid_line_is_reported_and_parsing_continues():
+    rows = _parse(b'"ok"\n{oops\n"still ok"\n')
+    assert rows[0] == (1, "ok", None)
+    assert rows[1][0] == 2 and rows[1][1] is None and rows[1][2].startswith("Invalid JSON")
+    assert rows[2] == (3, "still ok", None)
+
+
+@pytest.mark.parametrize("chunks", [
+    [b'"short"\n"' + b"x" * 50 + b'"\n"after"\n'],
+    # the long line arrives over several chunks and is never buffered whole
+    [b'"short"\n"', b"x" * 20, b"x" * 20, b"x" * 10 + b'"\n"af', b'ter"\n'],
+])
+def test_long_line_is_skipped(chunks):
+    rows = _parse(*chunks, max_line=16)
+    assert rows == [(1, "short", None), (2, None, "Line longer than 16 bytes"), (3, "after", None)]
+
+
+def test_spool_roundtrip():
+    async def main():
+        spool = await spool_body(_chunks(b"a" * 10, b"b" * 10), max_bytes=20)
+        return b"".join([chunk async for chunk in iter_spool(spool)]), spool
+
+    body, spool = asyncio.run(main())
+    assert body == b"a" * 10 + b"b" * 10
+    assert spool.closed
+
+
+def test_spool_rejects_oversized_body():
+    async def main():
+        await spool_body(_chunks(b"a" * 10, b"b" * 10, b"c"), max_bytes=20)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main())
+    assert raised.value.status_code == 413
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from quietsignal_backend.utils import security
+from quietsignal_backend.utils.security import PasswordHasher
+
+
+def _context(rounds):
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_overflow_is_rejected_with_503(hasher):
+    release = threading.Event()
+
+    async def main():
+        # one hashing, one waiting: the pool is at capacity
+        admitted = [asyncio.ensure_future(hasher._run(release.wait, 5)) for _ in range(hasher.capacity)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.hash("secret")
+        release.set()
+        await asyncio.gather(*admitted)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    # says nothing about which endpoint or operation hit the limit
+    assert "login" not in rejected.detail.lower()
+    stats = hasher.stats()
+    assert stats["rejected"] == 1 and stats["in_flight"] == 0
+
+
+def test_hash_then_verify(hasher, monkeypatch):
+    monkeypatch.setattr(security, "pwd_ctx", _context(1000))
+
+    async def main():
+        hashed = await hasher.hash("secret")
+        return await hasher.verify_and_update("secret", hashed), await hasher.verify_and_update("wrong", hashed)
+
+    (ok, new_hash), (bad, _) = asyncio.run(main())
+    assert ok and new_hash is None
+    assert not bad
+    assert hasher.stats()["rehashed"] == 0
+
+
+def test_outdated_hash_is_rehashed(hasher, monkeypatch):
+    old_hash = _context(2000).hash("secret")
+    monkeypatch.setattr(security, "pwd_ctx", _context(1000))
+
+    ok, new_hash = asyncio.run(hasher.verify_and_update("secret", old_hash))
+    assert ok
+    assert new_hash and new_hash != old_hash
+    assert security.pwd_ctx.verify("secret", new_hash)
+    assert not security.pwd_ctx.needs_update(new_hash)
+    assert hasher.stats()["rehashed"] == 1
@@ -0,0 +1,108 @@
+import pytest
+
+from quietsignal_backend.common import lruCache
+from quietsignal_backend.ml.predictionCache import CacheBackend, LocalCacheBackend, PredictionCache
+
+PROBS = {"0": 0.2, "1": 0.3, "2": 0.5}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(lruCache.time, "monotonic", clock)
+    return clock
+
+
+def _cache(version="v1", **kwargs):
+    versions = {"current": version}
+    cache = PredictionCache(LocalCacheBackend(kwargs.pop("max_size", 100)),
+                            version_provider=lambda: versions["current"], **kwargs)
+    return cache, versions
+
+
+def test_miss_then_hit():
+    cache, _ = _cache()
+    key, cached = cache.lookup("A good day")
+    assert cached is None
+    cache.store(key, PROBS)
+
+    assert cache.lookup("A good day") == (key, PROBS)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_whitespace_and_case_variants_share_a_slot():
+    cache, _ = _cache()
+    key, _ = cache.lookup("A good day")
+    cache.store(key, PROBS)
+    assert cache.lookup("  a   GOOD\tday\n")[1] == PROBS
+
+
+def test_new_model_version_misses():
+    cache, versions = _cache()
+    key, _ = cache.lookup("text")
+    cache.store(key, PROBS)
+
+    versions["current"] = "v2"
+    assert cache.lookup("text")[1] is None
+
+
+def test_miss_is_stored_under_the_version_it_was_looked_up_with():
+    cache, versions = _cache()
+    key, _ = cache.lookup("text")
+    # the version changes while the text is being scored
+    versions["current"] = "v2"
+    cache.store(key, PROBS)
+
+    assert cache.lookup("text")[1] is None
+    versions["current"] = "v1"
+    assert cache.lookup("text")[1] == PROBS
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LocalCacheBackend(max_size=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    assert backend.get("a") == 1   # "b" is now the oldest
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1 and backend.get("c") == 3
+    assert len(backend) == 2
+    assert backend.evictions.value == 1
+
+
+def test_ttl_expires_entries(clock):
+    backend = LocalCacheBackend(max_size=10)
+    backend.set("short", 1, ttl=5)
+    backend.set("forever", 2)
+
+    clock.now += 4.9
+    assert backend.get("short") == 1
+    clock.now += 0.2
+    assert backend.get("short") is None
+    assert backend.get("forever") == 2
+
+
+def test_disabled_cache_never_stores():
+    cache, _ = _cache(enabled=False)
+    key, cached = cache.lookup("text")
+    assert (key, cached) == (None, None)
+    cache.store(key, PROBS)
+    assert len(cache.backend) == 0
+
+
+def test_incomplete_backend_fails_at_construction():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+
+from quietsignal_backend.database import SessionLocal
+from quietsignal_backend.models.entities.userEntity import User
+from quietsignal_backend.utils.principalCache import Principal, PrincipalCache, principal_cache
+
+
+@pytest.fixture
+def user(schema):
+    with SessionLocal() as db:
+        user = User(name="Ada", username=f"ada-{uuid.uuid4().hex[:8]}", email=None,
+                    hashed_password="x", role="user")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+    principal_cache.clear()
+    yield user
+    principal_cache.clear()
+
+
+def _cache_principal(user):
+    principal_cache.set(Principal.from_user(user))
+    assert principal_cache.get(user.username) is not None
+
+
+def test_update_drops_the_cached_principal(user):
+    _cache_principal(user)
+    with SessionLocal() as db:
+        db.get(User, user.id).role = "admin"
+        db.commit()
+    assert principal_cache.get(user.username) is None
+
+
+def test_rename_drops_the_old_username(user):
+    _cache_principal(user)
+    with SessionLocal() as db:
+        db.get(User, user.id).username = user.username + "-renamed"
+        db.commit()
+    assert principal_cache.get(user.username) is None
+
+
+def test_delete_drops_the_cached_principal(user):
+    _cache_principal(user)
+    with SessionLocal() as db:
+        db.delete(db.get(User, user.id))
+        db.commit()
+    assert principal_cache.get(user.username) is None
+
+
+def test_other_users_stay_cached(user):
+    other = Principal(id=-1, name="Bob", username="bob-cached", email=None, role="user")
+    principal_cache.set(other)
+    _cache_principal(user)
+    with SessionLocal() as db:
+        db.get(User, user.id).name = "Ada L."
+        db.commit()
+    assert principal_cache.get("bob-cached") == other
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = PrincipalCache(max_size=10, ttl=0)
+    cache.set(Principal(id=1, name="A", username="a", email=None, role="user"))
+    assert cache.get("a") is None
+    assert cache.stats()["enabled"] is False
+
+
+def test_claims_round_trip():
+    principal = Principal(id=7, name="Ada", username="ada", email="ada@example.com", role="admin")
+    assert Principal.from_claims(principal.to_claims()) == principal
+
+
+def test_tokens_without_principal_claims_fall_back():
+    assert Principal.from_claims({"sub": "ada", "role": "user"}) is None
@@ -0,0 +1,102 @@
+import asyncio
+import pstats
+
+import pytest
+from fastapi import HTTPException
+
+from quietsignal_backend.api.instrumentation import ProfilerMiddleware
+from quietsignal_backend.utils.profiler import Profiler
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return Profiler(enabled=True, directory=tmp_path, interval_ms=1, max_seconds=5, keep=2)
+
+
+async def _app(scope, receive, send):
+    await asyncio.sleep(0)
+
+
+def _request(middleware, path):
+    return middleware({"type": "http", "path": path}, None, None)
+
+
+async def _start(profiler, mode, requests, seconds, path_prefix=None):
+    return profiler.start(mode, requests, seconds, path_prefix)
+
+
+def test_disabled_profiler_refuses_captures(tmp_path):
+    profiler = Profiler(enabled=False, directory=tmp_path, interval_ms=1, max_seconds=5, keep=2)
+    with pytest.raises(HTTPException) as refused:
+        asyncio.run(_start(profiler, "sample", None, 1))
+    assert refused.value.status_code == 400
+
+
+def test_one_capture_at_a_time(profiler):
+    async def main():
+        first = profiler.start("cprofile", 1, None)
+        with pytest.raises(HTTPException) as busy:
+            profiler.start("sample", 1, None)
+        profiler.stop()
+        return first, busy.value
+
+    first, busy = asyncio.run(main())
+    assert busy.status_code == 409
+    # stopped while still armed: nothing was profiled, nothing written
+    assert first.status == "done" and first.file is None
+
+
+def test_request_capture_profiles_the_next_matching_requests(profiler):
+    middleware = ProfilerMiddleware(_app, profiler)
+
+    async def main():
+        capture = profiler.start("cprofile", 2, None, path_prefix="/analyze")
+        await _request(middleware, "/metrics")
+        await _request(middleware, "/users/me")
+        assert capture.status == "armed"
+        await _request(middleware, "/analyze/")
+        assert capture.status == "running"
+        await _request(middleware, "/analyze/batch")
+        return capture
+
+    capture = asyncio.run(main())
+    assert capture.status == "done" and capture.matched == 2
+    assert profiler.active is None
+    assert capture.file.suffix == ".prof"
+    assert pstats.Stats(str(capture.file)).total_calls > 0
+
+
+def test_time_window_sample_capture(profiler):
+    async def main():
+        capture = profiler.start("sample", None, 0.05)
+        assert capture.status == "running"
+        await asyncio.sleep(0.2)
+        return capture
+
+    capture = asyncio.run(main())
+    assert capture.status == "done"
+    assert capture.to_dict()["samples"] > 0
+    collapsed = capture.file.read_text(encoding="utf-8")
+    assert "MainThread;" in collapsed
+
+
+def test_window_is_capped_at_max_seconds(profiler):
+    capture = asyncio.run(_start(profiler, "sample", None, 600))
+    assert capture.seconds == profiler.max_seconds
+    profiler.stop()
+
+
+def test_old_captures_and_files_are_dropped(profiler):
+    async def main():
+        captures = []
+        for _ in range(3):
+            captures.append(profiler.start("cprofile", None, 1))
+            profiler.stop()
+        return captures
+
+    first, second, third = asyncio.run(main())
+    assert not first.file.exists() and second.file.exists() and third.file.exists()
+    assert [c["id"] for c in profiler.captures()] == [third.id, second.id]
+    with pytest.raises(HTTPException) as missing:
+        profiler.get(first.id)
+    assert missing.value.status_code == 404
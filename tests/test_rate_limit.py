@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.middleware.cors import CORSMiddleware
+
+from quietsignal_backend.api import deps
+from quietsignal_backend.api.admission import AdmissionMiddleware, client_ip, endpoint_class
+from quietsignal_backend.config import settings
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.utils.jwtHandler import create_access_token, create_refresh_token
+from quietsignal_backend.utils.rateLimiter import EndpointLimits, TokenBucketTable, rate_limits
+from quietsignal_backend.utils.tokenDenylist import token_denylist
+
+
+def test_bucket_refills_at_its_rate():
+    table = TokenBucketTable(rate=2, burst=3, max_keys=10)
+    assert [table.take("ip", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert table.take("ip", now=0.0) == pytest.approx(0.5)
+    # half a second later one token is back
+    assert table.take("ip", now=0.5) == 0.0
+    assert table.take("other", now=0.5) == 0.0
+
+
+def test_idle_and_excess_buckets_are_evicted():
+    table = TokenBucketTable(rate=1, burst=2, max_keys=3)
+    for i, key in enumerate("abcd"):
+        table.take(key, now=float(i) / 10)
+    assert len(table) == 3
+    # idle for burst / rate seconds: as good as new, so dropped
+    table.take("e", now=10.0)
+    assert len(table) == 1
+
+
+def test_concurrency_cap_sheds_with_503():
+    limits = EndpointLimits("test", ip_rate=0, ip_burst=0, user_rate=0, user_burst=0, concurrency=1, max_keys=10)
+    limits.acquire()
+    with pytest.raises(HTTPException) as shed:
+        limits.acquire()
+    assert shed.value.status_code == 503 and shed.value.headers == {"Retry-After": "1"}
+    limits.release()
+    limits.acquire()
+    assert limits.stats()["rejected_concurrency"] == 1
+
+
+def test_endpoint_classes():
+    assert endpoint_class("POST", "/analyze/batch") == "analyze"
+    assert endpoint_class("POST", "/journals/3/entries/import") == "analyze"
+    assert endpoint_class("POST", "/auth/login") == "auth"
+    assert endpoint_class("GET", "/analyze/trends") is None
+    assert endpoint_class("POST", "/auth/logout") is None
+
+
+def test_forwarded_for_is_only_trusted_when_configured():
+    scope = {"client": ("10.0.0.1", 1234), "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")]}
+    assert client_ip(scope) == "10.0.0.1"
+    # the proxy's own hop, not what the client put in front of it
+    assert client_ip(scope, trust_forwarded=True) == "203.0.113.7"
+
+
+def _shed_response(limits, path="/auth/login"):
+    async def app(scope, receive, send):
+        raise AssertionError("should have been shed")
+
+    stack = CORSMiddleware(AdmissionMiddleware(app, {"auth": limits}), allow_origins=["http://localhost:3000"],
+                           expose_headers=["Retry-After"])
+    scope = {"type": "http", "method": "POST", "path": path, "client": ("10.0.0.1", 1),
+             "headers": [(b"origin", b"http://localhost:3000")]}
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(stack(scope, None, send))
+    return messages[0]["status"], dict((k.decode(), v.decode()) for k, v in messages[0]["headers"])
+
+
+def test_shed_requests_carry_retry_after_and_cors_headers():
+    limits = EndpointLimits("auth", ip_rate=1, ip_burst=1, user_rate=0, user_burst=0, concurrency=0, max_keys=10)
+    limits.check_ip("10.0.0.1")
+    status, headers = _shed_response(limits)
+    assert status == 429
+    assert headers["retry-after"] == "1"
+    assert headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert limits.stats()["rejected_ip"] == 1
+
+
+def test_cors_is_the_outermost_middleware():
+    from quietsignal_backend.main import app
+
+    assert app.user_middleware[0].cls is CORSMiddleware
+
+
+@pytest.fixture
+def checked(monkeypatch):
+    """Usernames the analyze per-user bucket was charged for."""
+    charged = []
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limits["analyze"], "check_user", lambda username, cost=1.0: charged.append(username))
+
+    async def no_db(*args, **kwargs):
+        raise AssertionError("the analyze rate limit must not load the user")
+
+    monkeypatch.setattr(UserDAO, "get_by_username_async", staticmethod(no_db))
+    return charged
+
+
+def _analyze(client, token=None):
+    client.cookies.clear()
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return client.post("/analyze/", json={"text": "hello", "mode": "bogus"}, headers=headers)
+
+
+def _calls(dependant):
+    for sub in dependant.dependencies:
+        yield sub.call
+        yield from _calls(sub)
+
+
+@pytest.mark.parametrize("path", ["/analyze/", "/analyze/batch"])
+def test_analyze_routes_open_no_session(path):
+    from quietsignal_backend.api.routers.analyzeRoutes import router
+    from quietsignal_backend.database import get_read_db
+
+    route = next(r for r in router.routes if r.path == path)
+    assert get_read_db not in set(_calls(route.dependant))
+
+
+def test_analyze_bucket_is_keyed_by_token_subject(client, checked):
+    _analyze(client, create_access_token({"sub": "someone-not-in-the-db"}))
+    assert checked == ["someone-not-in-the-db"]
+
+
+def test_analyze_without_usable_token_is_per_ip_only(client, checked):
+    revoked = create_access_token({"sub": "revoked-user"})
+    token_denylist.revoke(deps.decode_token(revoked)["jti"], deps.decode_token(revoked)["exp"])
+
+    _analyze(client)
+    _analyze(client, "not-a-jwt")
+    _analyze(client, create_refresh_token("refresh-user"))
+    _analyze(client, revoked)
+    assert checked == []
@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from quietsignal_backend.database import AsyncSessionLocal, SessionLocal, async_engine
+from quietsignal_backend.ml.modelLoader import Prediction
+from quietsignal_backend.models.dao.journalDAO import JournalDAO
+from quietsignal_backend.models.dao.moodRollupDAO import add_entry_delta
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.models.dto.userDTO import UserCreateDTO
+from quietsignal_backend.models.entities.moodRollupEntity import MoodRollup
+from quietsignal_backend.services.analyzeService import AnalyzeService
+from quietsignal_backend.services.journalService import JournalService
+from quietsignal_backend.services.rollupService import RollupService
+
+NEGATIVE = {"0": 0.7, "1": 0.2, "2": 0.1}
+POSITIVE = {"0": 0.1, "1": 0.1, "2": 0.8}
+
+
+class _User:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def test_delta_moves_one_entry_between_labels():
+    created_at = datetime(2026, 3, 4, 12, 0)  # a Wednesday
+    deltas = {}
+    add_entry_delta(deltas, 1, created_at, NEGATIVE, "negative", sign=-1)
+    add_entry_delta(deltas, 1, created_at, POSITIVE, "positive", sign=1)
+
+    day = deltas[(1, "day", created_at.date(), "negative")]
+    assert day[0] == -1 and day[1] == pytest.approx(-0.6)
+    assert deltas[(1, "week", datetime(2026, 3, 2).date(), "positive")][0] == 1
+    assert deltas[(1, "month", datetime(2026, 3, 1).date(), "neutral")] == [0, pytest.approx(-0.1)]
+
+
+def test_empty_sentiment_adds_nothing():
+    deltas = {}
+    add_entry_delta(deltas, 1, datetime(2026, 3, 4), None, None)
+    assert deltas == {}
+
+
+@pytest.fixture
+def journal(schema, monkeypatch):
+    name = f"rollups_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = UserDAO.create(db, UserCreateDTO(name="Rollups", username=name, password="s3cret-pass"), "x")
+        journal = JournalDAO.create(db, user.id, "diary")
+        user_id, journal_id = user.id, journal.id
+
+    def predict(text):
+        return Prediction(POSITIVE if "good" in text else NEGATIVE, "test-model")
+
+    async def predict_one(text):
+        return predict(text)
+
+    async def predict_many(texts, wait=False):
+        return [predict(text) for text in texts]
+
+    monkeypatch.setattr(AnalyzeService, "predict_one", staticmethod(predict_one))
+    monkeypatch.setattr(AnalyzeService, "predict_many", staticmethod(predict_many))
+    return _User(user_id), journal_id
+
+
+def _session(fn):
+    async def main():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await fn(db)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _rollups(user):
+    with SessionLocal() as db:
+        rows = db.query(MoodRollup).filter(MoodRollup.user_id == user.id).all()
+        return {(r.period, r.period_start, r.label): (r.label_count, round(r.prob_sum, 9)) for r in rows}
+
+
+def test_writes_keep_rollups_equal_to_a_rebuild(journal):
+    user, journal_id = journal
+    _session(lambda db: JournalService.create_entry(db, user, journal_id, "A bad day."))
+    _session(lambda db: JournalService.import_entries(db, user, journal_id, ["good", "good again", "bad"], chunk_size=2))
+    entry = _session(lambda db: JournalService.create_entry(db, user, journal_id, "Started bad."))
+    _session(lambda db: JournalService.append(db, user, journal_id, entry.id, ["Ended good."]))
+
+    maintained = _rollups(user)
+    with SessionLocal() as db:
+        assert RollupService.rebuild(db, [user.id]) == 5
+    assert maintained == _rollups(user)
+
+
+def test_trends_are_read_from_the_rollups(journal):
+    user, journal_id = journal
+    _session(lambda db: JournalService.import_entries(db, user, journal_id, ["good", "good", "bad"], chunk_size=10))
+
+    trends = _session(lambda db: RollupService.trends(db, user, "day"))
+    assert len(trends.buckets) == 1
+    bucket = trends.buckets[0]
+    assert bucket.count == 3
+    assert bucket.label_counts == {"negative": 1, "neutral": 0, "positive": 2}
+    assert bucket.mean_probabilities["positive"] == pytest.approx((0.8 + 0.8 + 0.1) / 3)
+
+
+def test_unknown_period_is_a_400(journal):
+    from fastapi import HTTPException
+
+    user, _ = journal
+    with pytest.raises(HTTPException) as raised:
+        _session(lambda db: RollupService.trends(db, user, "year"))
+    assert raised.value.status_code == 400
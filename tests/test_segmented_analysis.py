@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from quietsignal_backend.ml import inferenceExecutor
+from quietsignal_backend.ml.modelLoader import Prediction
+from quietsignal_backend.ml.predictionCache import prediction_cache
+from quietsignal_backend.ml.segmenter import iter_segments
+from quietsignal_backend.services.analyzeService import AnalyzeService
+
+NEGATIVE = {"0": 0.8, "1": 0.1, "2": 0.1}
+POSITIVE = {"0": 0.1, "1": 0.1, "2": 0.8}
+
+
+def _fake_model(texts):
+    # "!" marks a positive segment
+    return [Prediction(dict(POSITIVE if "!" in text else NEGATIVE), "v-test") for text in texts]
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    prediction_cache.backend.clear()
+    calls = []
+
+    def fake_predict(texts):
+        calls.append(list(texts))
+        return _fake_model(texts), {"vectorize": 0.0, "predict": 0.0}
+
+    monkeypatch.setattr(inferenceExecutor, "predict_emotions_timed", fake_predict)
+    return calls
+
+
+def test_paragraph_and_sentence_offsets():
+    text = "First one. Second!\n\n  Next paragraph here.\n"
+    paragraphs = list(iter_segments(text, "paragraph"))
+    sentences = list(iter_segments(text, "sentence"))
+
+    assert [p.text for p in paragraphs] == ["First one. Second!", "Next paragraph here."]
+    assert [s.text for s in sentences] == ["First one.", "Second!", "Next paragraph here."]
+    for segment in paragraphs + sentences:
+        assert text[segment.start:segment.end] == segment.text
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        list(iter_segments("text", "word"))
+
+
+def test_aggregate_is_weighted_by_segment_length(model_calls):
+    short_happy, long_sad = "Yes!", "This was a long and rather gloomy day."
+    result = asyncio.run(AnalyzeService.analyze_segmented(f"{short_happy}\n\n{long_sad}", "paragraph"))
+
+    # every segment in one predict_proba call
+    assert model_calls == [[short_happy, long_sad]]
+    assert [s.label for s in result.segments] == ["positive", "negative"]
+
+    total = len(short_happy) + len(long_sad)
+    for idx in POSITIVE:
+        expected = (POSITIVE[idx] * len(short_happy) + NEGATIVE[idx] * len(long_sad)) / total
+        assert result.probabilities[idx] == pytest.approx(expected)
+    assert result.label == "negative"
+    assert result.model_version == "v-test"
+    assert not result.truncated
+
+
+def test_segment_cap_truncates(model_calls):
+    text = "One. Two. Three. Four."
+    result = asyncio.run(AnalyzeService.analyze_segmented(text, "sentence", max_segments=2))
+    assert [text[s.start:s.end] for s in result.segments] == ["One.", "Two."]
+    assert result.truncated
+    assert model_calls == [["One.", "Two."]]
+
+
+def test_segments_are_cached(model_calls):
+    asyncio.run(AnalyzeService.analyze_segmented("Same!\n\nOther.", "paragraph"))
+    asyncio.run(AnalyzeService.analyze_segmented("Same!\n\nNew one.", "paragraph"))
+    assert model_calls == [["Same!", "Other."], ["New one."]]
+
+
+def test_whitespace_only_text_uses_the_cached_single_text_path(model_calls):
+    first = asyncio.run(AnalyzeService.analyze_segmented("   \n\n  ", "paragraph"))
+    second = asyncio.run(AnalyzeService.analyze_segmented("   \n\n  ", "sentence"))
+
+    assert first.segments == [] and second.segments == []
+    assert first.probabilities == second.probabilities == NEGATIVE
+    # the second request was a cache hit
+    assert len(model_calls) == 1
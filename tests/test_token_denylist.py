@@ -0,0 +1,139 @@
+import time
+import uuid
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from quietsignal_backend.config import settings
+from quietsignal_backend.utils import tokenDenylist
+from quietsignal_backend.utils.jwtHandler import create_access_token, decode_token
+from quietsignal_backend.utils.tokenDenylist import (
+    BloomFilter,
+    DenylistBackend,
+    LocalDenylistBackend,
+    TokenDenylist,
+    _load_backend,
+)
+
+
+class _SharedBackend(DenylistBackend):
+    """Publishes into a list and serves it from a numeric cursor, like a stream would."""
+
+    def __init__(self):
+        self.log = []
+
+    def publish(self, jti, expires_at):
+        self.log.append((jti, expires_at))
+
+    def fetch(self, cursor):
+        start = cursor or 0
+        return self.log[start:], len(self.log)
+
+
+def _jti():
+    return uuid.uuid4().hex
+
+
+def _denylist(backend=None, capacity=100):
+    return TokenDenylist(backend or LocalDenylistBackend(), capacity=capacity, error_rate=0.01, sync_interval=0)
+
+
+def test_bloom_filter_never_misses_an_added_key():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [_jti() for _ in range(1000)] + ["not-a-uuid"]
+    for key in keys:
+        bloom.add(key)
+    assert all(bloom.might_contain(key) for key in keys)
+    # roughly the configured error rate for keys that were never added
+    false_positives = sum(bloom.might_contain(_jti()) for _ in range(5000))
+    assert false_positives < 5000 * 0.03
+
+
+def test_revoke_is_a_check_and_set():
+    denylist = _denylist()
+    jti = _jti()
+    assert not denylist.is_revoked(jti)
+    assert denylist.revoke(jti, time.time() + 60) is True
+    assert denylist.revoke(jti, time.time() + 60) is False
+    assert denylist.is_revoked(jti)
+    assert denylist.stats()["revocations"] == 1
+
+
+def test_expired_and_jti_less_tokens_are_not_stored():
+    denylist = _denylist()
+    assert denylist.revoke(_jti(), time.time() - 1)
+    assert denylist.revoke(None, time.time() + 60)
+    assert len(denylist) == 0
+    assert not denylist.is_revoked(None)
+
+
+def test_rebuild_drops_expired_entries(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_DENYLIST_PRUNE_S", 0)
+    denylist = _denylist()
+    short, long = _jti(), _jti()
+    denylist.revoke(short, time.time() + 0.05)
+    time.sleep(0.1)
+    denylist.revoke(long, time.time() + 60)
+
+    assert len(denylist) == 1
+    assert denylist.is_revoked(long) and not denylist.is_revoked(short)
+
+
+def test_filter_grows_past_its_capacity():
+    denylist = _denylist(capacity=4)
+    jtis = [_jti() for _ in range(20)]
+    for jti in jtis:
+        denylist.revoke(jti, time.time() + 60)
+    assert len(denylist) == 20
+    assert all(denylist.is_revoked(jti) for jti in jtis)
+    assert denylist.stats()["filter_bits"] > BloomFilter(4, 0.01).size
+
+
+def test_revocations_reach_other_workers_through_the_backend():
+    backend = _SharedBackend()
+    revoking, other = _denylist(backend), TokenDenylist(backend, capacity=100, error_rate=0.01, sync_interval=0.01)
+    jti = _jti()
+    revoking.revoke(jti, time.time() + 60)
+
+    other.start_sync()
+    try:
+        deadline = time.time() + 2
+        while not other.is_revoked(jti) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        other.stop_sync()
+    assert other.is_revoked(jti)
+
+
+def test_backends_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        DenylistBackend()
+
+    class PublishOnly(DenylistBackend):
+        def publish(self, jti, expires_at):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnly()
+
+
+def test_backend_spec():
+    assert isinstance(_load_backend("local"), LocalDenylistBackend)
+    assert isinstance(_load_backend(f"{__name__}:_SharedBackend"), _SharedBackend)
+    with pytest.raises(ValueError):
+        _load_backend("no-class-given")
+
+
+def test_tokens_expire_in_utc():
+    payload = decode_token(create_access_token({"sub": "ada"}, timedelta(minutes=5)))
+    assert payload["exp"] - payload["iat"] == 300
+    assert abs(payload["iat"] - time.time()) < 5
+
+    expired = create_access_token({"sub": "ada"}, timedelta(seconds=-1))
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_token(expired)
+
+
+def test_module_denylist_uses_the_configured_backend():
+    assert isinstance(tokenDenylist.token_denylist.backend, LocalDenylistBackend)
@@ -0,0 +1,139 @@
+import asyncio
+import io
+import json
+import uuid
+
+import pytest
+
+from quietsignal_backend.database import SessionLocal
+from quietsignal_backend.models.dao.userDAO import UserDAO
+from quietsignal_backend.models.entities.userEntity import User
+from quietsignal_backend.services import userImportService
+from quietsignal_backend.services.userImportService import UserImportService, iter_csv, read_csv_header
+from quietsignal_backend.utils.security import BulkPasswordHasher, pwd_ctx
+
+
+@pytest.fixture
+def hashes(schema, monkeypatch):
+    """Passwords the import sent to the hashing pool; hashing itself is faked."""
+    hashed = []
+
+    async def hash_many(plains):
+        hashed.extend(plains)
+        return [f"hashed:{plain}" for plain in plains]
+
+    monkeypatch.setattr(userImportService.bulk_password_hasher, "hash_many", hash_many)
+    return hashed
+
+
+def _name():
+    return f"import_{uuid.uuid4().hex[:8]}"
+
+
+def _row(username, email=None, password="s3cret-pass"):
+    return {"name": "Imported", "username": username, "email": email, "password": password}
+
+
+def _import(rows, chunk_size=1000):
+    async def items():
+        for line_no, row in enumerate(rows, start=1):
+            yield line_no, row, None
+
+    async def main():
+        return [json.loads(line) async for chunk in UserImportService.import_stream(items(), chunk_size)
+                for line in chunk.splitlines()]
+
+    lines = asyncio.run(main())
+    return lines[:-1], lines[-1]["summary"]
+
+
+def _stored(username):
+    with SessionLocal() as db:
+        return db.query(User).filter(User.username == username).one_or_none()
+
+
+def test_rows_are_created_in_order(hashes):
+    a, b = _name(), _name()
+    results, summary = _import([_row(a, f"{a}@example.com"), _row(b)])
+
+    assert [r["status"] for r in results] == ["created", "created"]
+    assert [r["row"] for r in results] == [1, 2]
+    assert results[0]["id"] == _stored(a).id
+    assert _stored(b).hashed_password == "hashed:s3cret-pass"
+    assert summary == {"rows": 2, "created": 2, "duplicate": 0, "invalid": 0}
+
+
+def test_duplicates_within_the_upload_and_against_the_db(hashes):
+    taken = _name()
+    _import([_row(taken, f"{taken}@example.com")])
+    hashes.clear()
+
+    a = _name()
+    results, summary = _import([
+        _row(a, f"{a}@example.com"),
+        _row(a),                                  # username repeated in this upload
+        _row(_name(), f"{a}@example.com"),        # email repeated in this upload
+        _row(taken),                              # username already stored
+        _row(_name(), f"{taken}@example.com"),    # email already stored
+    ], chunk_size=2)
+
+    assert [r["status"] for r in results] == ["created", "duplicate", "duplicate", "duplicate", "duplicate"]
+    assert results[3]["error"] == "Username already exists"
+    assert results[4]["error"] == "Email already exists"
+    assert summary["created"] == 1 and summary["duplicate"] == 4
+    # duplicates are never hashed
+    assert len(hashes) == 1
+
+
+def test_invalid_rows_do_not_echo_the_password(hashes):
+    results, summary = _import([_row("x", password="do-not-echo-me-123") | {"email": "not-an-email"}, ["list"]])
+
+    assert [r["status"] for r in results] == ["invalid", "invalid"]
+    assert "do-not-echo-me-123" not in json.dumps(results)
+    assert results[1]["error"].startswith("Expected an object")
+    assert summary["invalid"] == 2 and hashes == []
+
+
+def test_concurrent_registration_falls_back_to_row_by_row(hashes, monkeypatch):
+    raced = _name()
+    with SessionLocal() as db:
+        UserDAO.bulk_insert(db, [{"name": "Raced", "username": raced, "email": None, "hashed_password": "x"}])
+    # the pre-check ran before the competing registration committed
+    monkeypatch.setattr(UserDAO, "existing_usernames", staticmethod(lambda db, usernames: set()))
+
+    a, b = _name(), _name()
+    results, summary = _import([_row(a), _row(raced), _row(b)])
+
+    assert [r["status"] for r in results] == ["created", "duplicate", "created"]
+    assert results[1]["error"] == "Username or email already exists"
+    assert _stored(a) is not None and _stored(b) is not None
+    assert _stored(raced).name == "Raced"
+    assert summary == {"rows": 3, "created": 2, "duplicate": 1, "invalid": 0}
+
+
+def test_csv_rows():
+    upload = io.BytesIO(b"\xef\xbb\xbfUsername,Name,Password,Email\r\nada,Ada,pw-123456,\r\n\r\nbob,Bob\r\n")
+
+    async def main():
+        return [item async for item in iter_csv(*read_csv_header(upload))]
+
+    (line_1, row, error), (line_2, missing, short) = asyncio.run(main())
+    assert (line_1, error) == (2, None)
+    assert row == {"username": "ada", "name": "Ada", "password": "pw-123456", "email": None}
+    assert line_2 == 4 and missing is None and short == "Expected 4 columns, got 2"
+
+
+def test_csv_header_is_checked():
+    with pytest.raises(ValueError) as bad:
+        read_csv_header(io.BytesIO(b"name,username,phone\r\n"))
+    assert "missing: password" in str(bad.value) and "unknown: phone" in str(bad.value)
+
+
+def test_bulk_hasher_spreads_a_batch_over_the_pool():
+    hasher = BulkPasswordHasher(workers=2)
+    try:
+        hashes = asyncio.run(hasher.hash_many(["one", "two", "three"]))
+    finally:
+        hasher.shutdown()
+    assert [pwd_ctx.verify(plain, hashed) for plain, hashed in zip(["one", "two", "three"], hashes)] == [True] * 3
+    assert hasher.stats()["hashed"] == 3